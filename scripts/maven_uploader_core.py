@@ -0,0 +1,4274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Maven JAR包上传工具 - 核心功能
+原生HTTP部署、校验和计算、部署索引、Maven检测、批量上传和命令行模式，不依赖任何图形界面库
+"""
+
+import os
+import sys
+from pathlib import Path
+import threading
+import time
+import base64
+import hashlib
+import json
+import collections
+import urllib.parse
+import xml.etree.ElementTree as ET
+
+# 上传方式
+DEPLOY_MODE_NATIVE = "原生HTTP"
+DEPLOY_MODE_MAVEN = "Maven命令"
+
+# 本地状态目录（部署索引等），可通过MAVEN_UPLOADER_HOME环境变量修改
+APP_STATE_DIR = Path(os.getenv("MAVEN_UPLOADER_HOME") or Path.home() / ".maven_uploader")
+
+
+# ==================== 日志 ====================
+
+# 完整日志写入的滚动日志文件
+LOG_FILE = APP_STATE_DIR / "logs" / "maven_uploader.log"
+# 写入日志文件的logger，整个进程共用一个
+LOGGER_NAME = "maven_uploader"
+
+
+class LogSink:
+    """线程安全的日志缓冲：任意线程写入，界面线程按固定帧率批量取出；同时写入滚动日志文件"""
+
+    def __init__(self, log_file=LOG_FILE, max_bytes=5 * 1024 * 1024, backup_count=5):
+        import logging.handlers
+
+        self._pending = collections.deque()
+        self._lock = threading.Lock()
+        self.log_file = None
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        if log_file:
+            path = os.path.abspath(log_file)
+            # 同一个日志文件的handler只添加一次，重复创建LogSink时复用
+            if not any(getattr(handler, "baseFilename", None) == path for handler in self._logger.handlers):
+                try:
+                    Path(path).parent.mkdir(parents=True, exist_ok=True)
+                    handler = logging.handlers.RotatingFileHandler(
+                        path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+                except OSError:
+                    return
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                self._logger.addHandler(handler)
+            self.log_file = Path(log_file)
+
+    def write(self, message):
+        """追加一条日志（可在任意线程调用）"""
+        with self._lock:
+            self._pending.append(message)
+        if self.log_file:
+            self._logger.info(message)
+
+    def drain(self, max_lines):
+        """取出所有待显示的日志，最多返回最后max_lines行，返回(行列表, 丢弃的行数)"""
+        with self._lock:
+            lines = list(self._pending)
+            self._pending.clear()
+        dropped = max(0, len(lines) - max_lines)
+        return lines[dropped:], dropped
+
+    def close(self):
+        """关闭日志文件"""
+        if not self.log_file:
+            return
+        path = os.path.abspath(self.log_file)
+        for handler in list(self._logger.handlers):
+            if getattr(handler, "baseFilename", None) == path:
+                handler.close()
+                self._logger.removeHandler(handler)
+        self.log_file = None
+
+
+class UiBridge:
+    """工作线程到界面线程的回调队列（线程安全）
+
+    工作线程（包括异步调度器的线程）调用post()提交回调，界面线程定时调用drain()取出后执行；
+    指定key的回调（如进度刷新）只保留最新一个，界面繁忙时不会越积越多。
+    """
+
+    def __init__(self):
+        self._queue = collections.deque()
+        self._latest = {}
+        self._lock = threading.Lock()
+
+    def post(self, callback, key=None):
+        """提交一个在界面线程执行的回调（可在任意线程调用）"""
+        with self._lock:
+            if key is None:
+                self._queue.append((None, callback))
+                return
+            if key not in self._latest:
+                self._queue.append((key, None))
+            self._latest[key] = callback
+
+    def drain(self):
+        """取出所有待执行的回调（按提交顺序）"""
+        with self._lock:
+            items = list(self._queue)
+            self._queue.clear()
+            latest, self._latest = self._latest, {}
+        return [callback if key is None else latest[key] for key, callback in items]
+
+
+# ==================== 传输进度 ====================
+
+# 界面进度回调的最小间隔（秒），避免频繁刷新拖慢传输
+PROGRESS_UPDATE_INTERVAL = 0.2
+# 计算当前速率的滑动窗口（秒）
+PROGRESS_RATE_WINDOW = 3.0
+
+
+class TransferProgress:
+    """按实际传输的字节数统计进度、速率和剩余时间（线程安全，回调有节流）"""
+
+    def __init__(self, total_bytes=0, on_update=None, min_interval=PROGRESS_UPDATE_INTERVAL, limit=None):
+        self.total_bytes = total_bytes
+        self.on_update = on_update
+        # 配置的带宽上限（字节/秒），与当前速率一起显示
+        self.limit = limit
+        self.min_interval = min_interval
+        self.transferred = 0
+        # 跳过或失败的构件，计入完成量但不计入速率
+        self.settled = 0
+        self.start = time.monotonic()
+        self._samples = collections.deque([(self.start, 0)])
+        self._last_update = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, count):
+        """记录新发送的字节数（每个数据块调用一次）"""
+        with self._lock:
+            self.transferred += count
+        self._maybe_update()
+
+    def settle(self, count):
+        """把不需要传输的字节（跳过或失败的构件）计为已完成"""
+        with self._lock:
+            self.settled += count
+        self._maybe_update(force=True)
+
+    def snapshot(self):
+        """返回当前进度{"done", "total", "fraction", "rate", "limit", "eta"}，rate/limit单位为字节/秒，eta为秒或None"""
+        with self._lock:
+            now = time.monotonic()
+            self._samples.append((now, self.transferred))
+            while len(self._samples) > 2 and now - self._samples[0][0] > PROGRESS_RATE_WINDOW:
+                self._samples.popleft()
+            first_time, first_bytes = self._samples[0]
+            elapsed = now - first_time
+            rate = (self.transferred - first_bytes) / elapsed if elapsed > 0 else 0.0
+            done = self.transferred + self.settled
+            total = max(self.total_bytes, done)
+        remaining = total - done
+        return {
+            "done": done,
+            "total": total,
+            "fraction": done / total if total else 0.0,
+            "rate": rate,
+            "limit": self.limit,
+            "eta": remaining / rate if rate > 0 else None,
+        }
+
+    def _maybe_update(self, force=False):
+        """距上次回调超过最小间隔时回调on_update"""
+        if not self.on_update:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_update < self.min_interval:
+            return
+        self._last_update = now
+        self.on_update(self.snapshot())
+
+
+def format_bytes(count):
+    """格式化字节数"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if count < 1024 or unit == "GB":
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024.0
+
+
+def format_duration(seconds):
+    """格式化时长：[H:]MM:SS"""
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def format_progress(snapshot):
+    """格式化进度：已传输/总量 · 速率（/上限） · 剩余时间"""
+    text = f"{format_bytes(snapshot['done'])} / {format_bytes(snapshot['total'])} · {format_bytes(snapshot['rate'])}/s"
+    if snapshot.get("limit"):
+        text += f" / 上限 {format_bytes(snapshot['limit'])}/s"
+    if snapshot["eta"] is not None:
+        minutes, seconds = divmod(int(snapshot["eta"]), 60)
+        text += f" · 剩余 {minutes:02d}:{seconds:02d}"
+    return text
+
+
+def parse_maven_uploaded_bytes(line):
+    """从Maven的"Uploaded to ...: <url> (12 kB at 34 kB/s)"输出中解析构件文件的字节数
+
+    校验文件和maven-metadata.xml不计入（与本地统计的总量口径一致），无法解析时返回None。
+    """
+    event = MavenOutputParser.parse_line(line)
+    if event is None or event.kind != MAVEN_EVENT_UPLOADED or not event.counted:
+        return None
+    return event.bytes
+
+
+# ==================== 阶段耗时统计 ====================
+
+# 记录的阶段：Maven检测、上传前的构件预检、演练时列出远程仓库、Maven进程（及其中JVM启动到首行输出）、摘要计算、
+# 远程校验值检查、构件上传（含校验文件）、元数据读改写，以及单个构件的整体部署
+METRIC_PHASES = ("maven_discovery", "preflight", "listing", "maven_process", "jvm_startup", "hashing", "remote_check",
+                 "upload", "metadata", "deploy")
+
+
+class PhaseMetrics:
+    """按阶段累计耗时、次数和字节数，并按构件（GAV）记录各阶段耗时，可导出JSON报告和Prometheus文本格式"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.phases = {}
+        self.artifacts = {}
+        self._lock = threading.Lock()
+
+    def record(self, phase, seconds, byte_count=0, artifact=None):
+        """记录一次阶段耗时"""
+        with self._lock:
+            stats = self.phases.get(phase)
+            if stats is None:
+                stats = self.phases[phase] = {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "bytes": 0}
+            stats["count"] += 1
+            stats["seconds"] += seconds
+            stats["bytes"] += byte_count
+            if seconds > stats["max_seconds"]:
+                stats["max_seconds"] = seconds
+            if artifact:
+                phases = self.artifacts.setdefault(artifact, {})
+                phases[phase] = phases.get(phase, 0.0) + seconds
+
+    def report(self):
+        """本次运行的统计报告（可直接序列化为JSON）"""
+        with self._lock:
+            phases = {name: dict(stats, seconds=round(stats["seconds"], 6), max_seconds=round(stats["max_seconds"], 6))
+                      for name, stats in self.phases.items()}
+            artifacts = {name: {phase: round(seconds, 6) for phase, seconds in values.items()}
+                         for name, values in self.artifacts.items()}
+        return {"started": self.started, "elapsed": round(time.time() - self.started, 6), "phases": phases,
+                "artifacts": artifacts}
+
+    def prometheus_text(self):
+        """Prometheus文本格式（供node-exporter的textfile collector读取）"""
+        report = self.report()
+        lines = []
+        for name, key, kind, help_text in (
+            ("maven_uploader_phase_seconds_total", "seconds", "counter", "Time spent in each upload phase."),
+            ("maven_uploader_phase_count_total", "count", "counter", "Number of times each upload phase ran."),
+            ("maven_uploader_phase_bytes_total", "bytes", "counter", "Bytes processed in each upload phase."),
+            ("maven_uploader_phase_max_seconds", "max_seconds", "gauge", "Longest single run of each upload phase."),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for phase, stats in sorted(report["phases"].items()):
+                lines.append(f'{name}{{phase="{_prometheus_label(phase)}"}} {stats[key]}')
+        lines.append("# HELP maven_uploader_run_duration_seconds Duration of the last run.")
+        lines.append("# TYPE maven_uploader_run_duration_seconds gauge")
+        lines.append(f"maven_uploader_run_duration_seconds {report['elapsed']}")
+        lines.append("# HELP maven_uploader_last_run_timestamp_seconds Start time of the last run.")
+        lines.append("# TYPE maven_uploader_last_run_timestamp_seconds gauge")
+        lines.append(f"maven_uploader_last_run_timestamp_seconds {report['started']:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        """写出JSON报告"""
+        _write_atomic(path, json.dumps(self.report(), ensure_ascii=False, indent=2))
+
+    def write_prometheus(self, path):
+        """原子地写出Prometheus文本文件，textfile collector不会读到写了一半的文件"""
+        _write_atomic(path, self.prometheus_text())
+
+
+def _prometheus_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_atomic(path, text):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class _Span:
+    """计时区间：退出时把耗时记录到PhaseMetrics"""
+
+    __slots__ = ("metrics", "phase", "artifact", "start", "byte_count")
+
+    def __init__(self, metrics, phase, artifact):
+        self.metrics = metrics
+        self.phase = phase
+        self.artifact = artifact
+        self.byte_count = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        artifact = self.artifact or getattr(_metrics_context, "artifact", None)
+        self.metrics.record(self.phase, time.perf_counter() - self.start, self.byte_count, artifact)
+        return False
+
+    def add_bytes(self, count):
+        self.byte_count += count
+
+
+class _NullSpan:
+    """未启用统计时使用的空计时区间"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def add_bytes(self, count):
+        pass
+
+
+class _ArtifactContext:
+    """在当前线程中标记正在处理的构件，期间的计时区间都归到该构件"""
+
+    __slots__ = ("artifact", "previous")
+
+    def __init__(self, artifact):
+        self.artifact = artifact
+
+    def __enter__(self):
+        self.previous = getattr(_metrics_context, "artifact", None)
+        _metrics_context.artifact = self.artifact
+        return self
+
+    def __exit__(self, *exc_info):
+        _metrics_context.artifact = self.previous
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+_metrics = None
+_metrics_context = threading.local()
+
+
+def enable_metrics():
+    """开始记录阶段耗时，返回新的PhaseMetrics"""
+    global _metrics
+    _metrics = PhaseMetrics()
+    return _metrics
+
+
+def disable_metrics():
+    """停止记录，返回之前的PhaseMetrics"""
+    global _metrics
+    metrics, _metrics = _metrics, None
+    return metrics
+
+
+def span(phase, artifact=None):
+    """阶段计时区间：with span("hashing") as timing: ...; timing.add_bytes(n)
+
+    未启用统计时返回共享的空区间，只多一次全局变量判断。
+    """
+    metrics = _metrics
+    if metrics is None:
+        return _NULL_SPAN
+    return _Span(metrics, phase, artifact)
+
+
+def metrics_artifact(artifact):
+    """把当前线程中的计时区间归到构件artifact（如GAV）"""
+    if _metrics is None:
+        return _NULL_SPAN
+    return _ArtifactContext(artifact)
+
+
+# ==================== 校验和计算 ====================
+
+# 仓库常用的校验文件类型；md5/sha1是Maven默认上传的两种
+CHECKSUM_ALGORITHMS = ("md5", "sha1", "sha256", "sha512")
+DEFAULT_CHECKSUM_ALGORITHMS = ("md5", "sha1")
+
+# 小于该大小的文件整体mmap后一次性计算，否则用固定大小的缓冲区分块读取，内存占用有上限
+CHECKSUM_MMAP_LIMIT = 64 * 1024 * 1024
+CHECKSUM_CHUNK_SIZE = 4 * 1024 * 1024
+
+_hash_executor = None
+_hash_executor_lock = threading.Lock()
+
+
+def _get_hash_executor():
+    """获取计算大文件摘要用的共享线程池（hashlib在计算时会释放GIL）"""
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _hash_executor = ThreadPoolExecutor(max_workers=len(CHECKSUM_ALGORITHMS), thread_name_prefix="checksum")
+        return _hash_executor
+
+
+def compute_checksums(path=None, data=None, algorithms=CHECKSUM_ALGORITHMS):
+    """只读取一次文件内容，用同一块缓冲区同时计算多种摘要，返回{算法: 十六进制摘要}"""
+    import mmap
+
+    digests = [hashlib.new(name) for name in algorithms]
+    if data is not None:
+        for digest in digests:
+            digest.update(data)
+        return {name: digest.hexdigest() for name, digest in zip(algorithms, digests)}
+
+    size = os.path.getsize(path)
+    with span("hashing") as timing, open(path, "rb") as f:
+        timing.add_bytes(size)
+        if 0 < size <= CHECKSUM_MMAP_LIMIT:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for digest in digests:
+                    digest.update(mapped)
+        elif size > 0:
+            # 大文件：复用同一个缓冲区分块读取，每块的多个摘要并行计算
+            buffer = bytearray(CHECKSUM_CHUNK_SIZE)
+            view = memoryview(buffer)
+            executor = _get_hash_executor() if len(digests) > 1 and (os.cpu_count() or 1) > 1 else None
+            while True:
+                count = f.readinto(buffer)
+                if not count:
+                    break
+                chunk = view[:count]
+                if executor:
+                    for future in [executor.submit(digest.update, chunk) for digest in digests]:
+                        future.result()
+                else:
+                    for digest in digests:
+                        digest.update(chunk)
+                chunk.release()
+    return {name: digest.hexdigest() for name, digest in zip(algorithms, digests)}
+
+
+# 多仓库分发时保留的闲置共享缓冲区数，超过时释放最早闲置的（之后再用到时重新映射）
+FILE_BUFFER_IDLE_LIMIT = 64
+
+
+class SharedFileBuffers:
+    """多个仓库目标共享的构件文件内容和摘要（线程安全）
+
+    同一个文件只mmap一次，各目标的上传直接发送同一块缓冲区，不再各自打开和读取文件；
+    摘要按(路径, 大小, 修改时间)只计算一次。没有目标在使用的缓冲区暂时保留，供较慢的目标稍后复用。
+    超过CHECKSUM_MMAP_LIMIT的大文件不映射（acquire返回None），由各目标用sendfile流式发送，内存占用不随文件大小增长。
+    """
+
+    def __init__(self, algorithms=CHECKSUM_ALGORITHMS, idle_limit=FILE_BUFFER_IDLE_LIMIT):
+        self.algorithms = tuple(algorithms)
+        self.idle_limit = idle_limit
+        # 实际映射文件的次数，用于确认每个文件只读取一次
+        self.loads = 0
+        self._buffers = {}
+        self._idle = collections.OrderedDict()
+        self._checksums = {}
+        self._checksum_locks = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, path):
+        """返回文件内容的memoryview，用完后必须调用release(path, view)；大文件返回None"""
+        import mmap
+
+        path = os.path.abspath(path)
+        with self._lock:
+            entry = self._buffers.get(path)
+            if entry is None:
+                with open(path, "rb") as f:
+                    size = os.fstat(f.fileno()).st_size
+                    if size > CHECKSUM_MMAP_LIMIT:
+                        return None
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+                entry = self._buffers[path] = [mapped, 0]
+                self.loads += 1
+            entry[1] += 1
+            self._idle.pop(path, None)
+            return memoryview(entry[0])
+
+    def release(self, path, view):
+        """归还acquire得到的memoryview"""
+        path = os.path.abspath(path)
+        view.release()
+        with self._lock:
+            entry = self._buffers[path]
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._idle[path] = True
+                while len(self._idle) > self.idle_limit:
+                    self._close(self._idle.popitem(last=False)[0])
+
+    def checksums(self, path):
+        """文件的各算法摘要，每个文件（内容未变化时）只计算一次"""
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if key in self._checksums:
+                return self._checksums[key]
+            lock = self._checksum_locks.setdefault(key, threading.Lock())
+        try:
+            with lock:
+                if key not in self._checksums:
+                    self._checksums[key] = self._compute_checksums(path, stat.st_size)
+                return self._checksums[key]
+        finally:
+            # 算完后后来的调用直接命中摘要缓存，锁不再需要，避免监视模式和超大批量中无限增长
+            with self._lock:
+                self._checksum_locks.pop(key, None)
+
+    def _compute_checksums(self, path, size):
+        """计算摘要：映射过的文件直接从缓冲区计算，大文件（或映射前文件已变大）分块读取"""
+        view = self.acquire(path) if size <= CHECKSUM_MMAP_LIMIT else None
+        if view is None:
+            return compute_checksums(path, algorithms=self.algorithms)
+        try:
+            with span("hashing") as timing:
+                timing.add_bytes(len(view))
+                return compute_checksums(data=view, algorithms=self.algorithms)
+        finally:
+            self.release(path, view)
+
+    def close(self):
+        """释放全部缓冲区"""
+        with self._lock:
+            for path in list(self._buffers):
+                self._close(path)
+            self._idle.clear()
+
+    def _close(self, path):
+        mapped = self._buffers.pop(path)[0]
+        if not isinstance(mapped, bytes):
+            try:
+                mapped.close()
+            except BufferError:
+                # 仍有未释放的切片（如发送中断时），交给垃圾回收关闭
+                pass
+
+
+# ==================== 部署索引 ====================
+
+class DeployIndex:
+    """记录已部署文件的本地SQLite索引，键为(仓库URL, GAV, 文件名)，值为内容SHA-1及本地文件状态"""
+
+    def __init__(self, db_path=None):
+        import sqlite3
+
+        self.db_path = Path(db_path or APP_STATE_DIR / "deploy-index.sqlite3")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS deployed ("
+                " repository_url TEXT NOT NULL,"
+                " gav TEXT NOT NULL,"
+                " file_name TEXT NOT NULL,"
+                " sha1 TEXT NOT NULL,"
+                " size INTEGER,"
+                " mtime_ns INTEGER,"
+                " deployed_at REAL,"
+                " PRIMARY KEY (repository_url, gav, file_name))"
+            )
+            self._conn.commit()
+
+    def get(self, repository_url, gav, file_name):
+        """查询已记录的文件，返回(sha1, size, mtime_ns)或None"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT sha1, size, mtime_ns FROM deployed WHERE repository_url=? AND gav=? AND file_name=?",
+                (repository_url.rstrip("/"), gav, file_name)
+            ).fetchone()
+
+    def record(self, repository_url, gav, file_name, sha1, stat):
+        """记录已部署（或已确认远程一致）的文件"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO deployed VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (repository_url.rstrip("/"), gav, file_name, sha1, stat.st_size, stat.st_mtime_ns, time.time())
+            )
+            self._conn.commit()
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+# ==================== 原生HTTP部署引擎 ====================
+
+# 可以重试的HTTP状态码（超时、限流、服务端临时错误）
+RETRYABLE_HTTP_STATUS = (408, 429, 500, 502, 503, 504)
+
+
+class DeployError(Exception):
+    """部署过程中发生的错误
+
+    transient表示是否为临时性错误（网络中断、限流、服务端5xx等），未指定时按HTTP状态码判断。
+    """
+
+    def __init__(self, message, status=None, transient=None):
+        super().__init__(message)
+        self.status = status
+        self.transient = status in RETRYABLE_HTTP_STATUS if transient is None else transient
+
+
+def _strip_ns(tag):
+    """去掉XML标签的命名空间前缀"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child_text(element, name):
+    """读取直接子元素的文本（忽略命名空间）"""
+    for child in element:
+        if _strip_ns(child.tag) == name:
+            return (child.text or "").strip()
+    return ""
+
+
+def _find_child(element, name):
+    """查找直接子元素（忽略命名空间）"""
+    for child in element:
+        if _strip_ns(child.tag) == name:
+            return child
+    return None
+
+
+# POM中通常位于坐标之后的大段内容，流式解析读到这里且坐标已齐全时即可停止
+POM_TRAILING_SECTIONS = ("properties", "dependencyManagement", "dependencies", "build", "profiles", "reporting")
+
+
+def scan_pom_coordinates(source):
+    """流式解析POM（文件对象），只读取顶层及parent中的坐标，读到坐标后即停止，不构建整棵树
+
+    返回{"groupId", "artifactId", "version", "packaging"}，groupId/version缺省时取parent中的值，
+    缺少的项为空字符串。
+    """
+    fields = {}
+    parent = {}
+    depth = 0
+    in_parent = False
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        name = _strip_ns(element.tag)
+        if event == "start":
+            depth += 1
+            if depth == 2:
+                if name == "parent":
+                    in_parent = True
+                elif name in POM_TRAILING_SECTIONS and "artifactId" in fields and \
+                        ("version" in fields or "version" in parent):
+                    break
+            continue
+        if depth == 2:
+            if name == "parent":
+                in_parent = False
+            elif name in ("groupId", "artifactId", "version", "packaging"):
+                fields[name] = (element.text or "").strip()
+            element.clear()
+            if len(fields) == 4:
+                break
+        elif depth == 3 and in_parent and name in ("groupId", "version"):
+            parent[name] = (element.text or "").strip()
+        depth -= 1
+    return {
+        "groupId": fields.get("groupId") or parent.get("groupId", ""),
+        "artifactId": fields.get("artifactId", ""),
+        "version": fields.get("version") or parent.get("version", ""),
+        "packaging": fields.get("packaging") or "jar",
+    }
+
+
+def read_pom_coordinates(pom_path):
+    """从POM文件中读取GAV坐标，groupId/version缺省时取parent中的值"""
+    try:
+        with open(pom_path, "rb") as f:
+            coordinates = scan_pom_coordinates(f)
+    except (ET.ParseError, OSError) as e:
+        raise DeployError(f"无法解析POM文件 {pom_path}: {e}")
+
+    missing = [key for key in ("groupId", "artifactId", "version") if not coordinates[key]]
+    if missing:
+        raise DeployError(f"POM文件缺少坐标信息: {', '.join(missing)}")
+    if "${" in coordinates["groupId"] + coordinates["version"]:
+        raise DeployError("POM文件坐标中包含未解析的属性，请使用Maven命令方式上传")
+    return coordinates
+
+
+def load_maven_credentials(repository_id, settings_path=None):
+    """从Maven的settings.xml中读取仓库ID对应的用户名和密码"""
+    candidates = [settings_path] if settings_path else [
+        Path.home() / ".m2" / "settings.xml",
+        Path(os.getenv("MAVEN_HOME", "")) / "conf" / "settings.xml" if os.getenv("MAVEN_HOME") else None,
+    ]
+    for candidate in candidates:
+        if not candidate or not Path(candidate).is_file():
+            continue
+        try:
+            root = ET.parse(str(candidate)).getroot()
+        except (ET.ParseError, OSError):
+            continue
+        servers = _find_child(root, "servers")
+        if servers is None:
+            continue
+        for server in servers:
+            if _strip_ns(server.tag) != "server" or _child_text(server, "id") != repository_id:
+                continue
+            username = _child_text(server, "username")
+            password = _child_text(server, "password")
+            if password.startswith("{") and password.endswith("}"):
+                raise DeployError(f"仓库 {repository_id} 的密码已加密，原生HTTP方式无法解密，请使用Maven命令方式上传")
+            return username, password
+    return None
+
+
+# 上传文件时每次发送的数据块大小
+HTTP_BLOCK_SIZE = 64 * 1024
+# 文件请求体每次sendfile的最大字节数，也是上传进度回调的粒度
+SENDFILE_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+# 连接池默认保留的空闲连接数，以及空闲连接的最长保留时间（秒），超过后关闭重连，避免复用已被服务端断开的连接
+HTTP_POOL_SIZE = 8
+HTTP_IDLE_TIMEOUT = 30.0
+# 原生方式一次deploy_many最多部署的构件数，同一groupId:artifactId的元数据每批只读写一次
+NATIVE_BATCH_SIZE = 50
+
+
+def _send_body(sock, body, on_bytes=None, limiter=None):
+    """发送请求体（文件对象或memoryview），内存占用与文件大小无关
+
+    文件在明文HTTP连接上用sendfile由内核直接从页缓存发送，不经过Python缓冲区；
+    TLS连接（或系统不支持sendfile时）用一块固定大小的缓冲区反复readinto后发送。
+    memoryview（共享的文件缓冲区）直接按块发送其切片，不复制数据。
+    设置limiter（TokenBucket）时每个数据块发送前先申请带宽。
+    """
+    import ssl
+
+    chunk_size = limiter.chunk_size if limiter else SENDFILE_CHUNK_SIZE
+    if isinstance(body, memoryview):
+        for offset in range(0, len(body), chunk_size):
+            chunk = body[offset:offset + chunk_size]
+            if limiter:
+                limiter.consume(len(chunk))
+            sock.sendall(chunk)
+            if on_bytes:
+                on_bytes(len(chunk))
+        return
+    size = os.fstat(body.fileno()).st_size
+    if hasattr(os, "sendfile") and not isinstance(sock, ssl.SSLSocket):
+        offset = 0
+        while offset < size:
+            count = min(chunk_size, size - offset)
+            if limiter:
+                limiter.consume(count)
+            sent = sock.sendfile(body, offset, count)
+            if not sent:
+                raise ConnectionError("连接已关闭")
+            offset += sent
+            if on_bytes:
+                on_bytes(sent)
+        return
+    body.seek(0)
+    buffer = bytearray(HTTP_BLOCK_SIZE)
+    view = memoryview(buffer)
+    while True:
+        count = body.readinto(buffer)
+        if not count:
+            break
+        if limiter:
+            limiter.consume(count)
+        sock.sendall(view[:count])
+        if on_bytes:
+            on_bytes(count)
+
+
+class HttpConnectionPool:
+    """到同一仓库主机的HTTP/1.1持久连接池，由所有并发任务共享
+
+    小文件（POM、校验文件、元数据）的传输时间往往比TCP/TLS握手还短，复用连接可以省掉大部分握手。
+    最多保留pool_size个空闲连接，后进先出；超出时归还的连接直接关闭。
+    """
+
+    def __init__(self, scheme, host, port=None, timeout=60, pool_size=HTTP_POOL_SIZE,
+                 idle_timeout=HTTP_IDLE_TIMEOUT):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.pool_size = max(0, int(pool_size))
+        self.idle_timeout = idle_timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.reused = 0
+        self.connections = 0
+
+    def _connect(self):
+        """建立新连接（握手在第一次请求时进行）"""
+        import http.client
+
+        with self._lock:
+            self.connections += 1
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout, blocksize=HTTP_BLOCK_SIZE)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout, blocksize=HTTP_BLOCK_SIZE)
+
+    def acquire(self):
+        """取出一个连接，返回(连接, 是否为复用的连接)"""
+        now = time.monotonic()
+        expired = []
+        conn = None
+        with self._lock:
+            while self._idle:
+                candidate, released_at = self._idle.pop()
+                if now - released_at <= self.idle_timeout:
+                    conn = candidate
+                    break
+                expired.append(candidate)
+        for candidate in expired:
+            candidate.close()
+        if conn is not None:
+            return conn, True
+        return self._connect(), False
+
+    def count(self, reused):
+        """记录一次完成的请求及其是否复用了已有连接"""
+        with self._lock:
+            self.requests += 1
+            self.reused += reused
+
+    def release(self, conn):
+        """归还连接，池已满时关闭"""
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def close(self):
+        """关闭所有空闲连接"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+    def stats(self):
+        """连接统计：请求数、新建连接（握手）数、复用次数和复用率"""
+        with self._lock:
+            requests, reused, connections = self.requests, self.reused, self.connections
+        return {
+            "requests": requests,
+            "connections": connections,
+            "reused": reused,
+            "reuse_rate": reused / requests if requests else 0.0,
+        }
+
+
+def format_connection_stats(stats):
+    """格式化连接池统计"""
+    return (f"HTTP请求 {stats['requests']} 次，新建连接 {stats['connections']} 个，"
+            f"复用 {stats['reused']} 次（复用率 {stats['reuse_rate']:.0%}）")
+
+
+class HttpDeployer:
+    """不启动Maven进程，直接通过HTTP PUT将构件部署到仓库，可作为deploy_func(jar, pom)使用
+
+    所有请求通过同一个持久连接池发送，同一个实例的deploy可以被多个线程并发调用。
+    deploy_many()部署一批构件，同一groupId:artifactId的maven-metadata.xml只读取、合并、写回一次。
+    """
+
+    # BatchUploader按groupId:artifactId分批，让同一构件的多个版本尽量在同一批中合并元数据
+    groups_by_artifact = True
+
+    def __init__(self, repository_url, credentials=None, timeout=60, log=None,
+                 checksum_algorithms=DEFAULT_CHECKSUM_ALGORITHMS, index=None, on_bytes=None, on_state=None,
+                 pool_size=HTTP_POOL_SIZE, idle_timeout=HTTP_IDLE_TIMEOUT, buffers=None, limiter=None):
+        parsed = urllib.parse.urlsplit(repository_url.strip())
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise DeployError(f"不支持的仓库URL: {repository_url}")
+        self.repository_url = repository_url.strip().rstrip("/")
+        # 部署索引，设置后会跳过内容相同的已部署构件
+        self.index = index
+        # 上传文件内容时按数据块回调发送的字节数，用于显示进度；部署失败时以负数撤回已报告的字节数
+        self.on_bytes = on_bytes
+        # 当前线程正在部署的构件已报告的字节数
+        self._reported = threading.local()
+        # 构件进入hashing/uploading阶段时回调on_state(jar, pom, state)，用于写入作业日志
+        self.on_state = on_state or (lambda jar, pom, state: None)
+        # 多仓库分发时共享的文件缓冲区和摘要（SharedFileBuffers），设置后不再自行读取构件文件
+        self.buffers = buffers
+        # 全局带宽上限（TokenBucket），所有请求体都计入
+        self.limiter = limiter
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.base_path = parsed.path.rstrip("/")
+        self.timeout = timeout
+        self.batch_size = NATIVE_BATCH_SIZE
+        self.pool = HttpConnectionPool(self.scheme, self.host, self.port, timeout, pool_size, idle_timeout)
+        self.log = log or (lambda message: None)
+        self.checksum_algorithms = tuple(checksum_algorithms)
+        self.headers = {"User-Agent": "maven-uploader-modern"}
+        # 同一groupId:artifactId的元数据读改写需要串行，避免并发上传时丢失版本
+        self._metadata_locks = {}
+        self._metadata_locks_guard = threading.Lock()
+        if credentials:
+            token = base64.b64encode(f"{credentials[0]}:{credentials[1]}".encode("utf-8")).decode("ascii")
+            self.headers["Authorization"] = f"Basic {token}"
+
+    def _request(self, method, remote_path, body=None, headers=None, on_bytes=None, url=None):
+        """通过连接池发送一个HTTP请求，返回(状态码, 响应内容)
+
+        body为文件对象或memoryview时流式发送（见_send_body），on_bytes(n)按发送的字节数回调。
+        url为完整的请求路径（含查询参数，用于仓库之外的接口），默认为仓库下的remote_path。
+        复用的空闲连接可能已被服务端或代理关闭，此时在新连接上重发（已报告的部分先撤回，进度不会重复计算）。
+        """
+        import http.client
+
+        url = url or f"{self.base_path}/{urllib.parse.quote(remote_path)}"
+        request_headers = dict(self.headers)
+        request_headers.update(headers or {})
+        streamed = isinstance(body, memoryview) or hasattr(body, "fileno")
+        if streamed:
+            request_headers["Content-Length"] = str(len(body) if isinstance(body, memoryview)
+                                                    else os.fstat(body.fileno()).st_size)
+        # 字节串、memoryview和文件（按偏移发送或从头读取）都可以在新连接上完整重发
+        replayable = body is None or isinstance(body, (bytes, bytearray)) or streamed
+        sent = [0]
+
+        def report(count):
+            sent[0] += count
+            on_bytes(count)
+
+        while True:
+            conn, reused = self.pool.acquire()
+            try:
+                if streamed:
+                    conn.putrequest(method, url)
+                    for name, value in request_headers.items():
+                        conn.putheader(name, value)
+                    conn.endheaders()
+                    _send_body(conn.sock, body, report if on_bytes else None, self.limiter)
+                else:
+                    if self.limiter and body:
+                        self.limiter.consume(len(body))
+                    conn.request(method, url, body=body, headers=request_headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                if sent[0]:
+                    on_bytes(-sent[0])
+                    sent[0] = 0
+                if reused and replayable:
+                    continue
+                raise DeployError(f"{method} {remote_path} 失败: {e}", transient=True)
+            self.pool.count(reused)
+            if response.will_close:
+                conn.close()
+            else:
+                self.pool.release(conn)
+            return response.status, data
+
+    def get(self, remote_path):
+        """下载远程文件，不存在时返回None"""
+        status, data = self._request("GET", remote_path)
+        if status == 404:
+            return None
+        if status >= 300:
+            raise DeployError(f"GET {remote_path} 返回 HTTP {status}", status)
+        return data
+
+    def exists(self, remote_path):
+        """远程文件是否存在（HEAD请求）"""
+        status, _ = self._request("HEAD", remote_path)
+        if status == 404:
+            return False
+        if status >= 300:
+            raise DeployError(f"HEAD {remote_path} 返回 HTTP {status}", status)
+        return True
+
+    def list_directory(self, remote_path):
+        """列出远程目录（remote_path以/结尾）的直接子项，目录名以/结尾；目录不存在时返回None
+
+        解析仓库的目录页面（Nexus 2、Artifactory、Reposilite、nginx/Apache autoindex等）。
+        """
+        status, data = self._request("GET", remote_path)
+        if status == 404:
+            return None
+        if status >= 300:
+            raise DeployError(f"GET {remote_path} 返回 HTTP {status}", status)
+        directory_url = f"{self.scheme}://{self.host}{self.base_path}/{urllib.parse.quote(remote_path)}"
+        return parse_directory_listing(data.decode("utf-8", "replace"), directory_url)
+
+    def search_assets(self, group_id):
+        """通过Nexus 3的搜索API列出groupId下的全部文件，返回{远程路径: sha1}
+
+        按页读取（每页最多数十个文件），仓库不是Nexus 3或API不可用时返回None。
+        """
+        prefix, marker, name = self.base_path.rpartition("/repository/")
+        if not marker or not name or "/" in name:
+            return None
+        assets = {}
+        token = None
+        while True:
+            query = {"repository": name, "maven.groupId": group_id}
+            if token:
+                query["continuationToken"] = token
+            url = f"{prefix}/service/rest/v1/search/assets?{urllib.parse.urlencode(query)}"
+            status, data = self._request("GET", "service/rest/v1/search/assets", url=url)
+            if status >= 300:
+                return None
+            try:
+                page = json.loads(data)
+                for item in page.get("items") or []:
+                    assets[item["path"].lstrip("/")] = (item.get("checksum") or {}).get("sha1")
+            except (ValueError, KeyError, TypeError, AttributeError):
+                return None
+            token = page.get("continuationToken")
+            if not token:
+                return assets
+
+    def put(self, remote_path, body, content_type="application/octet-stream", phase="upload"):
+        """上传文件内容，body可以是bytes、memoryview或已打开的文件对象；phase为记录耗时的阶段，None时不单独记录
+
+        文件和memoryview流式发送，发送构件文件时按块回调on_bytes。
+        """
+        headers = {"Content-Type": content_type}
+        if isinstance(body, (bytes, bytearray)):
+            size = len(body)
+            on_bytes = None
+        else:
+            size = len(body) if isinstance(body, memoryview) else os.fstat(body.fileno()).st_size
+            on_bytes = self._report_bytes if self.on_bytes else None
+        with span(phase) if phase else _NULL_SPAN as timing:
+            status, _ = self._request("PUT", remote_path, body=body, headers=headers, on_bytes=on_bytes)
+            timing.add_bytes(size)
+        if status >= 300:
+            raise DeployError(f"PUT {remote_path} 返回 HTTP {status}", status)
+        self.log(f"  ⬆️ 已上传: {remote_path}")
+
+    def _report_bytes(self, count):
+        """回调on_bytes，并累计当前线程正在部署的构件已报告的字节数"""
+        self._reported.count = getattr(self._reported, "count", 0) + count
+        self.on_bytes(count)
+
+    def _retract_bytes(self, count):
+        """部署失败时撤回该构件已报告的字节数，重试时不会重复计入进度"""
+        if count and self.on_bytes:
+            self.on_bytes(-count)
+
+    def put_with_checksums(self, remote_path, path=None, data=None, content_type="application/octet-stream",
+                           checksums=None, phase="upload"):
+        """上传文件及其校验文件（.md5/.sha1等），checksums为已计算好的摘要时不再重复读取文件"""
+        view = self.buffers.acquire(path) if path is not None and self.buffers is not None else None
+        if view is not None:
+            checksums = checksums or self.buffers.checksums(path)
+            try:
+                self.put(remote_path, view, content_type, phase)
+            finally:
+                self.buffers.release(path, view)
+        elif path is not None:
+            checksums = checksums or self._file_checksums(path)
+            with open(path, "rb") as f:
+                self.put(remote_path, f, content_type, phase)
+        else:
+            checksums = checksums or compute_checksums(data=data, algorithms=self.checksum_algorithms)
+            self.put(remote_path, data, content_type, phase)
+        for name in self.checksum_algorithms:
+            self.put(f"{remote_path}.{name}", checksums[name].encode("ascii"), "text/plain", phase)
+        return checksums
+
+    def _artifact_files(self, jar_path, pom_path, coordinates, file_version=None):
+        """构件的全部文件（主JAR、POM、附属构件和签名），返回[(本地文件, 远程路径, classifier, 扩展名)]
+
+        file_version为远程文件名中的版本（快照版本为时间戳版本），默认与版本号相同。
+        """
+        artifact_id = coordinates["artifactId"]
+        version = coordinates["version"]
+        version_path = f"{coordinates['groupId'].replace('.', '/')}/{artifact_id}/{version}"
+        file_version = file_version or version
+        files = []
+        if jar_path:
+            files.append((jar_path, "", Path(jar_path).suffix.lstrip(".") or "jar"))
+        files.append((pom_path, "", "pom"))
+        files.extend(find_attached_artifacts(jar_path, pom_path))
+        return [(path, f"{version_path}/{artifact_id}-{file_version}{'-' + classifier if classifier else ''}.{extension}",
+                 classifier, extension) for path, classifier, extension in files]
+
+    def release_files(self, jar_path, pom_path, coordinates):
+        """非快照版本的(本地文件, 远程路径)列表"""
+        return [(path, remote_path) for path, remote_path, _, _ in self._artifact_files(jar_path, pom_path, coordinates)]
+
+    def check_deployed(self, jar_path, pom_path, coordinates):
+        """检查构件是否已以相同内容部署，返回(是否已部署, {本地文件: 摘要})
+
+        先查本地索引（本地文件未变化时无需重新计算摘要），索引未命中时再读取远程的.sha1比对。
+        快照版本每次部署都会生成新的时间戳，始终视为未部署。
+        """
+        if coordinates["version"].endswith("-SNAPSHOT"):
+            return False, {}
+        gav = f"{coordinates['groupId']}:{coordinates['artifactId']}:{coordinates['version']}"
+        deployed = True
+        checksums = {}
+        for local_path, remote_path in self.release_files(jar_path, pom_path, coordinates):
+            file_name = remote_path.rsplit("/", 1)[-1]
+            stat = os.stat(local_path)
+            known = self.index.get(self.repository_url, gav, file_name) if self.index else None
+            if known and known[1] == stat.st_size and known[2] == stat.st_mtime_ns:
+                continue
+            checksums[local_path] = self._file_checksums(local_path)
+            if not deployed:
+                continue
+            sha1 = checksums[local_path]["sha1"]
+            if known and known[0] == sha1:
+                self.index.record(self.repository_url, gav, file_name, sha1, stat)
+                continue
+            if self.remote_sha1(remote_path) == sha1:
+                if self.index:
+                    self.index.record(self.repository_url, gav, file_name, sha1, stat)
+                continue
+            deployed = False
+        return deployed, checksums
+
+    def remote_sha1(self, remote_path):
+        """读取远程文件的.sha1校验值，不存在或无法读取时返回None"""
+        try:
+            with span("remote_check"):
+                data = self.get(f"{remote_path}.sha1")
+        except DeployError:
+            return None
+        if not data or not data.split():
+            return None
+        return data.split()[0].decode("ascii", "replace").lower()
+
+    def record_deployed(self, jar_path, pom_path, coordinates, checksums=None):
+        """部署成功后写入本地索引"""
+        if not self.index or coordinates["version"].endswith("-SNAPSHOT"):
+            return
+        checksums = checksums or {}
+        gav = f"{coordinates['groupId']}:{coordinates['artifactId']}:{coordinates['version']}"
+        for local_path, remote_path in self.release_files(jar_path, pom_path, coordinates):
+            digests = checksums.get(local_path) or self._file_checksums(local_path, ("sha1",))
+            self.index.record(self.repository_url, gav, remote_path.rsplit("/", 1)[-1],
+                              digests["sha1"], os.stat(local_path))
+
+    def _file_checksums(self, path, algorithms=None):
+        """本地文件的摘要，多仓库分发时取共享的计算结果"""
+        if self.buffers is not None:
+            return self.buffers.checksums(path)
+        return compute_checksums(path, algorithms=algorithms or self.checksum_algorithms)
+
+    def __call__(self, jar_path, pom_path):
+        return self.deploy(jar_path, pom_path)
+
+    def deploy(self, jar_path, pom_path, coordinates=None):
+        """部署一个JAR及其POM（连同附属构件和签名），并更新maven-metadata.xml；jar_path为None时只部署POM
+
+        返回{"path": 主文件远程路径, "skipped": 是否因已部署而跳过, "bytes": 上传的字节数}
+        """
+        coordinates = coordinates or read_pom_coordinates(pom_path)
+        outcome = self._deploy_files(jar_path, pom_path, coordinates)
+        checksums = outcome.pop("checksums", None)
+        reported = outcome.pop("reported", 0)
+        if not outcome["skipped"]:
+            try:
+                self.update_artifact_metadata(coordinates["groupId"], coordinates["artifactId"],
+                                              [coordinates["version"]])
+            except DeployError:
+                self._retract_bytes(reported)
+                raise
+            self.record_deployed(jar_path, pom_path, coordinates, checksums)
+        return outcome
+
+    def deploy_many(self, pairs):
+        """部署多个构件，返回与pairs一一对应的结果列表，每项为结果dict或异常
+
+        先上传全部构件文件，再按groupId:artifactId分组，每组只读取一次远程元数据、在本地合并所有新版本后写回一次，
+        O(版本数)次元数据往返变为每组一次；元数据写入成功后才记入部署索引。
+        """
+        outcomes = [None] * len(pairs)
+        groups = {}
+        for number, (jar, pom) in enumerate(pairs):
+            try:
+                coordinates = read_pom_coordinates(pom)
+                outcome = self._deploy_files(jar, pom, coordinates)
+            except (DeployError, OSError) as e:
+                outcomes[number] = e
+                continue
+            checksums = outcome.pop("checksums", None)
+            reported = outcome.pop("reported", 0)
+            outcomes[number] = outcome
+            if not outcome["skipped"]:
+                group = groups.setdefault((coordinates["groupId"], coordinates["artifactId"]), [])
+                group.append((number, jar, pom, coordinates, checksums, reported))
+        for (group_id, artifact_id), members in groups.items():
+            try:
+                self.update_artifact_metadata(group_id, artifact_id, [member[3]["version"] for member in members])
+            except DeployError as e:
+                for number, _, _, _, _, reported in members:
+                    outcomes[number] = e
+                    self._retract_bytes(reported)
+                continue
+            for _, jar, pom, coordinates, checksums, _ in members:
+                self.record_deployed(jar, pom, coordinates, checksums)
+        return outcomes
+
+    def _deploy_files(self, jar_path, pom_path, coordinates):
+        """上传构件文件及校验文件（快照版本同时更新版本级元数据），不更新artifact级元数据
+
+        返回的结果中额外包含"checksums"，供写入部署索引使用，以及"reported"（已报告给on_bytes的字节数）；
+        失败时撤回已报告的字节数。
+        """
+        gav = f"{coordinates['groupId']}:{coordinates['artifactId']}:{coordinates['version']}"
+        self._reported.count = 0
+        try:
+            with metrics_artifact(gav), span("deploy"):
+                outcome = self._upload_artifact(jar_path, pom_path, coordinates)
+        except BaseException:
+            self._retract_bytes(self._reported.count)
+            raise
+        outcome["reported"] = self._reported.count
+        return outcome
+
+    def _upload_artifact(self, jar_path, pom_path, coordinates):
+        """_deploy_files的实现"""
+        group_id = coordinates["groupId"]
+        artifact_id = coordinates["artifactId"]
+        version = coordinates["version"]
+        ga_path = f"{group_id.replace('.', '/')}/{artifact_id}"
+        version_path = f"{ga_path}/{version}"
+        extension = (Path(jar_path).suffix.lstrip(".") or "jar") if jar_path else "pom"
+
+        checksums = {}
+        self.on_state(jar_path, pom_path, "hashing")
+        if self.index is not None:
+            deployed, checksums = self.check_deployed(jar_path, pom_path, coordinates)
+            if deployed:
+                self.log(f"  ⏭️ 已部署且内容相同，跳过: {group_id}:{artifact_id}:{version}")
+                return {"path": f"{version_path}/{artifact_id}-{version}.{extension}", "skipped": True, "bytes": 0}
+
+        now = time.gmtime()
+        if version.endswith("-SNAPSHOT"):
+            snapshot = self._next_snapshot(version_path, now)
+            file_version = version[:-len("SNAPSHOT")] + f"{snapshot['timestamp']}-{snapshot['buildNumber']}"
+        else:
+            snapshot = None
+            file_version = version
+
+        # 附属构件和签名与主构件是一个整体：先一次算完全部摘要，再在同一个连接上依次上传，最后只更新一次元数据
+        files = self._artifact_files(jar_path, pom_path, coordinates, file_version)
+        for path, _, _, _ in files:
+            if path not in checksums:
+                checksums[path] = self._file_checksums(path)
+        self.on_state(jar_path, pom_path, "uploading")
+        for path, remote_path, _, file_extension in files:
+            content_type = "text/xml" if file_extension == "pom" else "application/octet-stream"
+            self.put_with_checksums(remote_path, path=path, content_type=content_type, checksums=checksums[path])
+
+        if snapshot:
+            snapshot["files"] = [(file_extension, classifier, file_version)
+                                 for _, _, classifier, file_extension in files]
+            with span("metadata"):
+                self._put_metadata(f"{version_path}/maven-metadata.xml",
+                                   build_snapshot_metadata(group_id, artifact_id, version, snapshot, now))
+        uploaded = sum(os.path.getsize(path) for path, _, _, _ in files)
+        return {"path": files[0][1], "skipped": False, "bytes": uploaded, "checksums": checksums}
+
+    def _next_snapshot(self, version_path, now):
+        """根据远程版本级元数据计算下一个快照时间戳和构建号"""
+        with span("metadata"):
+            existing = self.get(f"{version_path}/maven-metadata.xml")
+        build_number = 1
+        if existing:
+            try:
+                snapshot = _find_child(_find_child(ET.fromstring(existing), "versioning"), "snapshot")
+                build_number = int(_child_text(snapshot, "buildNumber") or 0) + 1
+            except (ET.ParseError, TypeError, ValueError):
+                pass
+        return {"timestamp": time.strftime("%Y%m%d.%H%M%S", now), "buildNumber": build_number}
+
+    def update_artifact_metadata(self, group_id, artifact_id, versions, now=None):
+        """把一个或多个新版本合并进远程的groupId:artifactId级maven-metadata.xml并写回（读改写期间持有该组的锁）"""
+        path = f"{group_id.replace('.', '/')}/{artifact_id}/maven-metadata.xml"
+        with self._metadata_locks_guard:
+            lock = self._metadata_locks.setdefault(path, threading.Lock())
+        with lock, span("metadata"):
+            existing = self.get(path)
+            merged = merge_artifact_metadata(existing, group_id, artifact_id, versions, now or time.gmtime())
+            self._put_metadata(path, merged)
+
+    def _put_metadata(self, remote_path, content):
+        """上传元数据文件及其校验文件（耗时计入调用方的metadata阶段）"""
+        self.put_with_checksums(remote_path, data=content, content_type="text/xml", phase=None)
+
+
+def maven_version_key(version):
+    """版本号的排序键：按.和-拆分，数字按数值比较，限定词（alpha/beta/rc/SNAPSHOT等）排在正式版本之前
+
+    数字段末尾的0忽略（1.0与1.0.0相同，1.0-SNAPSHOT排在1.0之前），未知的限定词排在正式版本之后并按字母比较。
+    """
+    import re
+
+    qualifiers = {"alpha": 0, "a": 0, "beta": 1, "b": 1, "milestone": 2, "m": 2, "rc": 3, "cr": 3, "snapshot": 4,
+                  "ga": 5, "final": 5, "release": 5, "sp": 6}
+    key = []
+    for token in re.findall(r"\d+|[a-zA-Z]+", version) + [None]:
+        if token is not None and token.isdigit():
+            key.append((1, int(token), ""))
+            continue
+        while key and key[-1] == (1, 0, ""):
+            key.pop()
+        if token is None:
+            key.append((0, 5, ""))
+        else:
+            rank = qualifiers.get(token.lower())
+            key.append((0, rank, "") if rank is not None else (0, 5, token.lower()))
+    return key
+
+
+def merge_artifact_metadata(existing, group_id, artifact_id, new_versions, now):
+    """将新版本合并进已有的artifact级元数据，返回新的XML内容"""
+    versions = []
+    latest = release = ""
+    if existing:
+        try:
+            versioning = _find_child(ET.fromstring(existing), "versioning")
+        except ET.ParseError:
+            versioning = None
+        if versioning is not None:
+            latest = _child_text(versioning, "latest")
+            release = _child_text(versioning, "release")
+            versions_element = _find_child(versioning, "versions")
+            if versions_element is not None:
+                versions = [(v.text or "").strip() for v in versions_element if (v.text or "").strip()]
+
+    # latest/release取最高的版本，一批中版本的先后顺序（如目录遍历顺序）不影响结果
+    for version in sorted(new_versions, key=maven_version_key):
+        if version not in versions:
+            versions.append(version)
+        if not latest or maven_version_key(version) > maven_version_key(latest):
+            latest = version
+        if not version.endswith("-SNAPSHOT") and (not release or maven_version_key(version) > maven_version_key(release)):
+            release = version
+
+    root = ET.Element("metadata")
+    ET.SubElement(root, "groupId").text = group_id
+    ET.SubElement(root, "artifactId").text = artifact_id
+    versioning = ET.SubElement(root, "versioning")
+    if latest:
+        ET.SubElement(versioning, "latest").text = latest
+    if release:
+        ET.SubElement(versioning, "release").text = release
+    versions_element = ET.SubElement(versioning, "versions")
+    for version in versions:
+        ET.SubElement(versions_element, "version").text = version
+    ET.SubElement(versioning, "lastUpdated").text = time.strftime("%Y%m%d%H%M%S", now)
+    return _xml_bytes(root)
+
+
+def build_snapshot_metadata(group_id, artifact_id, version, snapshot, now):
+    """生成快照版本级的maven-metadata.xml"""
+    updated = time.strftime("%Y%m%d%H%M%S", now)
+    root = ET.Element("metadata", modelVersion="1.1.0")
+    ET.SubElement(root, "groupId").text = group_id
+    ET.SubElement(root, "artifactId").text = artifact_id
+    ET.SubElement(root, "version").text = version
+    versioning = ET.SubElement(root, "versioning")
+    snapshot_element = ET.SubElement(versioning, "snapshot")
+    ET.SubElement(snapshot_element, "timestamp").text = snapshot["timestamp"]
+    ET.SubElement(snapshot_element, "buildNumber").text = str(snapshot["buildNumber"])
+    ET.SubElement(versioning, "lastUpdated").text = updated
+    snapshot_versions = ET.SubElement(versioning, "snapshotVersions")
+    for extension, classifier, value in snapshot["files"]:
+        item = ET.SubElement(snapshot_versions, "snapshotVersion")
+        if classifier:
+            ET.SubElement(item, "classifier").text = classifier
+        ET.SubElement(item, "extension").text = extension
+        ET.SubElement(item, "value").text = value
+        ET.SubElement(item, "updated").text = updated
+    return _xml_bytes(root)
+
+
+def _xml_bytes(root):
+    """序列化XML元素为带声明的UTF-8字节"""
+    return b'<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(root, encoding="unicode").encode("utf-8")
+
+
+def parse_directory_listing(html, directory_url):
+    """从目录页面中提取directory_url的直接子项名称（目录以/结尾），忽略上级目录、排序链接等"""
+    from html.parser import HTMLParser
+
+    links = []
+
+    class LinkParser(HTMLParser):
+        def handle_starttag(self, tag, attrs):
+            if tag == "a":
+                href = dict(attrs).get("href")
+                if href:
+                    links.append(href)
+
+    LinkParser().feed(html)
+    base = urllib.parse.urlsplit(directory_url).path
+    names = []
+    for href in links:
+        path = urllib.parse.urlsplit(urllib.parse.urljoin(directory_url, href)).path
+        if not path.startswith(base):
+            continue
+        name = urllib.parse.unquote(path[len(base):])
+        if name and "/" not in name.rstrip("/") and name not in names:
+            names.append(name)
+    return names
+
+
+# ==================== Maven命令 ====================
+
+# 一次Maven调用中最多合并部署的构件数
+MAVEN_BATCH_SIZE = 50
+MAVEN_DEPLOY_PLUGIN_VERSION = "3.1.1"
+
+
+def find_attached_artifacts(jar_path, pom_path=None):
+    """查找与主构件同目录、同坐标的附属构件，与主构件作为一个整体部署
+
+    包括带classifier的JAR（如-sources.jar、-javadoc.jar、-tests.jar、-natives-linux.jar），
+    以及主JAR、POM和这些JAR的.asc签名文件。返回[(路径, classifier, type)]，签名的classifier与被签名的文件相同、
+    type为被签名文件的类型加.asc（如jar.asc、pom.asc）；有自己POM的同名文件（如foo-1.0-beta.jar）是另一个版本，不会计入。
+    """
+    if not jar_path and not pom_path:
+        return []
+    import glob
+
+    main_files = []
+    attachments = []
+    if jar_path:
+        jar = Path(jar_path)
+        main_files.append((jar_path, "", jar.suffix.lstrip(".") or "jar"))
+        for sibling in sorted(jar.parent.glob(glob.escape(jar.stem) + "-*.jar")):
+            if sibling.with_suffix(".pom").exists():
+                continue
+            attachments.append((str(sibling), sibling.stem[len(jar.stem) + 1:], "jar"))
+    if pom_path:
+        main_files.append((pom_path, "", "pom"))
+    for path, classifier, file_type in main_files + attachments:
+        signature = Path(f"{path}.asc")
+        if signature.is_file():
+            attachments.append((str(signature), classifier, f"{file_type}.asc"))
+    return attachments
+
+
+def locate_mvnd():
+    """查找Maven守护进程mvnd（复用常驻JVM，避免每次启动Maven），找不到时返回None"""
+    import shutil
+
+    mvnd_home = os.getenv("MVND_HOME")
+    if mvnd_home:
+        # bin目录中同时有Windows批处理mvnd.cmd和Unix脚本mvnd，只检查当前系统能执行的
+        for name in (("mvnd.cmd", "mvnd") if os.name == "nt" else ("mvnd",)):
+            path = os.path.join(mvnd_home, "bin", name)
+            if os.path.isfile(path):
+                return path
+    return shutil.which("mvnd")
+
+
+def _maven_extra_args(mvn_executable):
+    """不同Maven启动器需要的额外参数"""
+    if os.path.basename(mvn_executable).lower().startswith("mvnd"):
+        # mvnd默认输出为交互式的滚动界面，改为原始输出以便逐行解析
+        return ["--raw-streams"]
+    return []
+
+
+def build_maven_deploy_command(mvn_executable, jar_path, pom_path, repository_id, repository_url,
+                               attachments=None):
+    """构建mvn deploy:deploy-file命令；jar_path为None时只部署POM，attachments为附属构件"""
+    maven_cmd = [
+        mvn_executable, "deploy:deploy-file",
+        f"-Dfile={jar_path or pom_path}",
+        f"-DpomFile={pom_path}",
+        f"-DrepositoryId={repository_id}",
+        f"-Durl={repository_url}"
+    ]
+    if attachments:
+        maven_cmd += [
+            "-Dfiles=" + ",".join(path for path, _, _ in attachments),
+            "-Dclassifiers=" + ",".join(classifier for _, classifier, _ in attachments),
+            "-Dtypes=" + ",".join(file_type for _, _, file_type in attachments),
+        ]
+    return maven_cmd + _maven_extra_args(mvn_executable)
+
+
+def build_maven_batch_pom(units, repository_id, repository_url):
+    """生成一个临时POM，每个构件对应一个deploy-file执行，一次Maven调用即可部署全部构件
+
+    units为[(jar, pom, attachments)]，执行ID为artifact-<序号>。
+    """
+    project = ET.Element("project", xmlns="http://maven.apache.org/POM/4.0.0")
+    for name, value in (("modelVersion", "4.0.0"), ("groupId", "maven-uploader"),
+                        ("artifactId", "maven-uploader-batch"), ("version", "1"), ("packaging", "pom")):
+        ET.SubElement(project, name).text = value
+    plugin = ET.SubElement(ET.SubElement(ET.SubElement(project, "build"), "plugins"), "plugin")
+    ET.SubElement(plugin, "groupId").text = "org.apache.maven.plugins"
+    ET.SubElement(plugin, "artifactId").text = "maven-deploy-plugin"
+    ET.SubElement(plugin, "version").text = MAVEN_DEPLOY_PLUGIN_VERSION
+    executions = ET.SubElement(plugin, "executions")
+    for number, (jar, pom, attachments) in enumerate(units):
+        execution = ET.SubElement(executions, "execution")
+        ET.SubElement(execution, "id").text = f"artifact-{number}"
+        ET.SubElement(execution, "phase").text = "validate"
+        ET.SubElement(ET.SubElement(execution, "goals"), "goal").text = "deploy-file"
+        configuration = ET.SubElement(execution, "configuration")
+        ET.SubElement(configuration, "file").text = str(jar or pom)
+        ET.SubElement(configuration, "pomFile").text = str(pom)
+        ET.SubElement(configuration, "repositoryId").text = repository_id
+        ET.SubElement(configuration, "url").text = repository_url
+        if attachments:
+            ET.SubElement(configuration, "files").text = ",".join(path for path, _, _ in attachments)
+            ET.SubElement(configuration, "classifiers").text = ",".join(c for _, c, _ in attachments)
+            ET.SubElement(configuration, "types").text = ",".join(t for _, _, t in attachments)
+    return _xml_bytes(project)
+
+
+def run_maven_deploy(maven_cmd, on_output=None):
+    """执行Maven部署命令，逐行回调输出，返回退出码
+
+    启用阶段统计时记录Maven进程的总耗时，以及从启动到第一行输出的时间（近似为JVM启动耗时）；
+    没有任何输出就退出或启动失败时，jvm_startup记录到进程结束（或出错）为止。
+    """
+    import subprocess
+
+    with span("maven_process"):
+        startup = span("jvm_startup").__enter__()
+        try:
+            process = subprocess.Popen(
+                maven_cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                shell=(os.name == "nt")  # 在Windows上使用shell=True执行mvn.cmd
+            )
+            for output in process.stdout:
+                if startup:
+                    startup.__exit__(None, None, None)
+                    startup = None
+                if on_output and output.strip():
+                    on_output(output.strip())
+            return process.wait()
+        finally:
+            if startup:
+                startup.__exit__(None, None, None)
+
+
+# Maven输出中表示网络类临时错误的关键字
+MAVEN_TRANSIENT_PATTERNS = ("Connection reset", "Connection refused", "Read timed out", "connect timed out",
+                            "Broken pipe", "Remote host terminated", "No route to host")
+
+# 从Maven输出解析出的事件类型
+MAVEN_EVENT_EXECUTION = "execution"      # 开始执行一个deploy-file（批量POM中execution为artifact-<序号>的序号）
+MAVEN_EVENT_UPLOADING = "uploading"      # 开始上传一个文件（url）
+MAVEN_EVENT_UPLOADED = "uploaded"        # 一个文件上传完成（url、bytes、rate）
+MAVEN_EVENT_HTTP_STATUS = "http_status"  # 仓库返回的HTTP错误状态码（status）
+MAVEN_EVENT_SUCCESS = "build_success"
+MAVEN_EVENT_FAILURE = "build_failure"
+MAVEN_EVENT_ERROR = "error"              # 其他[ERROR]行（transient表示是否像网络类临时错误）
+
+# 常见HTTP状态码对应的错误说明；409表示仓库中已有该文件且不允许覆盖，按已部署跳过
+MAVEN_STATUS_HINTS = {
+    401: "认证失败，请检查settings.xml中与仓库ID同名的server",
+    403: "没有向该仓库部署的权限",
+    409: "仓库中已存在该版本且不允许覆盖",
+    413: "文件超过仓库或反向代理允许的上传大小",
+}
+# 出错时错误信息中保留的最后几行输出
+MAVEN_ERROR_TAIL_LINES = 10
+
+_MAVEN_SIZE_UNITS = {"B": 1, "kB": 1000, "KB": 1000, "MB": 1000 ** 2, "GB": 1000 ** 3}
+
+
+class MavenEvent:
+    """从一行Maven输出解析出的事件，kind为MAVEN_EVENT_*之一，未用到的字段为None"""
+
+    __slots__ = ("kind", "line", "url", "bytes", "rate", "status", "execution", "transient")
+
+    def __init__(self, kind, line, url=None, size=None, rate=None, status=None, execution=None, transient=False):
+        self.kind = kind
+        self.line = line
+        self.url = url
+        self.bytes = size
+        # 上传速率（字节/秒），Maven没有输出时为None
+        self.rate = rate
+        self.status = status
+        self.execution = execution
+        self.transient = transient
+
+    @property
+    def counted(self):
+        """是否为计入进度的构件文件（校验文件和maven-metadata.xml不计入，与本地统计的总量口径一致）"""
+        return bool(self.url) and not self.url.endswith((".md5", ".sha1", ".sha256", ".sha512", "maven-metadata.xml"))
+
+
+class MavenOutputParser:
+    """把Maven输出逐行解析为MavenEvent，同时累计上传的文件数、字节数、最后的HTTP状态码和构建结果
+
+    每行只做几次子串判断和至多一次预编译的正则匹配，只保留最后几行输出，开销与输出的总行数无关；
+    在读取Maven输出的工作线程中调用，不占用界面线程。
+    """
+
+    _patterns = None
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        # 当前deploy-file执行中已上传的字节数，该构件失败时据此撤回进度
+        self.execution_bytes = 0
+        self.status = None
+        # 构建结果：MAVEN_EVENT_SUCCESS、MAVEN_EVENT_FAILURE或None（尚未结束）
+        self.result = None
+        self.transient = False
+        self.tail = collections.deque(maxlen=MAVEN_ERROR_TAIL_LINES)
+
+    @classmethod
+    def _compiled(cls):
+        if cls._patterns is None:
+            import re
+
+            size = r"([\d.,]+) (B|kB|KB|MB|GB)"
+            cls._patterns = {
+                "execution": re.compile(r"deploy-file \((?:artifact-(\d+)|[^)]*)\)"),
+                "uploading": re.compile(r"Uploading(?: to [^:]+)?: (\S+)"),
+                "uploaded": re.compile(r"Uploaded(?: to [^:]+)?: (\S+) \(" + size + r"(?: at " + size + r"/s)?"),
+                "status": re.compile(r"(?:status code|Return code is|status):? (\d{3})|"
+                                     r"(?:Transfer failed for|Failed to transfer file:?) \S+ (\d{3})"),
+            }
+        return cls._patterns
+
+    @staticmethod
+    def _size(number, unit):
+        return int(float(number.replace(",", "")) * _MAVEN_SIZE_UNITS[unit])
+
+    @classmethod
+    def parse_line(cls, line):
+        """解析一行输出，返回MavenEvent；与上传无关的行返回None"""
+        patterns = cls._compiled()
+        if "--- " in line and "deploy-file (" in line:
+            match = patterns["execution"].search(line)
+            if match:
+                execution = int(match.group(1)) if match.group(1) else None
+                return MavenEvent(MAVEN_EVENT_EXECUTION, line, execution=execution)
+        if "Uploaded" in line:
+            match = patterns["uploaded"].search(line)
+            if match:
+                rate = cls._size(match.group(4), match.group(5)) if match.group(4) else None
+                return MavenEvent(MAVEN_EVENT_UPLOADED, line, url=match.group(1),
+                                  size=cls._size(match.group(2), match.group(3)), rate=rate)
+        if "Uploading" in line:
+            match = patterns["uploading"].search(line)
+            if match:
+                return MavenEvent(MAVEN_EVENT_UPLOADING, line, url=match.group(1))
+        if "BUILD SUCCESS" in line:
+            return MavenEvent(MAVEN_EVENT_SUCCESS, line)
+        if "BUILD FAILURE" in line:
+            return MavenEvent(MAVEN_EVENT_FAILURE, line)
+        if "status" in line or "Return code" in line or "ransfer" in line:
+            match = patterns["status"].search(line)
+            if match:
+                return MavenEvent(MAVEN_EVENT_HTTP_STATUS, line, status=int(match.group(1) or match.group(2)))
+        if "[ERROR]" in line:
+            transient = any(pattern in line for pattern in MAVEN_TRANSIENT_PATTERNS)
+            return MavenEvent(MAVEN_EVENT_ERROR, line, transient=transient)
+        return None
+
+    def feed(self, line):
+        """解析一行输出并更新统计，返回MavenEvent或None"""
+        self.tail.append(line)
+        event = self.parse_line(line)
+        if event is None:
+            return None
+        if event.kind == MAVEN_EVENT_UPLOADED and event.counted:
+            self.files += 1
+            self.bytes += event.bytes
+            self.execution_bytes += event.bytes
+        elif event.kind == MAVEN_EVENT_EXECUTION:
+            self.execution_bytes = 0
+        elif event.kind == MAVEN_EVENT_HTTP_STATUS:
+            self.status = event.status
+        elif event.kind in (MAVEN_EVENT_SUCCESS, MAVEN_EVENT_FAILURE):
+            self.result = event.kind
+        elif event.kind == MAVEN_EVENT_ERROR and event.transient:
+            self.transient = True
+        return event
+
+    @property
+    def already_deployed(self):
+        """仓库是否以409拒绝覆盖已有文件"""
+        return self.status == 409
+
+    def summary(self):
+        """一行错误概要，已知状态码时附带说明"""
+        hint = MAVEN_STATUS_HINTS.get(self.status)
+        if hint:
+            return f"Maven返回错误（HTTP {self.status}：{hint}）"
+        return f"Maven返回错误（HTTP {self.status}）" if self.status else "Maven返回错误"
+
+    def error(self):
+        """根据已解析的输出构造DeployError：带仓库返回的HTTP状态码及说明，没有状态码时判断是否为可重试的临时错误"""
+        return DeployError(self.summary() + ":\n    " + "\n    ".join(self.tail), self.status,
+                           None if self.status is not None else self.transient)
+
+
+class MavenDeployer:
+    """通过Maven部署构件，可作为deploy_func(jar, pom)使用
+
+    deploy_many()把多个构件（连同各自的sources/javadoc等附属构件）合并到一次Maven调用中，
+    N个构件只需启动一次JVM；配合mvnd时连这一次启动也可以省掉。
+    """
+
+    def __init__(self, mvn_executable, repository_id, repository_url, checker=None,
+                 batch_size=MAVEN_BATCH_SIZE, log=None, on_bytes=None, on_state=None):
+        self.mvn_executable = mvn_executable
+        # 从Maven的Uploaded输出中解析出字节数后回调，用于显示进度
+        self.on_bytes = on_bytes
+        # 构件进入hashing/uploading阶段时回调on_state(jar, pom, state)
+        self.on_state = on_state or (lambda jar, pom, state: None)
+        self.repository_id = repository_id
+        self.repository_url = repository_url
+        self.checker = checker
+        self.batch_size = max(1, int(batch_size))
+        # 每个并发任务是一个Maven进程，BatchUploader的并发数不超过CPU核数
+        self.max_workers = os.cpu_count() or 1
+        self.log = log or (lambda message: None)
+
+    def __call__(self, jar, pom):
+        """部署单个构件，失败时抛出DeployError"""
+        outcome = self.deploy_many([(jar, pom)])[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def deploy_many(self, pairs):
+        """部署多个构件，返回与pairs一一对应的结果列表，每项为结果dict或异常"""
+        outcomes = [None] * len(pairs)
+        coordinates = {}
+        checksums = {}
+        pending = []
+        for number, (jar, pom) in enumerate(pairs):
+            if self.checker:
+                self.on_state(jar, pom, "hashing")
+                try:
+                    coordinates[number] = read_pom_coordinates(pom)
+                    deployed, checksums[number] = self.checker.check_deployed(jar, pom, coordinates[number])
+                except (DeployError, OSError) as e:
+                    outcomes[number] = e
+                    continue
+                if deployed:
+                    outcomes[number] = {"skipped": True, "bytes": 0}
+                    continue
+            pending.append(number)
+
+        while pending:
+            units = [(pairs[n][0], pairs[n][1], find_attached_artifacts(*pairs[n])) for n in pending]
+            for jar, pom, _ in units:
+                self.on_state(jar, pom, "uploading")
+            succeeded, failed_at, parser = self._run(units)
+            for position in range(succeeded):
+                number = pending[position]
+                jar, pom = pairs[number]
+                files = [jar, pom] + [path for path, _, _ in units[position][2]]
+                outcomes[number] = {"skipped": False, "bytes": sum(os.path.getsize(p) for p in files if p)}
+                if self.checker:
+                    self.checker.record_deployed(jar, pom, coordinates[number], checksums.get(number))
+            if failed_at is None:
+                break
+            error = parser.error()
+            # 失败的构件已上传的部分文件会在重试时重新上传（或按跳过/失败计入完成量），先撤回其进度
+            if self.on_bytes and parser.execution_bytes:
+                self.on_bytes(-parser.execution_bytes)
+            if failed_at < 0:
+                # 还没执行到任何构件就失败了（如插件无法下载），整批都视为失败
+                for number in pending[succeeded:]:
+                    outcomes[number] = error
+                break
+            if parser.already_deployed:
+                # 仓库中已有该版本且不允许覆盖（HTTP 409），视为已部署而不是失败
+                jar, pom = pairs[pending[failed_at]]
+                self.log(f"  ⏭️ 仓库中已存在（HTTP 409），跳过: {jar or pom}")
+                outcomes[pending[failed_at]] = {"skipped": True, "bytes": 0}
+            else:
+                outcomes[pending[failed_at]] = error
+            # 一次调用中某个构件失败后Maven会停止，后面的构件重新发起一次调用
+            pending = pending[failed_at + 1:]
+        return outcomes
+
+    def _run(self, units):
+        """执行一次Maven调用，返回(成功的构件数, 失败构件的位置或None, MavenOutputParser)；位置为-1表示未开始部署就失败"""
+        import tempfile
+
+        parser = MavenOutputParser()
+        started = []
+
+        def on_output(line):
+            event = parser.feed(line)
+            if event is None:
+                return
+            if event.kind == MAVEN_EVENT_EXECUTION and event.execution is not None:
+                started.append(event.execution)
+            elif event.kind == MAVEN_EVENT_UPLOADED and event.counted and self.on_bytes:
+                self.on_bytes(event.bytes)
+
+        if len(units) == 1:
+            jar, pom, attachments = units[0]
+            maven_cmd = build_maven_deploy_command(self.mvn_executable, jar, pom, self.repository_id,
+                                                   self.repository_url, attachments)
+            if run_maven_deploy(maven_cmd, on_output) == 0:
+                return 1, None, parser
+            return 0, 0, parser
+
+        with tempfile.TemporaryDirectory(prefix="maven-uploader-") as temp_dir:
+            batch_pom = os.path.join(temp_dir, "pom.xml")
+            with open(batch_pom, "wb") as f:
+                f.write(build_maven_batch_pom(units, self.repository_id, self.repository_url))
+            self.log(f"🚀 一次Maven调用部署 {len(units)} 个构件")
+            maven_cmd = [self.mvn_executable, "-B", "-f", batch_pom, "validate"]
+            return_code = run_maven_deploy(maven_cmd + _maven_extra_args(self.mvn_executable), on_output)
+        if return_code == 0:
+            return len(units), None, parser
+        if not started:
+            return 0, -1, parser
+        return started[-1], started[-1], parser
+
+
+# ==================== Maven环境检测 ====================
+
+MAVEN_CACHE_FILE = APP_STATE_DIR / "maven-cache.json"
+
+COMMON_MAVEN_PATHS = [
+    r"C:\Program Files\Apache\maven\bin\mvn.cmd",
+    r"C:\Program Files (x86)\Apache\maven\bin\mvn.cmd",
+    r"C:\apache-maven\bin\mvn.cmd",
+    r"C:\maven\bin\mvn.cmd",
+    r"D:\apache-maven\bin\mvn.cmd",
+    r"D:\maven\bin\mvn.cmd",
+    r"D:\Maven\bin\mvn.cmd",
+    r"C:\Users\{}\apache-maven\bin\mvn.cmd".format(os.getenv('USERNAME', '')),
+    r"C:\Users\{}\maven\bin\mvn.cmd".format(os.getenv('USERNAME', '')),
+]
+
+
+def probe_maven_executable():
+    """并行检查所有候选位置，返回(优先级最高的Maven路径, [(检查项, 结果)])"""
+    import shutil
+    from concurrent.futures import ThreadPoolExecutor
+
+    def exists(path):
+        return path if os.path.isfile(path) else None
+
+    # 优先级：MAVEN_HOME > PATH > 常见安装目录（Windows）
+    # Maven的bin目录中同时有Windows批处理mvn.cmd和Unix脚本mvn，非Windows系统上不能选中mvn.cmd
+    checks = []
+    maven_home = os.getenv('MAVEN_HOME')
+    if maven_home:
+        path = os.path.join(maven_home, 'bin', "mvn.cmd" if os.name == "nt" else "mvn")
+        checks.append((f"MAVEN_HOME: {path}", lambda path=path: exists(path)))
+    checks.append(("PATH中的mvn命令", lambda: shutil.which("mvn")))
+    if os.name == "nt":
+        for path in COMMON_MAVEN_PATHS:
+            checks.append((path, lambda path=path: exists(path)))
+
+    with ThreadPoolExecutor(max_workers=min(8, len(checks))) as executor:
+        results = list(executor.map(lambda check: check[1](), checks))
+    probes = [(label, result) for (label, _), result in zip(checks, results)]
+    found = next((result for _, result in probes if result), None)
+    return found, probes
+
+
+def read_maven_version(mvn_executable, timeout=30):
+    """运行mvn -v读取Maven版本号，失败时返回空字符串"""
+    import subprocess
+
+    try:
+        completed = subprocess.run(
+            [mvn_executable, "-v"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            timeout=timeout,
+            shell=(os.name == "nt")  # Windows上的mvn.cmd需要通过shell执行
+        )
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    for line in completed.stdout.splitlines():
+        if line.startswith("Apache Maven"):
+            return line.split("(")[0].replace("Apache Maven", "").strip()
+    return ""
+
+
+def _maven_environment_key():
+    """影响Maven查找结果的环境变量摘要，变化时缓存失效"""
+    env = os.getenv("MAVEN_HOME", "") + "\0" + os.getenv("PATH", "")
+    return hashlib.sha1(env.encode("utf-8", "replace")).hexdigest()
+
+
+def _load_maven_cache():
+    """读取磁盘上的Maven检测缓存"""
+    try:
+        with open(MAVEN_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_maven_cache(entry):
+    """原子地写入Maven检测缓存"""
+    try:
+        MAVEN_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = MAVEN_CACHE_FILE.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, MAVEN_CACHE_FILE)
+    except OSError:
+        pass
+
+
+def locate_maven(use_cache=True, with_version=True):
+    """查找Maven并返回{"path", "version", "from_cache", "probes"}
+
+    结果缓存在磁盘上，Maven文件的修改时间或MAVEN_HOME/PATH变化时重新检测。
+    """
+    with span("maven_discovery"):
+        return _locate_maven(use_cache, with_version)
+
+
+def _locate_maven(use_cache, with_version):
+    """locate_maven的实现"""
+    env_key = _maven_environment_key()
+    if use_cache:
+        cached = _load_maven_cache()
+        # 旧版本在非Windows系统上可能缓存了mvn.cmd，这种结果重新检测
+        if cached and cached.get("env") == env_key and cached.get("path") and \
+                (os.name == "nt" or not cached["path"].lower().endswith(".cmd")):
+            try:
+                valid = os.stat(cached["path"]).st_mtime_ns == cached.get("mtime_ns")
+            except OSError:
+                valid = False
+            if valid:
+                if with_version and not cached.get("version"):
+                    cached["version"] = read_maven_version(cached["path"])
+                    _save_maven_cache(cached)
+                cached.update(from_cache=True, probes=[])
+                return cached
+
+    path, probes = probe_maven_executable()
+    entry = {"path": path, "version": "", "mtime_ns": None, "env": env_key}
+    if path:
+        entry["mtime_ns"] = os.stat(path).st_mtime_ns
+        if with_version:
+            entry["version"] = read_maven_version(path)
+        _save_maven_cache(entry)
+    entry.update(from_cache=False, probes=probes)
+    return entry
+
+
+def create_deploy_func(mode, repository_id, repository_url, mvn_executable=None,
+                       checksum_algorithms=DEFAULT_CHECKSUM_ALGORITHMS, index=None, log=None,
+                       maven_batch_size=MAVEN_BATCH_SIZE, on_bytes=None, on_state=None,
+                       pool_size=HTTP_POOL_SIZE, idle_timeout=HTTP_IDLE_TIMEOUT, buffers=None, limiter=None):
+    """根据上传方式创建deploy_func(jar, pom)，部署失败时抛出DeployError
+
+    原生方式返回HttpDeployer，同一groupId:artifactId的多个版本合并更新元数据；
+    Maven方式需要传入mvn_executable（可以是mvnd），返回的MavenDeployer支持多个构件合并到一次Maven调用；
+    设置index时两种方式都会跳过内容相同的已部署构件；on_bytes(n)在发送构件文件内容时回调；
+    on_state(jar, pom, state)在构件进入hashing/uploading阶段时回调（如UploadJournal.mark）；
+    pool_size/idle_timeout为HTTP连接池的空闲连接数和空闲超时，一般设为并发数；
+    buffers为多个仓库目标共享的SharedFileBuffers（原生方式上传和两种方式的摘要计算都使用它）；
+    limiter为全局带宽上限（TokenBucket），Maven进程的上传无法限速，只对原生方式生效。
+    """
+    if mode == DEPLOY_MODE_NATIVE:
+        credentials = load_maven_credentials(repository_id)
+        return HttpDeployer(repository_url, credentials, log=log, checksum_algorithms=checksum_algorithms,
+                            index=index, on_bytes=on_bytes, on_state=on_state, pool_size=pool_size,
+                            idle_timeout=idle_timeout, buffers=buffers, limiter=limiter)
+
+    # Maven方式同样可以先通过HTTP检查远程是否已有相同内容
+    checker = None
+    if index is not None:
+        try:
+            credentials = load_maven_credentials(repository_id)
+        except DeployError:
+            credentials = None
+        checker = HttpDeployer(repository_url, credentials, index=index, pool_size=pool_size,
+                               idle_timeout=idle_timeout, buffers=buffers)
+    return MavenDeployer(mvn_executable, repository_id, repository_url, checker, maven_batch_size, log, on_bytes,
+                         on_state)
+
+
+def connection_stats(deploy_func):
+    """deploy_func所用HTTP连接池的统计（Maven方式为检查已部署时的连接），没有使用连接池时返回None"""
+    deployer = getattr(deploy_func, "__self__", deploy_func)
+    if isinstance(deployer, MavenDeployer):
+        deployer = deployer.checker
+    pool = getattr(deployer, "pool", None)
+    return pool.stats() if pool else None
+
+
+def remote_checker(deploy_func, repository_id, repository_url):
+    """用于检查远程仓库中是否已有构件的HttpDeployer：复用deploy_func的连接，deploy_func为None或Maven方式没有时新建"""
+    deployer = getattr(deploy_func, "__self__", deploy_func)
+    if isinstance(deployer, MavenDeployer):
+        deployer = deployer.checker
+    if isinstance(deployer, HttpDeployer):
+        return deployer
+    try:
+        credentials = load_maven_credentials(repository_id)
+    except DeployError:
+        credentials = None
+    return HttpDeployer(repository_url, credentials)
+
+
+# ==================== JAR内嵌POM ====================
+
+EMBEDDED_POM_DIR = APP_STATE_DIR / "embedded-poms"
+# 提取结果的格式版本，变化后旧缓存中的POM文件重新提取
+EMBEDDED_POM_FORMAT = 2
+
+
+def _parse_properties(data):
+    """解析pom.properties（key=value格式，#开头为注释）"""
+    properties = {}
+    for line in data.decode("utf-8", "replace").splitlines():
+        line = line.strip()
+        if not line or line.startswith(("#", "!")) or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        properties[key.strip()] = value.strip()
+    return properties
+
+
+def read_embedded_pom(jar_path):
+    """从JAR中读取Maven打包时写入的META-INF/maven/<g>/<a>/pom.xml和pom.properties
+
+    只读取ZIP中央目录和这两个条目，不解压整个JAR。返回(pom内容, 坐标)，没有内嵌POM时返回None；
+    pom.properties中的坐标是已解析过属性的值，优先使用。
+    """
+    import io
+    import zipfile
+
+    try:
+        with zipfile.ZipFile(jar_path) as jar:
+            names = [name for name in jar.namelist()
+                     if name.startswith("META-INF/maven/") and name.endswith("/pom.xml") and name.count("/") == 4]
+            if not names:
+                return None
+            # 合并了多个模块的JAR（shade等）中有多份POM，取artifactId与文件名最匹配的一份
+            stem = Path(jar_path).stem
+            names.sort(key=lambda name: (not stem.startswith(name.split("/")[3] + "-"),
+                                         -len(name.split("/")[3]), name))
+            pom_data = jar.read(names[0])
+            properties_name = names[0][:-len("pom.xml")] + "pom.properties"
+            properties = _parse_properties(jar.read(properties_name)) if properties_name in jar.NameToInfo else {}
+    except (zipfile.BadZipFile, OSError, KeyError):
+        return None
+    try:
+        coordinates = scan_pom_coordinates(io.BytesIO(pom_data))
+    except ET.ParseError:
+        return None
+    for key in ("groupId", "artifactId", "version"):
+        if properties.get(key):
+            coordinates[key] = properties[key]
+    if not coordinates["artifactId"] or not coordinates["version"]:
+        return None
+    return pom_data, coordinates
+
+
+def pin_pom_coordinates(pom_data, coordinates):
+    """把POM中的顶层groupId/artifactId/version改写为已解析的坐标，返回新的POM内容
+
+    内嵌POM中的坐标可能是${revision}、${project.version}等属性（CI友好版本），部署和预检时无法解析；
+    pom.properties中的坐标是打包时解析后的值，写回POM后提取出的文件可以像普通POM一样使用。
+    坐标本来就一致时原样返回。
+    """
+    import io
+
+    root = ET.fromstring(pom_data)
+    namespace = root.tag[:root.tag.index("}") + 1] if root.tag.startswith("{") else ""
+    parent = _find_child(root, "parent")
+    # 缺少的坐标依次插入到parent之后（没有parent时放在最前面），与Maven约定的元素顺序一致
+    position = list(root).index(parent) + 1 if parent is not None else 0
+    changed = False
+    for key in ("groupId", "artifactId", "version"):
+        element = _find_child(root, key)
+        current = (element.text or "").strip() if element is not None else \
+            (_child_text(parent, key) if parent is not None and key != "artifactId" else "")
+        if element is not None:
+            position = list(root).index(element) + 1
+        if current == coordinates[key]:
+            continue
+        if element is None:
+            element = ET.Element(namespace + key)
+            element.tail = parent.tail if parent is not None else root.text
+            root.insert(position, element)
+            position += 1
+        element.text = coordinates[key]
+        changed = True
+    if not changed:
+        return pom_data
+    if namespace:
+        ET.register_namespace("", namespace[1:-1])
+    output = io.BytesIO()
+    ET.ElementTree(root).write(output, encoding="UTF-8", xml_declaration=True)
+    return output.getvalue()
+
+
+class EmbeddedPomCache:
+    """JAR内嵌POM的提取结果缓存
+
+    按JAR路径记录大小和修改时间，未变化时直接返回上次提取出的POM文件，没有内嵌POM的JAR同样缓存，
+    重新扫描数千个JAR只需要stat。提取出的POM保存在EMBEDDED_POM_DIR下，坐标已替换为pom.properties中的值，
+    可直接作为pom_path部署和预检。
+    """
+
+    def __init__(self, directory=EMBEDDED_POM_DIR):
+        self.directory = Path(directory)
+        self.index_file = self.directory / "index.json"
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def lookup(self, jar_path):
+        """返回(POM文件路径, 坐标)，JAR中没有内嵌POM时返回None"""
+        key = os.path.abspath(jar_path)
+        stat = os.stat(jar_path)
+        with self._lock:
+            entry = self._load().get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns and \
+                entry.get("format") == EMBEDDED_POM_FORMAT and (entry["pom"] is None or os.path.exists(entry["pom"])):
+            return (entry["pom"], entry["coordinates"]) if entry["pom"] else None
+
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "format": EMBEDDED_POM_FORMAT,
+                 "pom": None, "coordinates": None}
+        extracted = read_embedded_pom(jar_path)
+        if extracted:
+            pom_data, coordinates = extracted
+            pom_dir = self.directory / hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+            pom_dir.mkdir(parents=True, exist_ok=True)
+            pom_path = pom_dir / f"{coordinates['artifactId']}-{coordinates['version']}.pom"
+            with open(pom_path, "wb") as f:
+                f.write(pin_pom_coordinates(pom_data, coordinates))
+            entry.update(pom=str(pom_path), coordinates=coordinates)
+        with self._lock:
+            self._load()[key] = entry
+            self._dirty = True
+        return (entry["pom"], entry["coordinates"]) if entry["pom"] else None
+
+    def save(self):
+        """有新的提取结果时原子地写回索引"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.index_file.with_suffix(".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._entries, f, ensure_ascii=False)
+                os.replace(tmp_path, self.index_file)
+                self._dirty = False
+            except OSError:
+                pass
+
+
+def find_pom_for_jar(jar_path, cache=None):
+    """查找JAR对应的POM：优先使用同名.pom，否则从JAR内嵌的POM中提取，都没有时返回None"""
+    pom_path = Path(jar_path).with_suffix(".pom")
+    if pom_path.is_file():
+        return str(pom_path)
+    own_cache = cache is None
+    cache = cache or EmbeddedPomCache()
+    try:
+        found = cache.lookup(jar_path)
+    except OSError:
+        return None
+    if own_cache:
+        cache.save()
+    return found[0] if found else None
+
+
+# ==================== 依赖闭包 ====================
+
+# 上传依赖闭包时包含的依赖范围（test/provided/system不需要随构件发布）
+DEPENDENCY_SCOPES = ("compile", "runtime")
+# 打包方式不是pom时，构件主文件的扩展名（其余打包方式直接用打包方式作扩展名）
+PACKAGING_EXTENSIONS = {"bundle": "jar", "maven-plugin": "jar", "ejb": "jar", "jar": "jar"}
+
+
+def local_repository_path(settings_path=None):
+    """本地Maven仓库目录：settings.xml中的<localRepository>，未配置时为~/.m2/repository"""
+    settings = Path(settings_path) if settings_path else Path.home() / ".m2" / "settings.xml"
+    if settings.is_file():
+        try:
+            configured = _child_text(ET.parse(str(settings)).getroot(), "localRepository")
+        except (ET.ParseError, OSError):
+            configured = ""
+        if configured:
+            return Path(os.path.expanduser(configured.replace("${user.home}", str(Path.home()))))
+    return Path.home() / ".m2" / "repository"
+
+
+def _interpolate(value, properties):
+    """替换${...}属性引用（支持嵌套引用），无法解析的保持原样"""
+    import re
+
+    for _ in range(10):
+        if not value or "${" not in value:
+            break
+        replaced = re.sub(r"\$\{([^}]+)\}", lambda match: properties.get(match.group(1), match.group(0)), value)
+        if replaced == value:
+            break
+        value = replaced
+    return value
+
+
+def _parse_dependency_list(element):
+    """解析<dependencies>下的依赖列表"""
+    dependencies = []
+    if element is None:
+        return dependencies
+    for dependency in element:
+        if _strip_ns(dependency.tag) != "dependency":
+            continue
+        exclusions = []
+        exclusions_element = _find_child(dependency, "exclusions")
+        if exclusions_element is not None:
+            exclusions = [(_child_text(exclusion, "groupId"), _child_text(exclusion, "artifactId"))
+                          for exclusion in exclusions_element if _strip_ns(exclusion.tag) == "exclusion"]
+        dependencies.append({
+            "groupId": _child_text(dependency, "groupId"),
+            "artifactId": _child_text(dependency, "artifactId"),
+            "version": _child_text(dependency, "version"),
+            "type": _child_text(dependency, "type") or "jar",
+            "classifier": _child_text(dependency, "classifier"),
+            "scope": _child_text(dependency, "scope"),
+            "optional": _child_text(dependency, "optional") == "true",
+            "exclusions": exclusions,
+        })
+    return dependencies
+
+
+def parse_pom_model(pom_path):
+    """解析POM中与依赖解析有关的部分：坐标、parent、properties、dependencyManagement和dependencies（未做继承和插值）"""
+    try:
+        root = ET.parse(str(pom_path)).getroot()
+    except (ET.ParseError, OSError) as e:
+        raise DeployError(f"无法解析POM文件 {pom_path}: {e}")
+    parent = None
+    parent_element = _find_child(root, "parent")
+    if parent_element is not None:
+        parent = {key: _child_text(parent_element, key) for key in ("groupId", "artifactId", "version", "relativePath")}
+    properties = {}
+    properties_element = _find_child(root, "properties")
+    if properties_element is not None:
+        properties = {_strip_ns(child.tag): (child.text or "").strip() for child in properties_element
+                      if isinstance(child.tag, str)}
+    management = _find_child(root, "dependencyManagement")
+    return {
+        "groupId": _child_text(root, "groupId") or (parent or {}).get("groupId", ""),
+        "artifactId": _child_text(root, "artifactId"),
+        "version": _child_text(root, "version") or (parent or {}).get("version", ""),
+        "packaging": _child_text(root, "packaging") or "jar",
+        "parent": parent,
+        "properties": properties,
+        "managed": _parse_dependency_list(_find_child(management, "dependencies")) if management is not None else [],
+        "dependencies": _parse_dependency_list(_find_child(root, "dependencies")),
+    }
+
+
+def _dependency_key(dependency):
+    return (dependency["groupId"], dependency["artifactId"], dependency["type"], dependency["classifier"])
+
+
+class PomResolver:
+    """从本地仓库解析POM的有效模型（继承parent、导入BOM、属性插值）
+
+    原始解析结果和有效模型都按(路径, 修改时间)缓存，多个构件共享的parent和BOM只解析一次；可在多个线程中使用。
+    """
+
+    def __init__(self, local_repository=None):
+        self.local_repository = Path(local_repository) if local_repository else local_repository_path()
+        self._models = {}
+        self._effective = {}
+        self._lock = threading.Lock()
+
+    def local_pom(self, group_id, artifact_id, version):
+        """本地仓库中构件的POM路径，不存在时返回None"""
+        if not (group_id and artifact_id and version) or "${" in group_id + artifact_id + version:
+            return None
+        path = self.local_repository.joinpath(*group_id.split("."), artifact_id, version,
+                                              f"{artifact_id}-{version}.pom")
+        return str(path) if path.is_file() else None
+
+    def _cached(self, cache, pom_path, build):
+        key = (os.path.abspath(pom_path), os.stat(pom_path).st_mtime_ns)
+        with self._lock:
+            if key in cache:
+                return cache[key]
+        value = build()
+        with self._lock:
+            cache[key] = value
+        return value
+
+    def model(self, pom_path):
+        """原始模型（memoized）"""
+        return self._cached(self._models, pom_path, lambda: parse_pom_model(pom_path))
+
+    def _parent_pom(self, pom_path, parent):
+        """parent的POM：先查本地仓库，再查relativePath（默认../pom.xml）"""
+        found = self.local_pom(parent["groupId"], parent["artifactId"], parent["version"])
+        if found:
+            return found
+        relative = Path(pom_path).parent / (parent.get("relativePath") or "../pom.xml")
+        if relative.is_dir():
+            relative = relative / "pom.xml"
+        if relative.is_file():
+            candidate = self.model(str(relative))
+            if (candidate["groupId"], candidate["artifactId"], candidate["version"]) == \
+                    (parent["groupId"], parent["artifactId"], parent["version"]):
+                return str(relative)
+        return None
+
+    def effective(self, pom_path, _chain=()):
+        """有效模型：{"gav", "packaging", "pom", "parent", "imports", "managed", "dependencies", "unresolved"}
+
+        parent为(g, a, v)及其POM路径，imports为导入的BOM列表，unresolved为本地找不到的parent/BOM坐标。
+        """
+        if os.path.abspath(pom_path) in _chain:
+            raise DeployError(f"POM的parent出现循环: {pom_path}")
+        return self._cached(self._effective, pom_path,
+                            lambda: self._build_effective(pom_path, _chain + (os.path.abspath(pom_path),)))
+
+    def _build_effective(self, pom_path, chain):
+        model = self.model(pom_path)
+        unresolved = []
+        parent = None
+        parent_model = None
+        if model["parent"]:
+            info = model["parent"]
+            parent_pom = self._parent_pom(pom_path, info)
+            parent = ((info["groupId"], info["artifactId"], info["version"]), parent_pom)
+            if parent_pom:
+                parent_model = self.effective(parent_pom, chain)
+            else:
+                unresolved.append(parent[0])
+
+        group_id, artifact_id, version = model["groupId"], model["artifactId"], model["version"]
+        properties = dict(parent_model["properties"]) if parent_model else {}
+        properties.update(model["properties"])
+        properties.update({
+            "project.groupId": group_id, "pom.groupId": group_id,
+            "project.artifactId": artifact_id, "pom.artifactId": artifact_id,
+            "project.version": version, "pom.version": version, "version": version,
+        })
+        if parent:
+            properties.update({"project.parent.groupId": parent[0][0], "parent.groupId": parent[0][0],
+                               "project.parent.version": parent[0][2], "parent.version": parent[0][2]})
+        # 坐标本身也可能引用属性（如<version>${revision}</version>）
+        group_id, artifact_id, version = (_interpolate(value, properties) for value in (group_id, artifact_id, version))
+        properties.update({"project.version": version, "pom.version": version, "version": version})
+
+        def interpolate(dependency):
+            resolved = dict(dependency)
+            for key in ("groupId", "artifactId", "version", "type", "classifier", "scope"):
+                resolved[key] = _interpolate(dependency[key], properties)
+            return resolved
+
+        # dependencyManagement：本POM的条目优先，其次是导入的BOM（按声明顺序），最后是parent
+        managed = {}
+        imports = []
+        boms = []
+        for dependency in map(interpolate, model["managed"]):
+            if dependency["scope"] == "import" and dependency["type"] == "pom":
+                gav = (dependency["groupId"], dependency["artifactId"], dependency["version"])
+                bom_pom = self.local_pom(*gav)
+                imports.append((gav, bom_pom))
+                if bom_pom:
+                    boms.append(self.effective(bom_pom, chain))
+                else:
+                    unresolved.append(gav)
+                continue
+            managed[_dependency_key(dependency)] = dependency
+        for bom in boms:
+            for key, dependency in bom["managed"].items():
+                managed.setdefault(key, dependency)
+        if parent_model:
+            for key, dependency in parent_model["managed"].items():
+                managed.setdefault(key, dependency)
+
+        dependencies = {}
+        if parent_model:
+            dependencies.update((_dependency_key(dependency), dependency) for dependency in parent_model["dependencies"])
+        dependencies.update((_dependency_key(dependency), dependency) for dependency in map(interpolate, model["dependencies"]))
+        return {
+            "gav": (group_id, artifact_id, version),
+            "packaging": _interpolate(model["packaging"], properties),
+            "pom": str(pom_path),
+            "properties": properties,
+            "parent": parent,
+            "imports": imports,
+            "managed": managed,
+            "dependencies": list(dependencies.values()),
+            "unresolved": unresolved,
+        }
+
+
+def resolve_dependency_closure(jar_path, pom_path, resolver=None, scopes=DEPENDENCY_SCOPES):
+    """解析构件在本地仓库中的依赖闭包（含parent POM和导入的BOM）
+
+    按Maven的规则：广度优先、最近的版本优先，传递依赖中的optional依赖和被exclusions排除的依赖不包含，
+    根POM的dependencyManagement覆盖所有传递依赖的版本，各依赖POM自身的dependencyManagement只补充其中未声明的版本。返回(nodes, order, missing)：
+    nodes为{gav: {"jar", "pom", "requires"}}，requires是需要先于它上传的构件；
+    order为依赖在前的上传顺序；missing为本地仓库中找不到的构件坐标。
+    """
+    resolver = resolver or PomResolver()
+    nodes = {}
+    missing = []
+    root = resolver.effective(pom_path)
+
+    def add_node(model, jar=None):
+        gav = model["gav"]
+        if gav in nodes:
+            return gav
+        if jar is None and model["packaging"] != "pom":
+            extension = PACKAGING_EXTENSIONS.get(model["packaging"], model["packaging"])
+            candidate = Path(model["pom"]).with_name(f"{gav[1]}-{gav[2]}.{extension}")
+            jar = str(candidate) if candidate.is_file() else None
+        node = nodes[gav] = {"jar": jar, "pom": model["pom"], "requires": set()}
+        # parent和导入的BOM需要先于构件发布，否则远程仓库中的构件无法解析
+        for related, related_pom in ([model["parent"]] if model["parent"] else []) + model["imports"]:
+            if related_pom:
+                node["requires"].add(add_node(resolver.effective(related_pom)))
+        for gav_missing in model["unresolved"]:
+            if gav_missing not in missing:
+                missing.append(gav_missing)
+        return gav
+
+    add_node(root, jar_path)
+    root_managed = root["managed"]
+    chosen = {}
+    queue = collections.deque([(root, frozenset(), True)])
+    while queue:
+        model, exclusions, is_root = queue.popleft()
+        requires = nodes[model["gav"]]["requires"]
+        for dependency in model["dependencies"]:
+            group_id, artifact_id = dependency["groupId"], dependency["artifactId"]
+            key = _dependency_key(dependency)
+            own = model["managed"].get(key) or {}
+            # 传递依赖的版本由根POM的dependencyManagement覆盖；所在POM自身的只在未声明版本时补充
+            override = {} if is_root else root_managed.get(key) or {}
+            scope = dependency["scope"] or override.get("scope") or own.get("scope") or "compile"
+            if scope not in scopes or (dependency["optional"] and not is_root) or (group_id, artifact_id) in exclusions:
+                continue
+            version = override.get("version") or dependency["version"] or own.get("version")
+            version = chosen.get((group_id, artifact_id)) or version
+            if not version or "${" in version or version.startswith(("[", "(")):
+                if (group_id, artifact_id, version or "?") not in missing:
+                    missing.append((group_id, artifact_id, version or "?"))
+                continue
+            chosen.setdefault((group_id, artifact_id), version)
+            gav = (group_id, artifact_id, version)
+            if gav in nodes:
+                requires.add(gav)
+                continue
+            dependency_pom = resolver.local_pom(*gav)
+            if not dependency_pom:
+                if gav not in missing:
+                    missing.append(gav)
+                continue
+            dependency_model = resolver.effective(dependency_pom)
+            requires.add(add_node(dependency_model))
+            queue.append((dependency_model, exclusions | frozenset(dependency["exclusions"]), False))
+
+    # 依赖在前的拓扑顺序；依赖关系中出现环时忽略回边
+    order = []
+    state = {}
+    for start in nodes:
+        if start in state:
+            continue
+        stack = [(start, iter(sorted(nodes[start]["requires"])))]
+        state[start] = "visiting"
+        while stack:
+            gav, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                state[gav] = "done"
+                order.append(gav)
+            elif child in nodes and child not in state:
+                state[child] = "visiting"
+                stack.append((child, iter(sorted(nodes[child]["requires"]))))
+            elif state.get(child) == "visiting":
+                nodes[gav]["requires"].discard(child)
+    return nodes, order, missing
+
+
+def plan_dependency_upload(jar_path, pom_path, checker, resolver=None, log=None):
+    """规划依赖闭包的上传：解析闭包，并行检查远程仓库中缺少哪些构件
+
+    checker为HttpDeployer（用其exists检查远程POM是否存在）。返回(pairs, dependencies, missing)：
+    pairs为需要上传的(jar, pom)，按依赖在前排列（最后是所选构件本身）；dependencies为{pair: [需要先上传的pair]}，
+    供BatchUploader按依赖顺序并行上传；missing为本地仓库中找不到的构件坐标。
+    """
+    log = log or (lambda message: None)
+    nodes, order, missing = resolve_dependency_closure(jar_path, pom_path, resolver)
+    log(f"🧩 依赖闭包共 {len(nodes)} 个构件（含parent/BOM）")
+    for gav in missing:
+        log(f"⚠️ 本地仓库中找不到: {':'.join(gav)}")
+
+    # 所选构件本身总是上传，其余构件并行检查远程是否已有POM
+    root = next(iter(nodes))
+    scheduler = get_scheduler()
+    futures = {gav: scheduler.submit_blocking(checker.exists, "{0}/{1}/{2}/{1}-{2}.pom".format(
+        gav[0].replace(".", "/"), gav[1], gav[2])) for gav in nodes if gav != root}
+    upload = {root} | {gav for gav, future in futures.items() if not future.result()}
+    log(f"📡 远程仓库中缺少 {len(upload) - 1} 个依赖构件")
+
+    def required_uploads(gav):
+        """需要先上传的构件：沿依赖关系查找，经过远程已有的构件时继续向下"""
+        found = set()
+        seen = set()
+        stack = list(nodes[gav]["requires"])
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            if current in upload:
+                found.add(current)
+            else:
+                stack.extend(nodes[current]["requires"])
+        return found
+
+    pair_of = {gav: (nodes[gav]["jar"], nodes[gav]["pom"]) for gav in upload}
+    pairs = [pair_of[gav] for gav in order if gav in upload]
+    dependencies = {pair_of[gav]: [pair_of[required] for required in required_uploads(gav)] for gav in upload}
+    return pairs, dependencies, missing
+
+
+# ==================== 构件预检 ====================
+
+# 快速预检时校验CRC的条目：Maven和类加载器最先读取的清单和内嵌POM
+PREFLIGHT_CRC_PREFIXES = ("META-INF/MANIFEST.MF", "META-INF/maven/")
+# 预检的并发数（读取中央目录和解析POM以磁盘I/O为主）
+PREFLIGHT_WORKERS = 16
+
+
+def check_jar_integrity(jar_path, full=False):
+    """检查JAR的ZIP结构，返回问题列表（空列表表示正常）
+
+    读取ZIP末尾的中央目录结束记录（EOCD）和中央目录，检查各条目的本地文件头都在中央目录之前、
+    最后一个条目的本地文件头签名正确（截断或拼接损坏的文件在这里就会发现），并校验清单和内嵌POM的CRC；
+    full为True时校验全部条目的CRC（需要解压整个JAR）。
+    """
+    import zipfile
+
+    try:
+        with zipfile.ZipFile(jar_path) as jar:
+            entries = jar.infolist()
+            if not entries:
+                return ["JAR中没有任何条目"]
+            start_dir = getattr(jar, "start_dir", None)
+            if start_dir is not None and any(info.header_offset >= start_dir for info in entries):
+                return ["ZIP中央目录中的条目偏移超出数据区，文件可能已损坏"]
+            last = max(entries, key=lambda info: info.header_offset)
+            jar.fp.seek(last.header_offset)
+            if jar.fp.read(4) != b"PK\x03\x04":
+                return [f"条目 {last.filename} 的本地文件头损坏"]
+            if full:
+                corrupt = jar.testzip()
+                return [f"条目 {corrupt} 的CRC校验失败"] if corrupt else []
+            for info in entries:
+                if info.filename.startswith(PREFLIGHT_CRC_PREFIXES) and not info.is_dir():
+                    try:
+                        with jar.open(info) as entry:
+                            while entry.read(HTTP_BLOCK_SIZE):
+                                pass
+                    except zipfile.BadZipFile:
+                        return [f"条目 {info.filename} 的CRC校验失败"]
+    except zipfile.BadZipFile as e:
+        return [f"不是有效的ZIP/JAR文件（{e}），文件可能不完整"]
+    except (OSError, EOFError, zipfile.LargeZipFile, NotImplementedError) as e:
+        return [f"无法读取JAR: {e}"]
+    return []
+
+
+def check_pom_file(pom_path):
+    """完整地流式解析POM，检查是否是格式正确的XML及必需的坐标，返回(坐标, 问题列表)"""
+    try:
+        with open(pom_path, "rb") as f:
+            root_name = None
+            for event, element in ET.iterparse(f, events=("start", "end")):
+                if root_name is None:
+                    root_name = _strip_ns(element.tag)
+                elif event == "end":
+                    element.clear()
+    except ET.ParseError as e:
+        return None, [f"POM不是格式正确的XML: {e}"]
+    except OSError as e:
+        return None, [f"无法读取POM: {e}"]
+    if root_name != "project":
+        return None, [f"POM的根元素是<{root_name}>，不是<project>"]
+    try:
+        return read_pom_coordinates(pom_path), []
+    except DeployError as e:
+        return None, [str(e)]
+
+
+def _file_name_matches(file_name, artifact_id, version, extension):
+    """文件名是否为<artifactId>-<version>[-classifier].<extension>（SNAPSHOT可以是时间戳版本）"""
+    import re
+
+    versions = [re.escape(version)]
+    if version.endswith("-SNAPSHOT"):
+        versions.append(re.escape(version[:-len("SNAPSHOT")]) + r"\d{8}\.\d{6}-\d+")
+    pattern = rf"{re.escape(artifact_id)}-(?:{'|'.join(versions)})(?:-[^/\\]+)?\.{re.escape(extension)}"
+    return re.fullmatch(pattern, file_name) is not None
+
+
+def preflight_artifact(jar_path, pom_path, full=False):
+    """预检一个构件，返回(错误列表, 警告列表)
+
+    错误（JAR损坏、POM格式错误或缺少坐标）会导致上传失败或在仓库中留下坏构件；
+    文件名与POM坐标不一致只作为警告，上传时以POM坐标为准。
+    """
+    errors = []
+    warnings = []
+    if jar_path:
+        errors.extend(f"{os.path.basename(jar_path)}: {problem}" for problem in check_jar_integrity(jar_path, full))
+    coordinates, problems = check_pom_file(pom_path)
+    errors.extend(f"{os.path.basename(pom_path)}: {problem}" for problem in problems)
+    if coordinates:
+        artifact_id, version = coordinates["artifactId"], coordinates["version"]
+        gav = f"{coordinates['groupId']}:{artifact_id}:{version}"
+        pom_name = os.path.basename(pom_path)
+        # 项目中的pom.xml和从JAR中提取出的内嵌POM不按文件名检查
+        embedded = EMBEDDED_POM_DIR in Path(pom_path).parents
+        if pom_name != "pom.xml" and not embedded and not _file_name_matches(pom_name, artifact_id, version, "pom"):
+            warnings.append(f"{pom_name}: 文件名与POM坐标 {gav} 不一致")
+        if jar_path and not _file_name_matches(os.path.basename(jar_path), artifact_id, version,
+                                               Path(jar_path).suffix.lstrip(".") or "jar"):
+            warnings.append(f"{os.path.basename(jar_path)}: 文件名与POM坐标 {gav} 不一致")
+    return errors, warnings
+
+
+def preflight_artifacts(pairs, full=False, workers=PREFLIGHT_WORKERS, log=None):
+    """在线程池中并行预检全部构件，在任何网络请求之前发现损坏的文件
+
+    返回{(jar, pom): [错误]}，只包含有错误的构件；警告只写日志。
+    """
+    log = log or (lambda message: None)
+    if not pairs:
+        return {}
+    import concurrent.futures
+
+    with span("preflight"):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(workers, len(pairs)))) as executor:
+            outcomes = list(executor.map(lambda pair: preflight_artifact(pair[0], pair[1], full), pairs))
+    failures = {}
+    warned = 0
+    for pair, (errors, warnings) in zip(pairs, outcomes):
+        for warning in warnings:
+            log(f"⚠️ {warning}")
+        warned += len(warnings)
+        if errors:
+            failures[pair] = errors
+            for error in errors:
+                log(f"❌ 预检失败 {error}")
+    log(f"🔎 预检 {len(pairs)} 个构件：{len(failures)} 个有错误，{warned} 条警告")
+    return failures
+
+
+# ==================== 作业日志与重试 ====================
+
+JOURNAL_DIR = APP_STATE_DIR / "journals"
+# 构件在作业中的状态；verified和failed为终态
+JOB_STATES = ("pending", "hashing", "uploading", "verified", "failed")
+
+# 临时错误的最大重试次数，以及指数退避的基础延迟和上限（秒）
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+
+def is_transient_error(error):
+    """是否为值得重试的临时错误（网络中断、限流、服务端5xx等）"""
+    return isinstance(error, DeployError) and error.transient
+
+
+def retry_delay(attempt, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY):
+    """第attempt次重试前的等待时间：指数退避加全抖动，避免大量并发任务同时重试"""
+    import random
+
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class UploadJournal:
+    """只追加的上传作业日志（JSON Lines），记录每个构件的状态，程序或网络中断后可据此续传
+
+    每次状态变化追加一行；终态（verified/failed）写入后立即fsync，崩溃时最多丢失未完成构件的中间状态。
+    续传时重放日志，文件未变化且已verified的构件直接跳过，不再计算摘要也不再发送。
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.states = self._replay() if resume else {}
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+
+    @classmethod
+    def for_job(cls, repository_url, source, resume=False):
+        """按仓库URL和上传源（目录或文件）定位作业日志，同一作业续传时使用同一个文件"""
+        job = f"{repository_url.strip().rstrip('/')}\n{os.path.abspath(source)}"
+        return cls(JOURNAL_DIR / f"{hashlib.sha1(job.encode('utf-8')).hexdigest()[:16]}.jsonl", resume)
+
+    def _replay(self):
+        """读取已有日志，返回{构件: 最后一条记录}；崩溃时写了一半的行会被忽略"""
+        states = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(record, dict) and record.get("state") in JOB_STATES:
+                        states[record["key"]] = record
+        except FileNotFoundError:
+            pass
+        return states
+
+    @staticmethod
+    def _key(jar, pom):
+        return os.path.abspath(pom or jar)
+
+    def completed(self, jar, pom):
+        """构件是否已在之前的作业中完成，且本地文件自那以后没有变化"""
+        record = self.states.get(self._key(jar, pom))
+        if not record or record["state"] != "verified":
+            return False
+        for path in (jar, pom):
+            if not path:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return False
+            if record.get("files", {}).get(os.path.abspath(path)) != [stat.st_size, stat.st_mtime_ns]:
+                return False
+        return True
+
+    def mark(self, jar, pom, state, **fields):
+        """追加一条状态记录"""
+        record = {"time": round(time.time(), 3), "key": self._key(jar, pom), "state": state}
+        record.update(fields)
+        if state == "verified":
+            record["files"] = {}
+            for path in (jar, pom):
+                if path:
+                    stat = os.stat(path)
+                    record["files"][os.path.abspath(path)] = [stat.st_size, stat.st_mtime_ns]
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.states[record["key"]] = record
+            self._file.write(line)
+            self._file.flush()
+            if state in ("verified", "failed"):
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        """关闭日志文件"""
+        with self._lock:
+            self._file.close()
+
+
+# ==================== 异步调度 ====================
+
+# 同一仓库主机上同时进行的部署数上限（每个构件的请求是顺序发送的，即同时在途的请求数上限），保护仓库服务不被压垮
+HOST_CONCURRENCY_LIMIT = 32
+# 调度器执行阻塞调用的线程数上限，决定所有作业合计最多同时在途的构件数
+SCHEDULER_MAX_THREADS = 256
+
+
+class TokenBucket:
+    """全局带宽上限（令牌桶），rate为每秒字节数，多个线程、作业和仓库目标共享同一个实例
+
+    consume(n)预先扣除令牌，不足时欠账并等待到令牌补足，请求按到达顺序依次获得带宽；
+    桶容量约为0.25秒的流量，空闲后的突发不会明显超过上限。
+    """
+
+    def __init__(self, rate):
+        self._lock = threading.Lock()
+        self.set_rate(rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def set_rate(self, rate):
+        """修改上限（字节/秒），对之后发送的数据块生效"""
+        with self._lock:
+            self.rate = float(rate)
+            self.capacity = max(HTTP_BLOCK_SIZE, self.rate / 4)
+            # 每次申请的数据块约为0.1秒的流量，让多个连接交替发送，速率平稳
+            self.chunk_size = int(min(SENDFILE_CHUNK_SIZE, max(HTTP_BLOCK_SIZE, self.rate / 10)))
+
+    def consume(self, count):
+        """申请发送count字节，必要时阻塞等待"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= count
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+def repository_host(repository_url):
+    """仓库URL对应的主机标识（host:port），用于按主机限制并发"""
+    parsed = urllib.parse.urlsplit(repository_url.strip())
+    return f"{parsed.hostname}:{parsed.port or (443 if parsed.scheme == 'https' else 80)}"
+
+
+class HostSemaphore:
+    """可调整上限的主机并发信号量，用法与asyncio.Semaphore相同（async with），只能在事件循环中使用
+
+    上限变小时正在进行的部署照常完成，新的部署等到并发数低于新上限后才开始；上限变大时立即放行等待中的部署。
+    """
+
+    def __init__(self, limit):
+        self.limit = max(1, int(limit))
+        self.active = 0
+        self._waiters = collections.deque()
+
+    def set_limit(self, limit):
+        """修改并发上限"""
+        self.limit = max(1, int(limit))
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.active < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+    async def __aenter__(self):
+        import asyncio
+
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 已经分到名额后才被取消，把名额让给下一个
+                self.active -= 1
+                self._wake()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    async def __aexit__(self, *exc_info):
+        self.active -= 1
+        self._wake()
+
+
+class UploadScheduler:
+    """在后台线程中运行asyncio事件循环的上传调度器，进程内所有上传作业共享
+
+    作业以协程提交（submit可在任意线程调用，返回concurrent.futures.Future），多个作业可以同时进行；
+    按主机的HostSemaphore限制同一仓库主机上的并发部署数，同时上传到同一台仓库的所有作业共享这个上限；
+    作业指定的上限不同时以最后开始的作业为准（与修改带宽上限一样，新的设置对之后的部署生效）。
+    标准库没有异步HTTP客户端，HTTP请求和Maven进程仍是阻塞调用，由run_blocking交给线程池执行；
+    排队和重试等待只是协程挂起，不占用线程。
+    """
+
+    def __init__(self, max_threads=SCHEDULER_MAX_THREADS):
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="maven-uploader")
+        self.loop = asyncio.new_event_loop()
+        self._host_semaphores = {}
+        self._thread = threading.Thread(target=self.loop.run_forever, name="maven-uploader-scheduler",
+                                        daemon=True)
+        self._thread.start()
+
+    def submit(self, coroutine):
+        """提交一个协程作业，返回concurrent.futures.Future"""
+        import asyncio
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def submit_blocking(self, func, *args):
+        """在调度器的线程池中执行阻塞函数，返回concurrent.futures.Future"""
+        return self.executor.submit(func, *args)
+
+    async def run_blocking(self, func, *args):
+        """在协程中等待线程池执行阻塞函数"""
+        return await self.loop.run_in_executor(self.executor, func, *args)
+
+    def host_semaphore(self, host, limit=HOST_CONCURRENCY_LIMIT):
+        """主机的并发信号量（只能在事件循环中调用），按主机共享；limit与当前上限不同时改为limit"""
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = HostSemaphore(limit)
+        elif semaphore.limit != max(1, int(limit)):
+            semaphore.set_limit(limit)
+        return semaphore
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """进程内共享的上传调度器（第一次调用时创建）"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = UploadScheduler()
+        return _scheduler
+
+
+# ==================== 批量上传 ====================
+
+def find_artifact_pairs(directory, embedded_poms=True):
+    """递归扫描目录（如~/.m2/repository的子树），返回(jar, pom)列表；只有POM的构件jar为None
+
+    没有同名POM的JAR（第三方JAR等）在embedded_poms为True时使用JAR内嵌的POM，
+    与某个POM同名前缀的JAR（如-sources.jar）视为附属构件，不单独部署。
+    """
+    cache = EmbeddedPomCache() if embedded_poms else None
+    pairs = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames.sort()
+        names = set(filenames)
+        stems = [name[:-len(".pom")] for name in filenames if name.endswith(".pom")]
+        for name in sorted(filenames):
+            if name.endswith(".pom"):
+                jar_name = name[:-len(".pom")] + ".jar"
+                jar_path = os.path.join(dirpath, jar_name) if jar_name in names else None
+                pairs.append((jar_path, os.path.join(dirpath, name)))
+            elif cache and name.endswith(".jar") and name[:-len(".jar")] + ".pom" not in names and \
+                    not any(name.startswith(stem + "-") for stem in stems):
+                jar_path = os.path.join(dirpath, name)
+                try:
+                    found = cache.lookup(jar_path)
+                except OSError:
+                    continue
+                if found:
+                    pairs.append((jar_path, found[0]))
+    if cache:
+        cache.save()
+    return pairs
+
+
+def find_artifact_pair(path, cache=None):
+    """文件（JAR或POM）所属的构件，返回(jar, pom)，无法确定POM时返回None
+
+    规则与find_artifact_pairs相同：同名POM优先；附属构件（如-sources.jar）和.asc签名归到主构件；
+    没有POM的JAR使用其内嵌POM。
+    """
+    if path.endswith(".asc"):
+        return find_artifact_pair(path[:-len(".asc")], cache)
+    directory, name = os.path.split(path)
+    if name.endswith(".pom"):
+        jar = path[:-len(".pom")] + ".jar"
+        return (jar if os.path.isfile(jar) else None), path
+    if not name.endswith(".jar"):
+        return None
+    pom = path[:-len(".jar")] + ".pom"
+    if os.path.isfile(pom):
+        return path, pom
+    import glob
+
+    for candidate in sorted(glob.glob(os.path.join(glob.escape(directory), "*.pom")), key=len, reverse=True):
+        stem = os.path.basename(candidate)[:-len(".pom")]
+        if name.startswith(stem + "-"):
+            jar = candidate[:-len(".pom")] + ".jar"
+            return (jar if os.path.isfile(jar) else None), candidate
+    try:
+        found = (cache or EmbeddedPomCache()).lookup(path)
+    except OSError:
+        return None
+    return (path, found[0]) if found else None
+
+
+def artifact_group_key(jar, pom):
+    """构件所属groupId:artifactId的分组键：仓库布局<g>/<a>/<v>/下版本目录的上一级目录，无需解析POM"""
+    return os.path.dirname(os.path.dirname(os.path.abspath(pom or jar)))
+
+
+def artifact_size(jar, pom):
+    """构件的总字节数：JAR、POM以及一起部署的附属构件和签名"""
+    attachments = [path for path, _, _ in find_attached_artifacts(jar, pom)]
+    return sum(os.path.getsize(path) for path in [jar, pom] + attachments if path)
+
+
+# 上传顺序策略：input保持扫描顺序；smallest小构件优先，带宽受限时让尽可能多的构件尽早完成（平均完成时间最短）；
+# artifact同一groupId:artifactId的各版本相邻，元数据读改写集中在一起
+UPLOAD_ORDERS = ("input", "smallest", "artifact")
+
+
+def order_artifacts(pairs, policy):
+    """按上传顺序策略排列构件，返回新列表"""
+    if policy == "smallest":
+        return sorted(pairs, key=lambda pair: artifact_size(*pair))
+    if policy == "artifact":
+        return sorted(pairs, key=lambda pair: artifact_group_key(*pair))
+    return list(pairs)
+
+
+def format_throughput(count, total_bytes, elapsed):
+    """格式化吞吐量：个/s 和 MB/s"""
+    elapsed = max(elapsed, 1e-6)
+    return f"{count / elapsed:.1f} 个/s · {total_bytes / elapsed / (1024 * 1024):.2f} MB/s"
+
+
+class BatchUploader:
+    """通过异步调度器并发上传多个构件，并统计总体吞吐量
+
+    workers为本作业同时在途的构件数（可以设到数百，让大量小文件的上传不再受往返延迟限制），
+    同一仓库主机上的并发另受host_limit限制（多个作业共享）；Maven方式每个在途任务是一个Maven进程，
+    并发数不超过CPU核数。临时错误按指数退避加抖动重试，等待期间不占用线程；
+    设置journal（UploadJournal）时记录每个构件的状态，并跳过之前作业中已完成的构件。
+    设置dependencies（{pair: [需要先上传的pair]}，见plan_dependency_upload）时按依赖顺序上传，
+    互不依赖的构件仍并发上传，依赖上传失败的构件不再上传；否则按order（UPLOAD_ORDERS之一）排列后依次开始。
+    """
+
+    def __init__(self, deploy_func, workers=4, on_progress=None, log=None, progress=None, journal=None,
+                 retries=RETRY_ATTEMPTS, host=None, host_limit=HOST_CONCURRENCY_LIMIT, scheduler=None,
+                 dependencies=None, order="input"):
+        self.deploy_func = deploy_func
+        self.workers = max(1, int(workers))
+        if getattr(deploy_func, "max_workers", None):
+            self.workers = min(self.workers, deploy_func.max_workers)
+        self.on_progress = on_progress
+        # 字节级进度（TransferProgress），跳过和失败的构件计为已完成
+        self.progress = progress
+        self.journal = journal
+        self.retries = max(0, int(retries))
+        # 仓库主机（repository_host()），用于按主机限制并发
+        self.host = host or ""
+        self.host_limit = host_limit
+        self.scheduler = scheduler
+        self.dependencies = dependencies
+        self.order = order
+        self.log = log or (lambda message: None)
+
+    def run(self, pairs):
+        """上传全部构件，阻塞直到完成，返回汇总结果；续传时跳过的构件计入skipped和resumed"""
+        future = self.start(pairs)
+        try:
+            return future.result()
+        except KeyboardInterrupt:
+            future.cancel()
+            raise
+
+    def start(self, pairs):
+        """把上传作业提交给调度器，立即返回concurrent.futures.Future，完成后结果为汇总结果"""
+        scheduler = self.scheduler or get_scheduler()
+        return scheduler.submit(self._run_async(scheduler, pairs))
+
+    async def _run_async(self, scheduler, pairs):
+        """作业协程：按批创建部署任务，按完成顺序汇总结果"""
+        import asyncio
+
+        result = {"total": len(pairs), "succeeded": 0, "skipped": 0, "resumed": 0, "failed": [], "bytes": 0,
+                  "elapsed": 0.0}
+        if self.journal:
+            pairs = await scheduler.run_blocking(self._skip_completed, pairs, result)
+        if self.order != "input" and not self.dependencies:
+            pairs = await scheduler.run_blocking(order_artifacts, pairs, self.order)
+        # 支持合并部署的deploy_func按批提交：Maven方式每批只启动一次Maven，批大小同时保证每个并发任务都有活干；
+        # 原生方式按groupId:artifactId分组，并发只在组之间展开，组内按deploy_func.batch_size切分，
+        # 同一构件的多个版本每batch_size个只读写一次元数据。按依赖顺序上传时逐个构件调度
+        batch_size = 1
+        if hasattr(self.deploy_func, "deploy_many") and pairs and not self.dependencies:
+            if getattr(self.deploy_func, "groups_by_artifact", False):
+                batch_size = max(1, self.deploy_func.batch_size)
+            else:
+                batch_size = max(1, min(self.deploy_func.batch_size, -(-len(pairs) // self.workers)))
+        chunks = self._make_chunks(pairs, batch_size)
+
+        workers = asyncio.Semaphore(self.workers)
+        host_semaphore = scheduler.host_semaphore(self.host, self.host_limit)
+        start = time.time()
+        if self.dependencies:
+            uploaded = {pair: asyncio.Event() for pair in pairs}
+            failed = set()
+            tasks = [asyncio.ensure_future(self._deploy_ordered(scheduler, workers, host_semaphore, chunk[0],
+                                                                uploaded, failed))
+                     for chunk in chunks]
+        else:
+            tasks = [asyncio.ensure_future(self._deploy_chunk(scheduler, workers, host_semaphore, chunk))
+                     for chunk in chunks]
+        try:
+            for task in asyncio.as_completed(tasks):
+                results = await task
+                for (jar, pom), outcome in results:
+                    if isinstance(outcome, Exception):
+                        result["failed"].append((jar or pom, str(outcome)))
+                        self.log(f"❌ 上传失败 {jar or pom}: {outcome}")
+                    else:
+                        skipped, uploaded = outcome
+                        result["skipped" if skipped else "succeeded"] += 1
+                        result["bytes"] += uploaded
+                    if self.progress and (isinstance(outcome, Exception) or outcome[0]):
+                        self.progress.settle(artifact_size(jar, pom))
+                if self.journal:
+                    await scheduler.run_blocking(self._record_outcomes, results)
+                result["elapsed"] = time.time() - start
+                done = result["succeeded"] + result["skipped"] + len(result["failed"])
+                if self.on_progress:
+                    self.on_progress(done, result["total"], result["bytes"], result["elapsed"])
+        finally:
+            for task in tasks:
+                task.cancel()
+        result["elapsed"] = time.time() - start
+        if self.host and result["succeeded"]:
+            await scheduler.run_blocking(record_throughput, self.host, result, self.workers)
+        return result
+
+    def _make_chunks(self, pairs, batch_size):
+        """把构件分批：原生方式按groupId:artifactId分组后再切分（同一构件的多个版本合并更新元数据），其余按顺序切分"""
+        if batch_size > 1 and getattr(self.deploy_func, "groups_by_artifact", False):
+            groups = {}
+            for jar, pom in pairs:
+                groups.setdefault(artifact_group_key(jar, pom), []).append((jar, pom))
+            return [group[i:i + batch_size] for group in groups.values() for i in range(0, len(group), batch_size)]
+        return [pairs[i:i + batch_size] for i in range(0, len(pairs), batch_size)]
+
+    def _skip_completed(self, pairs, result):
+        """跳过作业日志中已完成的构件，其余标记为pending"""
+        remaining = []
+        for jar, pom in pairs:
+            if self.journal.completed(jar, pom):
+                result["resumed"] += 1
+                if self.progress:
+                    self.progress.settle(artifact_size(jar, pom))
+                continue
+            self.journal.mark(jar, pom, "pending")
+            remaining.append((jar, pom))
+        if result["resumed"]:
+            self.log(f"⏩ 续传：{result['resumed']} 个构件已在之前的作业中完成，跳过")
+        result["skipped"] = result["resumed"]
+        return remaining
+
+    def _record_outcomes(self, results):
+        """把一批构件的最终状态写入作业日志"""
+        for (jar, pom), outcome in results:
+            if isinstance(outcome, Exception):
+                self.journal.mark(jar, pom, "failed", error=str(outcome))
+            else:
+                self.journal.mark(jar, pom, "verified", skipped=outcome[0], bytes=outcome[1])
+
+    async def _deploy_chunk(self, scheduler, workers, host_semaphore, chunk):
+        """上传一批构件，临时错误退避后重试，返回[((jar, pom), (是否跳过, 上传的字节数)或异常)]"""
+        import asyncio
+
+        outcomes = {}
+        pending = list(chunk)
+        for attempt in range(self.retries + 1):
+            async with workers, host_semaphore:
+                results = await scheduler.run_blocking(self._deploy_once, pending)
+            retry = []
+            for pair, outcome in results:
+                if attempt < self.retries and is_transient_error(outcome):
+                    retry.append((pair, outcome))
+                else:
+                    outcomes[pair] = outcome
+            if not retry:
+                break
+            delay = retry_delay(attempt)
+            self.log(f"🔁 {len(retry)} 个构件遇到临时错误，{delay:.1f}s 后第 {attempt + 1} 次重试: {retry[0][1]}")
+            await asyncio.sleep(delay)
+            pending = [pair for pair, _ in retry]
+        return [(pair, outcomes[pair]) for pair in chunk]
+
+    async def _deploy_ordered(self, scheduler, workers, host_semaphore, pair, uploaded, failed):
+        """等依赖的构件上传完成后再上传构件；依赖上传失败时不上传，直接记为失败"""
+        try:
+            requires = self.dependencies.get(pair, ())
+            for required in requires:
+                if required in uploaded:
+                    await uploaded[required].wait()
+            blocked = [required[0] or required[1] for required in requires if required in failed]
+            if blocked:
+                results = [(pair, DeployError(f"依赖的构件未能上传: {', '.join(map(os.path.basename, blocked))}",
+                                              transient=False))]
+            else:
+                results = await self._deploy_chunk(scheduler, workers, host_semaphore, [pair])
+            if isinstance(results[0][1], Exception):
+                failed.add(pair)
+            return results
+        finally:
+            uploaded[pair].set()
+
+    def _deploy_once(self, chunk):
+        """上传一批构件（不重试）"""
+        if len(chunk) > 1:
+            outcomes = self.deploy_func.deploy_many(chunk)
+        else:
+            outcomes = []
+            for jar, pom in chunk:
+                try:
+                    outcomes.append(self.deploy_func(jar, pom))
+                except Exception as e:
+                    outcomes.append(e)
+        results = []
+        for (jar, pom), outcome in zip(chunk, outcomes):
+            if isinstance(outcome, dict):
+                outcome = (outcome.get("skipped", False), outcome.get("bytes", 0))
+            elif not isinstance(outcome, Exception):
+                outcome = (False, sum(os.path.getsize(path) for path in (jar, pom) if path))
+            results.append(((jar, pom), outcome))
+        return results
+
+
+def parse_repository_target(text, default_repository_id):
+    """解析"[仓库ID=]URL"形式的仓库目标，返回(仓库ID, URL)；省略仓库ID时使用default_repository_id"""
+    text = text.strip()
+    repository_id, separator, url = text.partition("=")
+    if not separator or "://" in repository_id:
+        return default_repository_id, text
+    return repository_id.strip() or default_repository_id, url.strip()
+
+
+def run_fan_out(uploaders, pairs):
+    """把同一批构件同时上传到多个仓库，阻塞直到全部完成，返回与uploaders一一对应的汇总结果
+
+    每个仓库是调度器上的一个独立作业（各自的并发数、主机并发上限、重试和作业日志），
+    较慢或失败的镜像不会阻塞其他仓库；各deploy_func共享同一个SharedFileBuffers时每个文件只读取一次。
+    """
+    futures = [uploader.start(pairs) for uploader in uploaders]
+    try:
+        return [future.result() for future in futures]
+    except KeyboardInterrupt:
+        for future in futures:
+            future.cancel()
+        raise
+
+
+# ==================== 上传计划 ====================
+
+# 各仓库主机实测的上传吞吐量，供演练时估算耗时
+THROUGHPUT_FILE = APP_STATE_DIR / "throughput.json"
+# 新的测量结果在滑动平均中的权重
+THROUGHPUT_SMOOTHING = 0.3
+# 演练时同时列出的groupId数
+PLAN_WORKERS = 8
+
+
+def _load_throughput():
+    """读取吞吐量记录"""
+    try:
+        with open(THROUGHPUT_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_throughput(host, result, workers):
+    """把一次上传作业的实测吞吐量（每个构件的耗时、带宽）计入该主机的滑动平均"""
+    if not result["succeeded"] or result["elapsed"] <= 0:
+        return
+    history = _load_throughput()
+    sample = {"seconds_per_artifact": result["elapsed"] / result["succeeded"] * workers,
+              "bytes_per_second": result["bytes"] / result["elapsed"]}
+    previous = history.get(host)
+    if previous:
+        for key, value in sample.items():
+            sample[key] = previous[key] + (value - previous[key]) * THROUGHPUT_SMOOTHING
+    sample["updated"] = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    history[host] = sample
+    try:
+        _write_atomic(THROUGHPUT_FILE, json.dumps(history, ensure_ascii=False, indent=2))
+    except OSError:
+        pass
+
+
+def estimate_upload_seconds(host, count, total_bytes, workers, limit=None):
+    """按该主机实测的吞吐量估算上传count个构件、total_bytes字节的耗时，没有记录时返回None
+
+    每个构件的固定开销（往返、元数据）随并发数分摊，与带宽（不超过limit字节/秒）决定的耗时取较大者。
+    """
+    measured = _load_throughput().get(host)
+    if not measured or not count:
+        return None if count else 0.0
+    per_artifact = count * measured["seconds_per_artifact"] / max(1, workers)
+    bandwidth = min(measured["bytes_per_second"], limit) if limit else measured["bytes_per_second"]
+    transfer = total_bytes / bandwidth if bandwidth else 0.0
+    return max(per_artifact, transfer)
+
+
+class _RemoteListing:
+    """按groupId整体列出远程仓库：优先用Nexus 3的搜索API，不可用时逐级读取目录页面"""
+
+    def __init__(self, deployer):
+        self.deployer = deployer
+        self.use_search = True
+
+    def list_group(self, group_id, versions):
+        """列出groupId下的远程文件，返回{远程路径: sha1或None}；versions为本地的{artifactId: {版本}}
+
+        目录页面方式只读取本地有的artifactId和远程已有的版本目录，列表中没有摘要。
+        """
+        if self.use_search:
+            assets = self.deployer.search_assets(group_id)
+            if assets is not None:
+                return assets
+            self.use_search = False
+        group_path = group_id.replace(".", "/")
+        listed = {}
+        for artifact_id in sorted(set(versions) & set(self._names(f"{group_path}/"))):
+            artifact_path = f"{group_path}/{artifact_id}"
+            for version in sorted(versions[artifact_id] & set(self._names(f"{artifact_path}/"))):
+                for name in self._names(f"{artifact_path}/{version}/"):
+                    listed[f"{artifact_path}/{version}/{name}"] = None
+        return listed
+
+    def _names(self, remote_path):
+        return [name.rstrip("/") for name in self.deployer.list_directory(remote_path) or []]
+
+
+def plan_upload(pairs, deployer, workers=PLAN_WORKERS, log=None):
+    """演练：不上传任何文件，比较本地构件（含附属构件和签名）与远程仓库的现有文件
+
+    远程仓库每个groupId只列出一次，不逐个构件探测；只有远程已存在、列表中又没有摘要的文件才读取其.sha1
+    （本地部署索引中记录过且文件未变化的除外）。快照版本每次都会重新部署，总是计为新增。
+    返回{"new", "identical", "conflicting": [{"jar", "pom", "gav", "bytes"}], "errors": [(文件, 原因)],
+    "requests": 请求数, "elapsed": 列出和比较的耗时}，conflicting的每项另有"files"（内容不同的远程文件）。
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    log = log or (lambda message: None)
+    start = time.time()
+    requests_before = deployer.pool.stats()["requests"]
+    plan = {"new": [], "identical": [], "conflicting": [], "errors": []}
+    groups = {}
+    for jar, pom in pairs:
+        try:
+            coordinates = read_pom_coordinates(pom)
+        except (DeployError, OSError) as e:
+            plan["errors"].append((jar or pom, str(e)))
+            continue
+        groups.setdefault(coordinates["groupId"], []).append((jar, pom, coordinates))
+
+    listing = _RemoteListing(deployer)
+
+    def list_group(group_id):
+        versions = {}
+        for _, _, coordinates in groups[group_id]:
+            versions.setdefault(coordinates["artifactId"], set()).add(coordinates["version"])
+        with span("listing"):
+            return listing.list_group(group_id, versions)
+
+    def classify(unit):
+        jar, pom, coordinates, remote = unit
+        try:
+            return _classify_unit(deployer, jar, pom, coordinates, remote)
+        except (DeployError, OSError) as e:
+            return "errors", (jar or pom, str(e))
+
+    # 先并发列出各groupId，再并发比较各构件（只有远程已存在的文件才需要计算摘要）
+    units = []
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="plan") as executor:
+        futures = {group_id: executor.submit(list_group, group_id) for group_id in groups}
+        for group_id, future in futures.items():
+            try:
+                remote = future.result()
+            except (DeployError, OSError) as e:
+                log(f"❌ 无法列出 {group_id}: {e}")
+                plan["errors"].extend((jar or pom, str(e)) for jar, pom, _ in groups[group_id])
+                continue
+            units.extend((jar, pom, coordinates, remote) for jar, pom, coordinates in groups[group_id])
+        for state, entry in executor.map(classify, units):
+            plan[state].append(entry)
+            if state == "conflicting":
+                log(f"⚠️ 远程已有内容不同的文件: {entry['gav']} ({', '.join(entry['files'])})")
+    plan["requests"] = deployer.pool.stats()["requests"] - requests_before
+    plan["elapsed"] = time.time() - start
+    return plan
+
+
+def _classify_unit(deployer, jar, pom, coordinates, remote):
+    """按远程列表判断一个构件是新增、相同还是冲突，返回(状态, 条目)"""
+    gav = f"{coordinates['groupId']}:{coordinates['artifactId']}:{coordinates['version']}"
+    entry = {"jar": jar, "pom": pom, "gav": gav, "bytes": artifact_size(jar, pom)}
+    if coordinates["version"].endswith("-SNAPSHOT"):
+        return "new", entry
+    files = deployer.release_files(jar, pom, coordinates)
+    present = [(path, remote_path) for path, remote_path in files if remote_path in remote]
+    if not present:
+        return "new", entry
+    differing = []
+    for path, remote_path in present:
+        file_name = remote_path.rsplit("/", 1)[-1]
+        stat = os.stat(path)
+        known = deployer.index.get(deployer.repository_url, gav, file_name) if deployer.index else None
+        if known and known[1] == stat.st_size and known[2] == stat.st_mtime_ns:
+            local_sha1 = known[0]
+            # 索引记录的就是部署到该仓库的内容，列表中没有摘要时不必再读取远程的.sha1
+            remote_sha1 = remote[remote_path] or local_sha1
+        else:
+            with span("hashing"):
+                local_sha1 = compute_checksums(path, algorithms=("sha1",))["sha1"]
+            remote_sha1 = remote[remote_path] or deployer.remote_sha1(remote_path)
+        if (remote_sha1 or "").lower() != local_sha1:
+            differing.append(file_name)
+    if differing:
+        entry["files"] = differing
+        return "conflicting", entry
+    return ("identical" if len(present) == len(files) else "new"), entry
+
+
+# ==================== 目录监视 ====================
+
+# 文件最后一次变化后需要保持不变的时间（秒），之后才视为写入完成
+WATCH_SETTLE_SECONDS = 5.0
+# 打包类型需要JAR的POM先写入完成时，最多等待同名JAR出现的时间（秒），超时后只上传POM
+WATCH_JAR_WAIT_SECONDS = 300.0
+# 轮询方式检查目录变化的间隔（秒）
+WATCH_POLL_INTERVAL = 5.0
+# 轮询方式完整重新扫描的间隔（秒），用于发现原地改写（目录修改时间不变）的文件
+WATCH_RESCAN_INTERVAL = 600.0
+
+
+def _is_artifact_file(name):
+    """是否为需要关注的构件文件（.jar/.pom及其.asc签名，不含隐藏的临时文件）"""
+    return name.endswith((".jar", ".pom", ".jar.asc", ".pom.asc")) and not name.startswith(".")
+
+
+class InotifyWatcher:
+    """基于Linux inotify的目录树监视，只为每个目录保留一个监视描述符，内存占用与文件数无关
+
+    文件新建（IN_CREATE）、写入（IN_MODIFY）、写完关闭（IN_CLOSE_WRITE）或移入（IN_MOVED_TO）时报告，
+    正在复制的大文件从开始写入起就处于等待状态；新建或移入的子目录自动加入监视，其中已有的构件文件一并报告。
+    内核事件队列溢出时设置needs_rescan，由调用方重新扫描。
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF
+    FILE_EVENTS = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    def __init__(self, roots):
+        import ctypes
+        import ctypes.util
+
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify只在Linux上可用")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify初始化失败: {os.strerror(errno)}")
+        self._watches = {}
+        self.needs_rescan = False
+        try:
+            for root in roots:
+                self._watch_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_tree(self, root, changes=None):
+        """监视目录树中的每个目录，changes不为None时收集其中已有的构件文件"""
+        import ctypes
+
+        for dirpath, dirnames, filenames in os.walk(root):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), self.WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                # ENOSPC：超过fs.inotify.max_user_watches
+                raise OSError(errno, f"无法监视目录 {dirpath}: {os.strerror(errno)}")
+            self._watches[wd] = dirpath
+            if changes is not None:
+                changes.extend(os.path.join(dirpath, name) for name in filenames if _is_artifact_file(name))
+
+    def changes(self, timeout):
+        """等待最多timeout秒，返回新建、写入或移入的构件文件路径列表（写入大文件时的多次IN_MODIFY只报告一次）"""
+        import select
+        import struct
+
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return []
+        changes = []
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = struct.unpack_from("iIII", data, offset)
+                name = os.fsdecode(data[offset + 16:offset + 16 + length].rstrip(b"\0"))
+                offset += 16 + length
+                if mask & self.IN_Q_OVERFLOW:
+                    self.needs_rescan = True
+                    continue
+                directory = self._watches.get(wd)
+                if mask & self.IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, name)
+                if mask & self.IN_ISDIR:
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        try:
+                            self._watch_tree(path, changes)
+                        except OSError:
+                            self.needs_rescan = True
+                elif mask & self.FILE_EVENTS and _is_artifact_file(name):
+                    changes.append(path)
+        return list(dict.fromkeys(changes))
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """轮询方式的目录树监视（非Linux系统或inotify不可用时使用）
+
+    每次轮询只stat各目录，目录修改时间变化（有文件新建、删除或改名）时才重新列出其中的文件；
+    每隔rescan_interval完整扫描一次，发现原地改写的文件。只记录构件文件的大小和修改时间。
+    """
+
+    def __init__(self, roots, interval=WATCH_POLL_INTERVAL, rescan_interval=WATCH_RESCAN_INTERVAL):
+        self.interval = interval
+        self.rescan_interval = rescan_interval
+        self.needs_rescan = False
+        # 目录 -> [目录修改时间, {文件名: (大小, 修改时间)}]
+        self._dirs = {}
+        for root in roots:
+            self._scan_tree(root, None)
+        self._next_poll = time.monotonic() + interval
+        self._next_rescan = time.monotonic() + rescan_interval
+
+    def _scan_dir(self, directory, changes):
+        """重新列出目录，把新增或变化的构件文件加入changes，返回子目录列表"""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+            entries = list(os.scandir(directory))
+        except OSError:
+            self._dirs.pop(directory, None)
+            return []
+        previous = self._dirs.get(directory, (None, {}))[1]
+        files = {}
+        subdirectories = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                    continue
+                if not _is_artifact_file(entry.name):
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+            if changes is not None and previous.get(entry.name) != files[entry.name]:
+                changes.append(entry.path)
+        self._dirs[directory] = [mtime, files]
+        return subdirectories
+
+    def _scan_tree(self, root, changes):
+        stack = [root]
+        while stack:
+            stack.extend(self._scan_dir(stack.pop(), changes))
+
+    def changes(self, timeout):
+        """等待到下一次轮询（最多timeout秒），返回新增或变化的构件文件路径列表"""
+        wait = self._next_poll - time.monotonic()
+        if wait > timeout:
+            time.sleep(max(0.0, timeout))
+            return []
+        time.sleep(max(0.0, wait))
+        self._next_poll = time.monotonic() + self.interval
+        full = time.monotonic() >= self._next_rescan
+        if full:
+            self._next_rescan = time.monotonic() + self.rescan_interval
+        changes = []
+        for directory, (mtime, _) in list(self._dirs.items()):
+            try:
+                current = os.stat(directory).st_mtime_ns
+            except OSError:
+                self._dirs.pop(directory, None)
+                continue
+            if full or current != mtime:
+                for subdirectory in self._scan_dir(directory, changes):
+                    # 新出现的子目录：其中的文件都是新文件
+                    if subdirectory not in self._dirs:
+                        self._scan_tree(subdirectory, changes)
+        return changes
+
+    def close(self):
+        self._dirs.clear()
+
+
+def create_watcher(roots, poll_interval=WATCH_POLL_INTERVAL, polling=False, log=None):
+    """创建目录监视器：Linux上优先使用inotify，不可用（或polling为True）时使用轮询"""
+    log = log or (lambda message: None)
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            watcher = InotifyWatcher(roots)
+            log("👀 使用inotify监视目录")
+            return watcher
+        except (OSError, AttributeError) as e:
+            log(f"⚠️ 无法使用inotify（{e}），改为每 {poll_interval:g}s 轮询")
+    else:
+        log(f"👀 每 {poll_interval:g}s 轮询目录变化")
+    return PollingWatcher(roots, poll_interval)
+
+
+class ArtifactWatcher:
+    """监视目录并自动上传新增或变化的构件（常驻运行）
+
+    文件变化后等待settle秒且大小和修改时间不再变化才视为写入完成，随后与同名JAR/POM配对，
+    预检通过后提交给上传作业；上传期间继续接收变化。是否真的需要上传由部署索引判断（内容相同的构件跳过）。
+    uploaders_factory()每批调用一次，返回BatchUploader列表（多个仓库时每个仓库一个）；
+    on_batch(pairs, results)在一批上传完成后回调；preflight为"quick"/"full"（见preflight_artifacts）或None不预检。
+    只有packaging为pom的POM单独上传；其他POM先写入完成时最多等待jar_wait秒，等同名JAR出现后一起上传。
+    """
+
+    def __init__(self, roots, uploaders_factory, settle=WATCH_SETTLE_SECONDS, poll_interval=WATCH_POLL_INTERVAL,
+                 polling=False, preflight="quick", log=None, on_batch=None, jar_wait=WATCH_JAR_WAIT_SECONDS):
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.uploaders_factory = uploaders_factory
+        self.settle = max(0.0, float(settle))
+        self.jar_wait = max(0.0, float(jar_wait))
+        self.poll_interval = poll_interval
+        self.polling = polling
+        self.preflight = preflight
+        self.log = log or (lambda message: None)
+        self.on_batch = on_batch or (lambda pairs, results: None)
+        self.embedded_poms = EmbeddedPomCache()
+        # 等待写入完成的文件：路径 -> (到期时间, (大小, 修改时间))
+        self._pending = {}
+        # 已写入完成、正在等待JAR的POM：路径 -> 开始等待的时间
+        self._awaiting_jar = {}
+        # 正在上传的批次：[(pairs, [future])]
+        self._running = []
+
+    def run(self, stop=None, process_existing=True):
+        """运行直到stop（threading.Event）被设置或收到KeyboardInterrupt"""
+        watcher = create_watcher(self.roots, self.poll_interval, self.polling, self.log)
+        try:
+            if process_existing:
+                self._process_existing()
+            self.log(f"👀 正在监视 {len(self.roots)} 个目录，文件 {self.settle:g}s 内不再变化后上传")
+            while not (stop and stop.is_set()):
+                for path in watcher.changes(self._next_timeout()):
+                    self._touch(path)
+                if watcher.needs_rescan:
+                    watcher.needs_rescan = False
+                    self.log("⚠️ 文件变化事件过多，重新扫描监视的目录")
+                    self._process_existing()
+                self._submit(self._ready())
+                self._collect()
+        finally:
+            watcher.close()
+            for _, futures in self._running:
+                for future in futures:
+                    future.cancel()
+            self.embedded_poms.save()
+
+    def _process_existing(self):
+        """启动时（或事件丢失后）把已有的全部构件提交上传，已部署的由部署索引跳过"""
+        for root in self.roots:
+            pairs = find_artifact_pairs(root)
+            if pairs:
+                self.log(f"📦 {root} 中已有 {len(pairs)} 个构件，检查并上传新增或变化的构件")
+                self._submit(pairs)
+
+    def _touch(self, path):
+        """记录文件变化，重新开始等待"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._pending.pop(path, None)
+            return
+        self._pending[path] = (time.monotonic() + self.settle, (stat.st_size, stat.st_mtime_ns))
+
+    def _next_timeout(self):
+        """下一次需要检查的等待时间"""
+        if not self._pending:
+            return 1.0 if self._running else self.poll_interval
+        return max(0.05, min(deadline for deadline, _ in self._pending.values()) - time.monotonic())
+
+    def _ready(self):
+        """返回写入已完成的构件(jar, pom)列表；仍在变化的文件重新等待"""
+        now = time.monotonic()
+        ready = []
+        for path, (deadline, state) in list(self._pending.items()):
+            if deadline > now:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self._pending[path]
+                self._awaiting_jar.pop(path, None)
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != state:
+                self._pending[path] = (now + self.settle, (stat.st_size, stat.st_mtime_ns))
+                continue
+            del self._pending[path]
+            ready.append(path)
+        pairs = []
+        for path in ready:
+            pair = find_artifact_pair(path, self.embedded_poms)
+            if pair is None:
+                self.log(f"⚠️ 找不到 {os.path.basename(path)} 对应的POM，暂不上传")
+                continue
+            if pair in pairs or not self._jar_arrived(pair, now):
+                continue
+            # 同一构件的其他文件（含附属构件）还在写入时等它们完成后一起上传
+            members = [member for member in pair if member] + \
+                [attached for attached, _, _ in find_attached_artifacts(*pair)]
+            if any(member in self._pending for member in members):
+                continue
+            # 没有收到事件的文件（如NFS上其他机器写入，或监视开始前就在写入）按修改时间判断是否还在变化
+            unsettled = [member for member in members if member != path and self._recently_modified(member)]
+            if unsettled:
+                for member in unsettled:
+                    self._touch(member)
+                continue
+            pairs.append(pair)
+        return pairs
+
+    def _jar_arrived(self, pair, now):
+        """POM的打包类型需要JAR（默认jar）而JAR还没出现时返回False，POM继续等待，超过jar_wait后单独上传"""
+        jar, pom = pair
+        if jar is not None:
+            self._awaiting_jar.pop(pom, None)
+            return True
+        try:
+            with open(pom, "rb") as f:
+                packaging = scan_pom_coordinates(f)["packaging"]
+                stat = os.fstat(f.fileno())
+        except (ET.ParseError, OSError):
+            # 无法解析的POM交给预检报告
+            return True
+        if packaging == "pom":
+            return True
+        started = self._awaiting_jar.setdefault(pom, now)
+        if now - started >= self.jar_wait:
+            del self._awaiting_jar[pom]
+            self.log(f"⚠️ 等待 {self.jar_wait:g}s 后仍没有 {os.path.basename(pom)} 对应的JAR，只上传POM")
+            return True
+        if started == now:
+            self.log(f"⏳ {os.path.basename(pom)} 的打包类型为{packaging}，等待对应的JAR写入后一起上传")
+        self._pending[pom] = (now + max(self.settle, 1.0), (stat.st_size, stat.st_mtime_ns))
+        return False
+
+    def _recently_modified(self, path):
+        """监视目录中的文件在settle秒内修改过（提取出的内嵌POM不算）"""
+        if EMBEDDED_POM_DIR in Path(path).parents:
+            return False
+        try:
+            return time.time() - os.stat(path).st_mtime < self.settle
+        except OSError:
+            return False
+
+    def _submit(self, pairs):
+        """预检并提交一批构件"""
+        if not pairs:
+            return
+        if self.preflight:
+            failures = preflight_artifacts(pairs, full=self.preflight == "full", log=self.log)
+            pairs = [pair for pair in pairs if pair not in failures]
+            if not pairs:
+                return
+        uploaders = self.uploaders_factory()
+        self._running.append((pairs, [uploader.start(pairs) for uploader in uploaders]))
+
+    def _collect(self):
+        """汇报已完成的批次"""
+        running = []
+        for pairs, futures in self._running:
+            if not all(future.done() for future in futures):
+                running.append((pairs, futures))
+                continue
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    self.log(f"❌ 上传作业失败: {e}")
+                    results.append({"total": len(pairs), "succeeded": 0, "skipped": 0, "resumed": 0,
+                                    "failed": [(jar or pom, str(e)) for jar, pom in pairs], "bytes": 0,
+                                    "elapsed": 0.0})
+            self.on_batch(pairs, results)
+        self._running = running
+
+
+# ==================== 命令行模式 ====================
+
+# 命令行退出码
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_CONFIG = 3
+EXIT_INVALID = 4
+EXIT_INTERRUPTED = 130
+
+CLI_DEPLOY_MODES = {"native": DEPLOY_MODE_NATIVE, "maven": DEPLOY_MODE_MAVEN}
+
+
+def _add_repository_arguments(parser):
+    """添加仓库和上传方式相关的命令行参数"""
+    parser.add_argument("--url", required=True, help="Maven仓库URL")
+    parser.add_argument("--mirror", action="append", metavar="[ID=]URL",
+                        help="同时上传到的镜像仓库，可重复指定；省略ID时使用--repository-id（每个文件只读取一次）")
+    parser.add_argument("--repository-id", default="releases", help="仓库ID，对应settings.xml中的server（默认：releases）")
+    parser.add_argument("--mode", choices=sorted(CLI_DEPLOY_MODES), default="native",
+                        help="上传方式：native为原生HTTP（默认），maven为调用mvn deploy:deploy-file")
+    parser.add_argument("--maven", help="Maven可执行文件路径（maven方式，默认自动检测）")
+    parser.add_argument("--no-mvnd", action="store_true", help="maven方式不使用已安装的mvnd守护进程")
+    parser.add_argument("--maven-batch-size", type=int, default=MAVEN_BATCH_SIZE,
+                        help=f"maven方式一次Maven调用最多部署的构件数（默认：{MAVEN_BATCH_SIZE}）")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="同时在途的构件数，大量小构件时可设到数百（默认：4；maven方式不超过CPU核数）")
+    parser.add_argument("--host-limit", type=int, default=HOST_CONCURRENCY_LIMIT,
+                        help=f"同一仓库主机上同时进行的请求数上限（默认：{HOST_CONCURRENCY_LIMIT}）")
+    parser.add_argument("--pool-size", type=int,
+                        help="HTTP连接池保留的空闲持久连接数（默认为并发数和主机并发上限中较小的一个）")
+    parser.add_argument("--limit-rate", type=float, metavar="MB/S",
+                        help="全部上传合计的带宽上限，MB/s（native方式；默认不限）")
+    parser.add_argument("--order", choices=UPLOAD_ORDERS, default="input",
+                        help="上传顺序：input按扫描顺序（默认），smallest小构件优先（限速时尽快完成更多构件），"
+                             "artifact同一groupId:artifactId的版本相邻")
+    parser.add_argument("--idle-timeout", type=float, default=HTTP_IDLE_TIMEOUT,
+                        help=f"空闲连接的最长保留时间，秒（默认：{HTTP_IDLE_TIMEOUT:g}）")
+    parser.add_argument("--sha2", action="store_true", help="同时上传.sha256/.sha512校验文件（native方式）")
+    parser.add_argument("--no-skip", action="store_true", help="不检查是否已部署，总是重新上传")
+    parser.add_argument("--json", action="store_true", help="在标准输出打印JSON格式的结果汇总")
+    parser.add_argument("--metrics-json", metavar="FILE", help="把各阶段（Maven检测、摘要、上传、元数据等）的耗时报告写入JSON文件")
+    parser.add_argument("--metrics-prom", metavar="FILE",
+                        help="把各阶段耗时写入Prometheus文本格式文件（供node-exporter的textfile collector读取）")
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出过程日志")
+
+
+def build_cli_parser():
+    """构建命令行参数解析器"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="maven_uploader_modern",
+        description="Maven JAR包上传工具（命令行模式）。不带任何参数运行时启动图形界面。"
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    subparsers.required = True
+
+    upload = subparsers.add_parser("upload", help="上传单个JAR/POM，或目录中的全部构件")
+    upload.add_argument("--jar", help="要上传的JAR文件")
+    upload.add_argument("--pom", help="对应的POM文件（默认查找JAR同名的.pom）")
+    upload.add_argument("--dir", help="批量上传目录（如~/.m2/repository的子目录）")
+    upload.add_argument("--resume", action="store_true",
+                        help="根据上次同一目录/文件到同一仓库的作业日志续传，跳过已完成的构件")
+    upload.add_argument("--retries", type=int, default=RETRY_ATTEMPTS,
+                        help=f"临时错误（网络中断、HTTP 5xx/429等）的最大重试次数（默认：{RETRY_ATTEMPTS}）")
+    upload.add_argument("--with-dependencies", action="store_true",
+                        help="同时从本地Maven仓库上传远程仓库中缺少的依赖（含parent/BOM），按依赖顺序上传（仅单个构件）")
+    upload.add_argument("--preflight", choices=("quick", "full", "off"), default="quick",
+                        help="上传前预检JAR/POM：quick检查ZIP结构、清单和内嵌POM的CRC及POM坐标（默认），"
+                             "full校验JAR全部条目的CRC，off不预检")
+    upload.add_argument("--local-repo", help="本地Maven仓库目录（默认为settings.xml中的localRepository或~/.m2/repository）")
+    upload.add_argument("--dry-run", action="store_true",
+                        help="演练：不上传，按groupId列出远程仓库，报告新增、相同和冲突的构件、需要上传的字节数和预计耗时")
+    _add_repository_arguments(upload)
+    upload.set_defaults(handler=cli_upload)
+
+    watch = subparsers.add_parser("watch", help="监视目录，自动上传新增或变化的构件（常驻运行，Ctrl+C停止）")
+    watch.add_argument("directories", nargs="+", metavar="DIR", help="要监视的目录（包含子目录）")
+    watch.add_argument("--settle", type=float, default=WATCH_SETTLE_SECONDS,
+                       help=f"文件多少秒内不再变化才视为写入完成（默认：{WATCH_SETTLE_SECONDS:g}）")
+    watch.add_argument("--jar-wait", type=float, default=WATCH_JAR_WAIT_SECONDS,
+                       help=f"POM先于JAR写入完成时等待JAR的最长时间，秒，超时后只上传POM（默认：{WATCH_JAR_WAIT_SECONDS:g}）")
+    watch.add_argument("--poll-interval", type=float, default=WATCH_POLL_INTERVAL,
+                       help=f"轮询方式检查目录变化的间隔，秒（默认：{WATCH_POLL_INTERVAL:g}）")
+    watch.add_argument("--polling", action="store_true",
+                       help="不使用inotify，总是轮询（NFS/SMB共享目录上其他机器写入的文件不会产生inotify事件）")
+    watch.add_argument("--ignore-existing", action="store_true", help="启动时不处理目录中已有的构件，只上传之后的变化")
+    watch.add_argument("--retries", type=int, default=RETRY_ATTEMPTS,
+                       help=f"临时错误的最大重试次数（默认：{RETRY_ATTEMPTS}）")
+    watch.add_argument("--preflight", choices=("quick", "full", "off"), default="quick",
+                       help="上传前预检JAR/POM（默认：quick），未通过预检的构件跳过，文件再次变化后重试")
+    _add_repository_arguments(watch)
+    watch.set_defaults(handler=cli_watch)
+    return parser
+
+
+def _cli_logger(args):
+    """命令行模式的日志函数：过程日志输出到标准错误，标准输出留给JSON汇总"""
+    if args.quiet:
+        return lambda message: None
+
+    def log(message):
+        print(message, file=sys.stderr, flush=True)
+    return log
+
+
+def _cli_limiter(args, log):
+    """按--limit-rate创建全部仓库目标共享的带宽上限，不限速时返回None"""
+    if not args.limit_rate:
+        return None
+    if CLI_DEPLOY_MODES[args.mode] == DEPLOY_MODE_MAVEN:
+        log("⚠️ maven方式由Maven进程上传，--limit-rate不生效")
+        return None
+    log(f"🚦 带宽上限: {args.limit_rate:g} MB/s")
+    return TokenBucket(args.limit_rate * 1024 * 1024)
+
+
+def _cli_deploy_index(args):
+    """本次运行共享的部署索引（--no-skip时为None），由调用方在结束时关闭"""
+    return None if args.no_skip else DeployIndex()
+
+
+def _cli_deploy_func(args, log, on_state=None, target=None, buffers=None, limiter=None, index=None):
+    """按命令行参数创建deploy_func，target为(仓库ID, URL)，默认为--repository-id/--url；index为共享的部署索引"""
+    repository_id, url = target or (args.repository_id, args.url)
+    mode = CLI_DEPLOY_MODES[args.mode]
+    mvn_executable = None
+    if mode == DEPLOY_MODE_MAVEN:
+        mvn_executable = args.maven or (None if args.no_mvnd else locate_mvnd())
+        mvn_executable = mvn_executable or locate_maven(with_version=False)["path"]
+        if not mvn_executable or not os.path.exists(mvn_executable):
+            raise DeployError("未找到Maven可执行文件，请使用--maven指定路径")
+    return create_deploy_func(
+        mode,
+        repository_id,
+        url,
+        mvn_executable,
+        checksum_algorithms=CHECKSUM_ALGORITHMS if args.sha2 else DEFAULT_CHECKSUM_ALGORITHMS,
+        index=index,
+        log=log if args.workers == 1 else None,
+        maven_batch_size=args.maven_batch_size,
+        on_state=on_state,
+        pool_size=args.pool_size or min(args.workers, args.host_limit),
+        idle_timeout=args.idle_timeout,
+        buffers=buffers,
+        limiter=limiter
+    )
+
+
+def _cli_targets(args):
+    """上传目标：--repository-id/--url及各--mirror，返回[(仓库ID, URL)]"""
+    targets = [(args.repository_id, args.url)]
+    for mirror in args.mirror or []:
+        target = parse_repository_target(mirror, args.repository_id)
+        if target not in targets:
+            targets.append(target)
+    return targets
+
+
+def _print_cli_summary(args, targets, results, log, connections):
+    """输出上传结果汇总（多个仓库时逐个输出），connections为各仓库的HTTP连接池统计"""
+    summaries = []
+    for (_, url), result, stats in zip(targets, results, connections):
+        summaries.append({
+            "repository_url": url,
+            "mode": args.mode,
+            "total": result["total"],
+            "succeeded": result["succeeded"],
+            "skipped": result["skipped"],
+            "resumed": result["resumed"],
+            "failed": [{"file": path, "error": error} for path, error in result["failed"]],
+            "bytes": result["bytes"],
+            "elapsed": round(result["elapsed"], 3),
+            "connections": stats,
+        })
+        prefix = f"[{url}] " if len(targets) > 1 else ""
+        log(f"📊 {prefix}成功 {result['succeeded']} 个，跳过 {result['skipped']} 个，失败 {len(result['failed'])} 个，"
+            f"耗时 {result['elapsed']:.1f}s，"
+            f"{format_throughput(result['succeeded'], result['bytes'], result['elapsed'])}")
+        if stats:
+            log(f"🔌 {prefix}{format_connection_stats(stats)}")
+    if args.json:
+        # 第一个仓库的汇总保持原有格式，镜像仓库的汇总放在mirrors中
+        summary = summaries[0]
+        if len(summaries) > 1:
+            summary["mirrors"] = summaries[1:]
+        print(json.dumps(summary, ensure_ascii=False))
+
+
+def _write_cli_metrics(args, metrics, log):
+    """写出阶段耗时报告"""
+    try:
+        if args.metrics_json:
+            metrics.write_json(args.metrics_json)
+            log(f"⏱️ 阶段耗时报告: {args.metrics_json}")
+        if args.metrics_prom:
+            metrics.write_prometheus(args.metrics_prom)
+            log(f"⏱️ Prometheus指标: {args.metrics_prom}")
+    except OSError as e:
+        log(f"⚠️ 无法写入阶段耗时报告: {e}")
+
+
+def _cli_preflight(args, pairs, log):
+    """按--preflight预检构件，全部通过（或不预检）时返回True"""
+    if args.preflight == "off" or not pairs:
+        return True
+    failures = preflight_artifacts(pairs, full=args.preflight == "full", log=log)
+    if failures:
+        log(f"❌ {len(failures)} 个构件未通过预检，未上传任何构件")
+        return False
+    return True
+
+
+def _cli_plan(args, targets, pairs, log):
+    """--dry-run：对每个仓库生成上传计划并输出，不上传任何文件"""
+    workers = min(args.workers, args.host_limit)
+    summaries = []
+    # 所有仓库共享一个部署索引，结束时关闭
+    index = _cli_deploy_index(args)
+    try:
+        for repository_id, url in targets:
+            try:
+                credentials = load_maven_credentials(repository_id)
+            except DeployError:
+                credentials = None
+            deployer = HttpDeployer(url, credentials, index=index, pool_size=min(PLAN_WORKERS, workers))
+            try:
+                plan = plan_upload(pairs, deployer, min(PLAN_WORKERS, workers), log)
+            finally:
+                deployer.pool.close()
+            pending = plan["new"] + plan["conflicting"]
+            total_bytes = sum(entry["bytes"] for entry in pending)
+            estimate = estimate_upload_seconds(repository_host(url), len(pending), total_bytes, args.workers,
+                                               args.limit_rate * 1024 * 1024 if args.limit_rate else None)
+            summary = {
+                "repository_url": url,
+                "dry_run": True,
+                "total": len(pairs),
+                "new": len(plan["new"]),
+                "identical": len(plan["identical"]),
+                "conflicting": len(plan["conflicting"]),
+                "errors": [{"file": path, "error": error} for path, error in plan["errors"]],
+                "bytes": total_bytes,
+                "new_bytes": sum(entry["bytes"] for entry in plan["new"]),
+                "conflicting_bytes": sum(entry["bytes"] for entry in plan["conflicting"]),
+                "estimated_seconds": None if estimate is None else round(estimate, 1),
+                "requests": plan["requests"],
+                "elapsed": round(plan["elapsed"], 3),
+                "conflicts": [{"gav": entry["gav"], "files": entry["files"]} for entry in plan["conflicting"]],
+            }
+            summaries.append(summary)
+            prefix = f"[{url}] " if len(targets) > 1 else ""
+            log(f"📋 {prefix}新增 {summary['new']} 个（{format_bytes(summary['new_bytes'])}），"
+                f"相同 {summary['identical']} 个，冲突 {summary['conflicting']} 个"
+                f"（{format_bytes(summary['conflicting_bytes'])}），无法判断 {len(plan['errors'])} 个；"
+                f"列出远程仓库用了 {plan['requests']} 个请求、{plan['elapsed']:.1f}s")
+            if estimate is None:
+                log(f"⏱️ {prefix}需上传 {format_bytes(total_bytes)}，尚无该仓库的上传记录，无法估算耗时")
+            else:
+                log(f"⏱️ {prefix}需上传 {format_bytes(total_bytes)}，按实测吞吐量和 {args.workers} 个并发预计 "
+                    f"{format_duration(estimate)}")
+    finally:
+        if index:
+            index.close()
+    if args.json:
+        summary = summaries[0]
+        if len(summaries) > 1:
+            summary["mirrors"] = summaries[1:]
+        print(json.dumps(summary, ensure_ascii=False))
+    return EXIT_FAILED if any(summary["errors"] for summary in summaries) else EXIT_OK
+
+
+def cli_upload(args, log):
+    """命令行上传：单个文件或目录批量上传"""
+    if args.dir:
+        if not os.path.isdir(args.dir):
+            log(f"❌ 目录不存在: {args.dir}")
+            return EXIT_CONFIG
+        pairs = find_artifact_pairs(args.dir)
+        log(f"📦 在 {args.dir} 中找到 {len(pairs)} 个构件")
+    elif args.jar or args.pom:
+        pom = args.pom or find_pom_for_jar(args.jar) or str(Path(args.jar).with_suffix(".pom"))
+        missing = [path for path in (args.jar, pom) if path and not os.path.isfile(path)]
+        if missing:
+            log(f"❌ 文件不存在: {', '.join(missing)}")
+            return EXIT_CONFIG
+        pairs = [(args.jar, pom)]
+    else:
+        log("❌ 请指定--jar/--pom或--dir")
+        return EXIT_USAGE
+    if args.with_dependencies and args.dir:
+        log("❌ --with-dependencies只能用于单个构件（--jar/--pom）")
+        return EXIT_USAGE
+
+    metrics = enable_metrics() if args.metrics_json or args.metrics_prom else None
+    if not _cli_preflight(args, pairs, log):
+        if metrics:
+            _write_cli_metrics(args, disable_metrics(), log)
+        return EXIT_INVALID
+    targets = _cli_targets(args)
+    if args.dry_run:
+        try:
+            if args.with_dependencies:
+                checker = remote_checker(None, args.repository_id, args.url)
+                pairs, _, _ = plan_dependency_upload(*pairs[0], checker, PomResolver(args.local_repo), log)
+            return _cli_plan(args, targets, pairs, log)
+        finally:
+            if metrics:
+                _write_cli_metrics(args, disable_metrics(), log)
+    # 多个仓库时共享文件缓冲区和摘要，每个文件只读取一次
+    buffers = SharedFileBuffers(CHECKSUM_ALGORITHMS if args.sha2 else DEFAULT_CHECKSUM_ALGORITHMS) \
+        if len(targets) > 1 else None
+    journals = [UploadJournal.for_job(url, args.dir or pairs[0][1], resume=args.resume) for _, url in targets]
+    for journal in journals:
+        log(f"📒 作业日志: {journal.path}")
+    limiter = _cli_limiter(args, log)
+    index = _cli_deploy_index(args)
+    try:
+        deploy_funcs = [_cli_deploy_func(args, log, journal.mark, target, buffers, limiter, index)
+                        for target, journal in zip(targets, journals)]
+        dependencies = None
+        if args.with_dependencies:
+            checker = remote_checker(deploy_funcs[0], args.repository_id, args.url)
+            pairs, dependencies, _ = plan_dependency_upload(*pairs[0], checker, PomResolver(args.local_repo), log)
+            # 所选构件已经预检过，最后一个就是它
+            if not _cli_preflight(args, pairs[:-1], log):
+                return EXIT_INVALID
+        uploaders = []
+        for (_, url), deploy_func, journal in zip(targets, deploy_funcs, journals):
+            target_log = log if len(targets) == 1 else (lambda message, url=url: log(f"[{url}] {message}"))
+            uploaders.append(BatchUploader(deploy_func, args.workers, log=target_log, journal=journal,
+                                           retries=args.retries, host=repository_host(url),
+                                           host_limit=args.host_limit, dependencies=dependencies, order=args.order))
+        results = run_fan_out(uploaders, pairs)
+    finally:
+        for journal in journals:
+            journal.close()
+        if buffers:
+            buffers.close()
+        if index:
+            index.close()
+        if metrics:
+            _write_cli_metrics(args, disable_metrics(), log)
+    _print_cli_summary(args, targets, results, log, [connection_stats(func) for func in deploy_funcs])
+    return EXIT_FAILED if any(result["failed"] for result in results) else EXIT_OK
+
+
+def cli_watch(args, log):
+    """命令行监视模式：监视目录，自动上传新增或变化的构件，直到Ctrl+C或SIGTERM"""
+    import signal
+
+    missing = [directory for directory in args.directories if not os.path.isdir(directory)]
+    if missing:
+        log(f"❌ 目录不存在: {', '.join(missing)}")
+        return EXIT_CONFIG
+    metrics = enable_metrics() if args.metrics_json or args.metrics_prom else None
+    targets = _cli_targets(args)
+    buffers = SharedFileBuffers(CHECKSUM_ALGORITHMS if args.sha2 else DEFAULT_CHECKSUM_ALGORITHMS) \
+        if len(targets) > 1 else None
+    limiter = _cli_limiter(args, log)
+    index = _cli_deploy_index(args)
+    deploy_funcs = [_cli_deploy_func(args, log, target=target, buffers=buffers, limiter=limiter, index=index)
+                    for target in targets]
+
+    def uploaders_factory():
+        uploaders = []
+        for (_, url), deploy_func in zip(targets, deploy_funcs):
+            target_log = log if len(targets) == 1 else (lambda message, url=url: log(f"[{url}] {message}"))
+            uploaders.append(BatchUploader(deploy_func, args.workers, log=target_log, retries=args.retries,
+                                           host=repository_host(url), host_limit=args.host_limit, order=args.order))
+        return uploaders
+
+    def on_batch(pairs, results):
+        _print_cli_summary(args, targets, results, log, [connection_stats(func) for func in deploy_funcs])
+
+    stop = threading.Event()
+    if threading.current_thread() is threading.main_thread() and hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    watcher = ArtifactWatcher(args.directories, uploaders_factory, args.settle, args.poll_interval, args.polling,
+                              None if args.preflight == "off" else args.preflight, log, on_batch, args.jar_wait)
+    try:
+        watcher.run(stop, process_existing=not args.ignore_existing)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if buffers:
+            buffers.close()
+        if index:
+            index.close()
+        if metrics:
+            _write_cli_metrics(args, disable_metrics(), log)
+    log("⏹️ 已停止监视")
+    return EXIT_OK
+
+
+def run_cli(argv):
+    """以命令行模式运行，返回退出码"""
+    args = build_cli_parser().parse_args(argv)
+    log = _cli_logger(args)
+    try:
+        return args.handler(args, log)
+    except DeployError as e:
+        log(f"❌ {e}")
+        return EXIT_CONFIG
+    except KeyboardInterrupt:
+        log("⚠️ 已中断")
+        return EXIT_INTERRUPTED
+
+
+if __name__ == "__main__":
+    sys.exit(run_cli(sys.argv[1:]))
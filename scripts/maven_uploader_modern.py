@@ -3,26 +3,94 @@
 """
 Maven JAR包上传工具 - 现代化版本
 用于将本地jar包和pom文件上传到私有Maven仓库
-使用CustomTkinter提供现代化的用户界面
+使用CustomTkinter提供现代化的用户界面；带参数运行时为无界面的命令行模式
 """
 
-import customtkinter as ctk
-import tkinter as tk
-from tkinter import filedialog, messagebox
-import subprocess
 import os
 import sys
 from pathlib import Path
 import threading
 import time
 
-# 设置CustomTkinter主题
-ctk.set_appearance_mode("system")  # 跟随系统主题
-ctk.set_default_color_theme("blue")  # 蓝色主题
+from maven_uploader_core import (
+    BatchUploader,
+    CHECKSUM_ALGORITHMS,
+    DEFAULT_CHECKSUM_ALGORITHMS,
+    DEPLOY_MODE_MAVEN,
+    DEPLOY_MODE_NATIVE,
+    HOST_CONCURRENCY_LIMIT,
+    DeployError,
+    DeployIndex,
+    HttpDeployer,
+    LogSink,
+    MAVEN_EVENT_UPLOADED,
+    MavenOutputParser,
+    PomResolver,
+    SharedFileBuffers,
+    TokenBucket,
+    TransferProgress,
+    UiBridge,
+    UploadJournal,
+    artifact_size,
+    build_maven_deploy_command,
+    connection_stats,
+    create_deploy_func,
+    find_artifact_pair,
+    find_artifact_pairs,
+    find_attached_artifacts,
+    find_pom_for_jar,
+    format_bytes,
+    format_connection_stats,
+    format_progress,
+    format_throughput,
+    get_scheduler,
+    load_maven_credentials,
+    locate_maven,
+    locate_mvnd,
+    parse_repository_target,
+    plan_dependency_upload,
+    preflight_artifacts,
+    read_pom_coordinates,
+    remote_checker,
+    repository_host,
+    run_cli,
+    run_fan_out,
+    run_maven_deploy,
+)
+
+# 界面上上传顺序的显示名称
+UPLOAD_ORDER_LABELS = {"扫描顺序": "input", "小构件优先": "smallest", "按构件分组": "artifact"}
+
+# 界面日志框最多保留的行数及刷新间隔，完整日志写入滚动日志文件
+LOG_MAX_LINES = 2000
+LOG_FLUSH_INTERVAL_MS = 50
+
+# 图形界面依赖在_load_gui()中按需导入，命令行模式不会加载customtkinter/Tk
+ctk = None
+tk = None
+filedialog = None
+messagebox = None
+
+
+def _load_gui():
+    """导入图形界面依赖并设置CustomTkinter主题"""
+    global ctk, tk, filedialog, messagebox
+    if ctk is not None:
+        return
+    import customtkinter
+    import tkinter
+    from tkinter import filedialog as tk_filedialog, messagebox as tk_messagebox
+
+    # 设置CustomTkinter主题
+    customtkinter.set_appearance_mode("system")  # 跟随系统主题
+    customtkinter.set_default_color_theme("blue")  # 蓝色主题
+    ctk, tk, filedialog, messagebox = customtkinter, tkinter, tk_filedialog, tk_messagebox
 
 
 class ModernMavenUploader:
     def __init__(self):
+        _load_gui()
+
         # 创建主窗口
         self.root = ctk.CTk()
         self.root.title("Maven JAR包上传工具 - 现代化版本")
@@ -41,18 +109,49 @@ class ModernMavenUploader:
         # 文件路径变量
         self.jar_file_path = ctk.StringVar()
         self.pom_file_path = ctk.StringVar()
+
+        # 批量上传目录及并发数
+        self.batch_dir_path = ctk.StringVar()
+        self.worker_count = ctk.StringVar(value="4")
+        # 是否根据上次的作业日志续传，跳过已完成的构件
+        self.resume_batch = ctk.BooleanVar(value=False)
         
         # Maven仓库配置变量
         self.repository_id = ctk.StringVar(value="releases")
         self.repository_url = ctk.StringVar()
+        # 同时上传到的镜像仓库，"[仓库ID=]URL"，多个用空格或逗号分隔
+        self.mirror_repositories = ctk.StringVar()
         
         # Maven路径配置变量
         self.maven_path = ctk.StringVar()
+        # 已安装mvnd时优先使用常驻的Maven守护进程
+        self.use_mvnd = ctk.BooleanVar(value=True)
+
+        # 上传方式：原生HTTP直接PUT，或调用Maven命令
+        self.deploy_mode = ctk.StringVar(value=DEPLOY_MODE_NATIVE)
+        # 原生HTTP方式是否额外上传.sha256/.sha512校验文件
+        self.upload_sha2_checksums = ctk.BooleanVar(value=False)
+        # 是否跳过内容相同的已部署构件（基于本地部署索引和远程校验值）
+        self.skip_deployed = ctk.BooleanVar(value=True)
+        self.deploy_index = None
+        # 上传单个构件时是否同时从本地Maven仓库上传远程缺少的依赖
+        self.upload_dependencies = ctk.BooleanVar(value=False)
+        self.pom_resolver = None
+        # 全部上传作业合计的带宽上限（MB/s，空为不限）及批量上传的顺序
+        self.bandwidth_limit = ctk.StringVar()
+        self.upload_order = ctk.StringVar(value="扫描顺序")
+        self.bandwidth_limiter = None
+
+        # 状态变量：进行中的上传作业数，作业由共享的异步调度器执行，可以同时进行多个
+        self.active_uploads = 0
         
-        # 状态变量
-        self.is_uploading = False
-        
+        # 日志缓冲，由界面线程定时批量刷新到日志框
+        self.log_sink = LogSink()
+        # 工作线程更新界面的回调队列，与日志一起由界面线程定时执行
+        self.ui = UiBridge()
+
         self.setup_ui()
+        self._flush_log_queue()
         
         # 启动时自动检测Maven
         self.auto_detect_maven()
@@ -179,6 +278,56 @@ class ModernMavenUploader:
             font=ctk.CTkFont(size=12, weight="bold")
         )
         pom_button.pack(side="right")
+
+        # 批量上传目录选择
+        batch_frame = ctk.CTkFrame(file_frame, fg_color="transparent")
+        batch_frame.pack(fill="x", padx=20, pady=(0, 20))
+
+        batch_label = ctk.CTkLabel(
+            batch_frame,
+            text="批量目录:",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            width=100
+        )
+        batch_label.pack(side="left", padx=(0, 10))
+
+        self.batch_entry = ctk.CTkEntry(
+            batch_frame,
+            textvariable=self.batch_dir_path,
+            placeholder_text="可选：选择目录批量上传其中所有JAR/POM（如 ~/.m2/repository 子目录）...",
+            font=ctk.CTkFont(size=12),
+            height=35
+        )
+        self.batch_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
+
+        self.worker_menu = ctk.CTkOptionMenu(
+            batch_frame,
+            values=["1", "2", "4", "8", "16", "32", "64", "128", "256"],
+            variable=self.worker_count,
+            width=70,
+            height=35,
+            font=ctk.CTkFont(size=12, weight="bold")
+        )
+        self.worker_menu.pack(side="right")
+
+        self.resume_checkbox = ctk.CTkCheckBox(
+            batch_frame,
+            text="续传",
+            variable=self.resume_batch,
+            width=60,
+            font=ctk.CTkFont(size=12)
+        )
+        self.resume_checkbox.pack(side="right", padx=(0, 10))
+
+        batch_button = ctk.CTkButton(
+            batch_frame,
+            text="选择目录",
+            command=self.select_batch_directory,
+            width=100,
+            height=35,
+            font=ctk.CTkFont(size=12, weight="bold")
+        )
+        batch_button.pack(side="right", padx=(0, 10))
         
     def create_maven_config_section(self):
         """创建Maven配置区域"""
@@ -262,6 +411,14 @@ class ModernMavenUploader:
             justify="left"
         )
         help_text.pack(anchor="w", pady=(5, 0))
+
+        self.mvnd_checkbox = ctk.CTkCheckBox(
+            self.maven_status_frame,
+            text="优先使用mvnd守护进程（如已安装），批量上传时多个构件合并为一次Maven调用",
+            variable=self.use_mvnd,
+            font=ctk.CTkFont(size=12)
+        )
+        self.mvnd_checkbox.pack(anchor="w", pady=(10, 0))
         
     def create_repository_section(self):
         """创建仓库配置区域"""
@@ -318,13 +475,119 @@ class ModernMavenUploader:
             height=35
         )
         self.repo_url_entry.pack(side="left", fill="x", expand=True)
-        
+
+        # 镜像仓库
+        mirror_frame = ctk.CTkFrame(repo_frame, fg_color="transparent")
+        mirror_frame.pack(fill="x", padx=20, pady=(0, 15))
+
+        mirror_label = ctk.CTkLabel(
+            mirror_frame,
+            text="镜像仓库:",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            width=100
+        )
+        mirror_label.pack(side="left", padx=(0, 10))
+
+        self.mirror_entry = ctk.CTkEntry(
+            mirror_frame,
+            textvariable=self.mirror_repositories,
+            placeholder_text="可选：同时上传到的其他仓库，格式 [仓库ID=]URL，多个用空格分隔",
+            font=ctk.CTkFont(size=12),
+            height=35
+        )
+        self.mirror_entry.pack(side="left", fill="x", expand=True)
+
+        # 上传方式
+        deploy_mode_frame = ctk.CTkFrame(repo_frame, fg_color="transparent")
+        deploy_mode_frame.pack(fill="x", padx=20, pady=(0, 15))
+
+        deploy_mode_label = ctk.CTkLabel(
+            deploy_mode_frame,
+            text="上传方式:",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            width=100
+        )
+        deploy_mode_label.pack(side="left", padx=(0, 10))
+
+        self.deploy_mode_button = ctk.CTkSegmentedButton(
+            deploy_mode_frame,
+            values=[DEPLOY_MODE_NATIVE, DEPLOY_MODE_MAVEN],
+            variable=self.deploy_mode,
+            font=ctk.CTkFont(size=12, weight="bold"),
+            height=35
+        )
+        self.deploy_mode_button.pack(side="left")
+
+        self.sha2_checkbox = ctk.CTkCheckBox(
+            deploy_mode_frame,
+            text="同时上传SHA-256/SHA-512校验文件",
+            variable=self.upload_sha2_checksums,
+            font=ctk.CTkFont(size=12)
+        )
+        self.sha2_checkbox.pack(side="left", padx=(15, 0))
+
+        self.skip_deployed_checkbox = ctk.CTkCheckBox(
+            deploy_mode_frame,
+            text="跳过已部署的相同构件",
+            variable=self.skip_deployed,
+            font=ctk.CTkFont(size=12)
+        )
+        self.skip_deployed_checkbox.pack(side="left", padx=(15, 0))
+
+        self.dependencies_checkbox = ctk.CTkCheckBox(
+            deploy_mode_frame,
+            text="同时上传缺少的依赖",
+            variable=self.upload_dependencies,
+            font=ctk.CTkFont(size=12)
+        )
+        self.dependencies_checkbox.pack(side="left", padx=(15, 0))
+
+        # 带宽上限和上传顺序
+        transfer_frame = ctk.CTkFrame(repo_frame, fg_color="transparent")
+        transfer_frame.pack(fill="x", padx=20, pady=(0, 15))
+
+        transfer_label = ctk.CTkLabel(
+            transfer_frame,
+            text="带宽上限:",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            width=100
+        )
+        transfer_label.pack(side="left", padx=(0, 10))
+
+        self.bandwidth_entry = ctk.CTkEntry(
+            transfer_frame,
+            textvariable=self.bandwidth_limit,
+            placeholder_text="不限",
+            font=ctk.CTkFont(size=12),
+            width=80,
+            height=35
+        )
+        self.bandwidth_entry.pack(side="left")
+
+        bandwidth_unit_label = ctk.CTkLabel(transfer_frame, text="MB/s（原生HTTP方式）", font=ctk.CTkFont(size=12))
+        bandwidth_unit_label.pack(side="left", padx=(5, 20))
+
+        order_label = ctk.CTkLabel(transfer_frame, text="上传顺序:", font=ctk.CTkFont(size=12))
+        order_label.pack(side="left", padx=(0, 10))
+
+        self.order_menu = ctk.CTkOptionMenu(
+            transfer_frame,
+            values=list(UPLOAD_ORDER_LABELS),
+            variable=self.upload_order,
+            width=120,
+            height=35,
+            font=ctk.CTkFont(size=12)
+        )
+        self.order_menu.pack(side="left")
+
         # 示例URL
         example_label = ctk.CTkLabel(
             repo_frame,
-            text="💡 示例: http://10.0.129.11:8081/repository/maven-releases/",
+            text="💡 示例: http://10.0.129.11:8081/repository/maven-releases/\n"
+                 "   原生HTTP方式直接上传，认证信息读取 ~/.m2/settings.xml 中与仓库ID同名的server",
             font=ctk.CTkFont(size=11),
-            text_color=("gray50", "gray40")
+            text_color=("gray50", "gray40"),
+            justify="left"
         )
         example_label.pack(pady=(0, 20), padx=20, anchor="w")
         
@@ -460,53 +723,7 @@ class ModernMavenUploader:
         self.log_message("🚀 Maven JAR包上传工具启动")
         self.log_message("=" * 60)
         self.log_message("")
-        self.log_message("🔍 正在自动检测Maven配置...")
-        self.maven_status_label.configure(text="状态: 检测中...", text_color="blue")
-        self.root.update_idletasks()
-        
-        # 显示环境变量信息
-        self.log_message("📋 步骤1: 检查环境变量配置")
-        maven_home = os.getenv('MAVEN_HOME')
-        if maven_home:
-            self.log_message(f"  ✅ 检测到MAVEN_HOME环境变量: {maven_home}")
-        else:
-            self.log_message("  ❌ 未检测到MAVEN_HOME环境变量")
-        
-        self.log_message("")
-        self.log_message("🔍 步骤2: 查找Maven可执行文件")
-        mvn_executable = self.find_maven_executable()
-        
-        if mvn_executable:
-            self.maven_path.set(mvn_executable)
-            self.maven_status_label.configure(text="状态: ✅ 已找到Maven", text_color="green")
-            self.log_message(f"  ✅ 成功找到Maven: {mvn_executable}")
-            self.log_message("")
-            self.log_message("🎉 检测完成！Maven配置正常")
-            self.log_message("")
-            self.log_message("📝 下一步操作:")
-            self.log_message("1. 点击'选择JAR'按钮选择要上传的JAR文件")
-            self.log_message("2. 程序会自动查找对应的POM文件")
-            self.log_message("3. 输入Maven仓库URL")
-            self.log_message("4. 点击'上传到Maven仓库'开始上传")
-        else:
-            self.maven_status_label.configure(text="状态: ❌ 未找到Maven", text_color="red")
-            self.log_message("  ❌ 未找到Maven可执行文件")
-            self.log_message("")
-            self.log_message("⚠️ 检测失败！需要手动配置Maven")
-            self.log_message("")
-            self.log_message("🛠️ 解决方案:")
-            self.log_message("1. 点击'手动选择'按钮手动指定Maven路径")
-            self.log_message("2. 检查Maven环境变量配置")
-            self.log_message("3. 确保Maven已正确安装")
-            self.log_message("4. 常见Maven路径:")
-            self.log_message("   - D:\\Maven\\apache-maven-3.9.10\\bin\\mvn.cmd")
-            self.log_message("   - C:\\Program Files\\Apache\\maven\\bin\\mvn.cmd")
-        
-        self.log_message("")
-        self.log_message("=" * 60)
-        # 确保日志滚动到最新内容
-        self.log_text.see("end")
-        self.root.update_idletasks()
+        self._start_maven_detection(manual=False)
         
     def auto_detect_maven_manual(self):
         """手动触发Maven自动检测"""
@@ -515,10 +732,21 @@ class ModernMavenUploader:
         self.log_message("🔄 手动触发Maven自动检测")
         self.log_message("=" * 50)
         self.log_message("")
-        self.log_message("🔍 正在重新检测Maven配置...")
+        self._start_maven_detection(manual=True)
+
+    def _start_maven_detection(self, manual):
+        """在后台线程中检测Maven，界面不会因检测而卡顿；手动检测时忽略缓存"""
+        self.log_message("🔍 正在自动检测Maven配置..." if not manual else "🔍 正在重新检测Maven配置...")
         self.maven_status_label.configure(text="状态: 检测中...", text_color="blue")
-        self.root.update_idletasks()
-        
+
+        def worker():
+            result = locate_maven(use_cache=not manual)
+            self.ui.post(lambda: self._show_maven_detection_result(result, manual))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _show_maven_detection_result(self, result, manual):
+        """在主线程中显示Maven检测结果"""
         # 显示环境变量信息
         self.log_message("📋 步骤1: 检查环境变量配置")
         maven_home = os.getenv('MAVEN_HOME')
@@ -529,30 +757,51 @@ class ModernMavenUploader:
         
         self.log_message("")
         self.log_message("🔍 步骤2: 查找Maven可执行文件")
-        mvn_executable = self.find_maven_executable()
+        if result["from_cache"]:
+            self.log_message("  ⚡ 使用缓存的检测结果（Maven文件未变化）")
+        else:
+            checked = len(result["probes"])
+            self.log_message(f"  已并行检查 {checked} 个候选位置")
+        mvn_executable = result["path"]
         
         if mvn_executable:
-            self.maven_path.set(mvn_executable)
-            self.maven_status_label.configure(text="状态: ✅ 已找到Maven", text_color="green")
-            self.log_message(f"  ✅ 成功找到Maven: {mvn_executable}")
+            # 用户已手动指定有效路径时，启动检测不覆盖
+            if manual or not self.maven_path.get() or not os.path.exists(self.maven_path.get()):
+                self.maven_path.set(mvn_executable)
+            version = f" (版本 {result['version']})" if result.get("version") else ""
+            self.maven_status_label.configure(text=f"状态: ✅ 已找到Maven{version}", text_color="green")
+            self.log_message(f"  ✅ 成功找到Maven: {mvn_executable}{version}")
             self.log_message("")
             self.log_message("🎉 检测完成！Maven配置正常")
+            if not manual:
+                self.log_message("")
+                self.log_message("📝 下一步操作:")
+                self.log_message("1. 点击'选择JAR'按钮选择要上传的JAR文件")
+                self.log_message("2. 程序会自动查找对应的POM文件")
+                self.log_message("3. 输入Maven仓库URL")
+                self.log_message("4. 点击'上传到Maven仓库'开始上传")
         else:
             self.maven_status_label.configure(text="状态: ❌ 未找到Maven", text_color="red")
             self.log_message("  ❌ 未找到Maven可执行文件")
+            for label, found in result["probes"]:
+                self.log_message(f"    检查: {label} ❌")
             self.log_message("")
-            self.log_message("⚠️ 检测失败！请尝试手动选择Maven路径")
+            self.log_message("⚠️ 检测失败！需要手动配置Maven" if not manual else "⚠️ 检测失败！请尝试手动选择Maven路径")
+            self.log_message("   （使用原生HTTP方式上传时不需要Maven）")
             self.log_message("")
             self.log_message("🛠️ 解决方案:")
             self.log_message("1. 点击'手动选择'按钮手动指定Maven路径")
             self.log_message("2. 检查Maven环境变量配置")
             self.log_message("3. 确保Maven已正确安装")
+            if not manual:
+                self.log_message("4. 常见Maven路径:")
+                self.log_message("   - D:\\Maven\\apache-maven-3.9.10\\bin\\mvn.cmd")
+                self.log_message("   - C:\\Program Files\\Apache\\maven\\bin\\mvn.cmd")
         
         self.log_message("")
-        self.log_message("=" * 50)
+        self.log_message("=" * (50 if manual else 60))
         # 确保日志滚动到最新内容
         self.log_text.see("end")
-        self.root.update_idletasks()
         
     def select_jar_file(self):
         """选择JAR文件"""
@@ -561,11 +810,18 @@ class ModernMavenUploader:
             filetypes=[("JAR files", "*.jar"), ("All files", "*.*")]
         )
         if file_path:
+            # 选中的是-sources.jar等附属构件时改为选择其主构件，附属构件随主构件一起上传
+            pair = find_artifact_pair(file_path)
+            if pair and pair[0] and os.path.abspath(pair[0]) != os.path.abspath(file_path):
+                self.log_message(f"🔗 {Path(file_path).name} 是附属构件，改为选择主构件: {pair[0]}")
+                file_path = pair[0]
             self.jar_file_path.set(file_path)
             self.log_message(f"📁 已选择JAR文件: {file_path}")
             
             # 自动查找对应的POM文件
             self.auto_find_pom_file(file_path)
+            for path, classifier, file_type in find_attached_artifacts(file_path, self.pom_file_path.get() or None):
+                self.log_message(f"📎 将一起上传附属构件 [{classifier or file_type}]: {Path(path).name}")
     
     def select_pom_file(self):
         """选择POM文件"""
@@ -577,6 +833,14 @@ class ModernMavenUploader:
             self.pom_file_path.set(file_path)
             self.log_message(f"📄 已选择POM文件: {file_path}")
     
+    def select_batch_directory(self):
+        """选择批量上传目录"""
+        dir_path = filedialog.askdirectory(title="选择包含JAR/POM的目录")
+        if dir_path:
+            self.batch_dir_path.set(dir_path)
+            self.log_message(f"📂 已选择批量上传目录: {dir_path}")
+            self.log_message(f"   将使用 {self.worker_count.get()} 个并发任务上传（可在右侧调整）")
+
     def select_maven_path(self):
         """选择Maven可执行文件"""
         file_path = filedialog.askopenfilename(
@@ -600,6 +864,13 @@ class ModernMavenUploader:
         if pom_file.exists():
             self.pom_file_path.set(str(pom_file))
             self.log_message(f"🔍 自动找到POM文件: {pom_file}")
+            return
+
+        # 没有同名POM时尝试使用JAR内嵌的META-INF/maven/.../pom.xml
+        embedded_pom = find_pom_for_jar(jar_path)
+        if embedded_pom:
+            self.pom_file_path.set(embedded_pom)
+            self.log_message(f"🔍 使用JAR内嵌的POM: {Path(embedded_pom).name}")
         else:
             self.log_message("⚠️ 未找到对应的POM文件，请手动选择")
     
@@ -607,8 +878,10 @@ class ModernMavenUploader:
         """清空所有字段（保留Maven路径）"""
         self.jar_file_path.set("")
         self.pom_file_path.set("")
+        self.batch_dir_path.set("")
         self.repository_id.set("releases")
         self.repository_url.set("")
+        self.mirror_repositories.set("")
         self.log_text.delete("1.0", "end")
         self.log_message("🗑️ 已清空文件选择和仓库配置（保留Maven路径）")
         self.progress_bar.set(0)
@@ -628,9 +901,11 @@ class ModernMavenUploader:
         if result:
             self.jar_file_path.set("")
             self.pom_file_path.set("")
+            self.batch_dir_path.set("")
             self.maven_path.set("")
             self.repository_id.set("releases")
             self.repository_url.set("")
+            self.mirror_repositories.set("")
             self.log_text.delete("1.0", "end")
             self.log_message("🗑️ 已完全清空所有字段")
             self.log_message("请重新选择Maven路径或等待自动检测")
@@ -638,16 +913,39 @@ class ModernMavenUploader:
             self.progress_label.configure(text="就绪")
     
     def log_message(self, message):
-        """在日志区域添加消息"""
-        self.log_text.insert("end", f"{message}\n")
-        self.log_text.see("end")
-        self.root.update_idletasks()
-        
-        # 强制刷新界面，确保日志立即显示
-        self.log_text.update_idletasks()
+        """在日志区域添加消息（线程安全，实际显示由_flush_log_queue批量完成）"""
+        self.log_sink.write(message)
+
+    def _flush_log_queue(self):
+        """按固定帧率执行工作线程提交的界面更新，把缓冲的日志批量写入日志框，并限制日志框的行数"""
+        for callback in self.ui.drain():
+            try:
+                callback()
+            except Exception as e:
+                self.log_message(f"❌ 界面更新失败: {e}")
+        lines, dropped = self.log_sink.drain(LOG_MAX_LINES)
+        if lines:
+            if dropped:
+                lines.insert(0, f"…… 省略 {dropped} 行，完整日志见: {self.log_sink.log_file}")
+            self.log_text.insert("end", "\n".join(lines) + "\n")
+            # 删除到第line_count - LOG_MAX_LINES行（含），文本框中恰好保留LOG_MAX_LINES行
+            line_count = int(self.log_text.index("end-1c").split(".")[0])
+            if line_count > LOG_MAX_LINES:
+                self.log_text.delete("1.0", f"{line_count - LOG_MAX_LINES + 1}.0")
+            self.log_text.see("end")
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self._flush_log_queue)
     
     def validate_inputs(self):
         """验证输入参数"""
+        if self.batch_dir_path.get():
+            if not os.path.isdir(self.batch_dir_path.get()):
+                messagebox.showerror("错误", "批量上传目录不存在")
+                return False
+            if not self.repository_id.get() or not self.repository_url.get():
+                messagebox.showerror("错误", "请输入仓库ID和仓库URL")
+                return False
+            return True
+
         if not self.jar_file_path.get():
             messagebox.showerror("错误", "请选择JAR文件")
             return False
@@ -676,185 +974,429 @@ class ModernMavenUploader:
         return True
     
     def find_maven_executable(self):
-        """查找Maven可执行文件"""
-        import shutil
-        
-        self.log_message("🔍 正在查找Maven可执行文件...")
-        
+        """查找Maven可执行文件（优先使用用户指定的路径，其次使用缓存的检测结果）"""
         # 如果用户手动指定了Maven路径，优先使用
         if self.maven_path.get():
             maven_path = self.maven_path.get()
-            self.log_message(f"使用用户指定的Maven路径: {maven_path}")
             if os.path.exists(maven_path):
-                self.log_message(f"✅ 找到Maven: {maven_path}")
                 return maven_path
-            else:
-                self.log_message(f"❌ 指定的Maven路径不存在: {maven_path}")
-        
-        # 1. 检查环境变量中的MAVEN_HOME（优先级最高）
-        maven_home = os.getenv('MAVEN_HOME')
-        if maven_home:
-            self.log_message(f"检测到MAVEN_HOME环境变量: {maven_home}")
-            mvn_path = os.path.join(maven_home, 'bin', 'mvn.cmd')
-            if os.path.exists(mvn_path):
-                self.log_message(f"✅ 通过MAVEN_HOME找到Maven: {mvn_path}")
-                return mvn_path
-            else:
-                self.log_message(f"❌ MAVEN_HOME路径下未找到mvn.cmd: {mvn_path}")
-        
-        # 2. 检查PATH中的mvn命令
-        self.log_message("检查PATH环境变量中的mvn命令...")
-        mvn_path = shutil.which("mvn")
-        if mvn_path:
-            self.log_message(f"✅ 通过PATH找到Maven: {mvn_path}")
-            return mvn_path
-        else:
-            self.log_message("❌ PATH中未找到mvn命令")
-        
-        # 3. 检查常见的Maven安装目录
-        self.log_message("检查常见的Maven安装目录...")
-        common_maven_paths = [
-            r"C:\Program Files\Apache\maven\bin\mvn.cmd",
-            r"C:\Program Files (x86)\Apache\maven\bin\mvn.cmd",
-            r"C:\apache-maven\bin\mvn.cmd",
-            r"C:\maven\bin\mvn.cmd",
-            r"D:\apache-maven\bin\mvn.cmd",
-            r"D:\maven\bin\mvn.cmd",
-            r"D:\Maven\bin\mvn.cmd",
-            r"C:\Users\{}\apache-maven\bin\mvn.cmd".format(os.getenv('USERNAME', '')),
-            r"C:\Users\{}\maven\bin\mvn.cmd".format(os.getenv('USERNAME', '')),
-        ]
-        
-        for path in common_maven_paths:
-            self.log_message(f"检查: {path}")
-            if os.path.exists(path):
-                self.log_message(f"✅ 在常见目录找到Maven: {path}")
-                return path
-            else:
-                self.log_message(f"❌ 不存在")
-        
+            self.log_message(f"❌ 指定的Maven路径不存在: {maven_path}")
+
+        result = locate_maven(with_version=False)
+        if result["path"]:
+            return result["path"]
         self.log_message("❌ 未找到Maven可执行文件")
         return None
 
+    def _maven_command_executable(self):
+        """Maven方式使用的启动器：勾选了mvnd且已安装时使用mvnd，否则使用Maven路径"""
+        if self.use_mvnd.get():
+            mvnd_executable = locate_mvnd()
+            if mvnd_executable:
+                self.log_message(f"⚡ 使用mvnd守护进程: {mvnd_executable}")
+                return mvnd_executable
+        return self.find_maven_executable()
+
     def upload_to_maven(self):
         """执行Maven上传"""
         if not self.validate_inputs():
             return
         
-        if self.is_uploading:
-            messagebox.showwarning("警告", "正在上传中，请稍候...")
-            return
-        
-        # 禁用上传按钮，显示进度条
-        self.upload_button.configure(state='disabled', text="⏳ 上传中...")
-        self.progress_bar.set(0)
-        self.progress_label.configure(text="准备上传...")
-        self.is_uploading = True
-        
-        # 在新线程中执行上传
-        upload_thread = threading.Thread(target=self._perform_upload)
-        upload_thread.daemon = True
-        upload_thread.start()
+        # 上传期间仍可提交新的作业（如另一个目录），由调度器同时执行
+        self.active_uploads += 1
+        self.upload_button.configure(text=f"🚀 上传到Maven仓库（进行中: {self.active_uploads}）")
+        if self.active_uploads == 1:
+            self.progress_bar.set(0)
+            self.progress_label.configure(text="准备上传...")
+
+        get_scheduler().submit_blocking(self._perform_upload)
         
     def _perform_upload(self):
         """执行上传操作"""
         try:
-            # 查找Maven可执行文件
-            mvn_executable = self.find_maven_executable()
-            if not mvn_executable:
-                self.log_message("❌ 错误: 未找到Maven可执行文件")
-                self.log_message("")
-                self.log_message("🛠️ 解决方案:")
-                self.log_message("1. 点击'手动选择'按钮手动指定Maven路径")
-                self.log_message("2. 检查Maven环境变量配置:")
-                self.log_message("   - MAVEN_HOME: " + str(os.getenv('MAVEN_HOME', '未设置')))
-                self.log_message("   - PATH中是否包含: %MAVEN_HOME%\\bin")
-                self.log_message("3. 常见Maven安装路径:")
-                self.log_message("   - D:\\Maven\\bin\\mvn.cmd")
-                self.log_message("   - C:\\Program Files\\Apache\\maven\\bin\\mvn.cmd")
-                self.log_message("   - C:\\apache-maven\\bin\\mvn.cmd")
-                
-                # 提供选择Maven的选项
-                self.root.after(0, lambda: messagebox.askyesno("Maven未找到", 
-                    "未找到Maven可执行文件。\n\n"
-                    "是否现在选择Maven路径？\n\n"
-                    "点击'是'选择Maven路径\n"
-                    "点击'否'取消上传"))
-                
+            if self.batch_dir_path.get():
+                self._perform_batch_upload()
+            elif self.upload_dependencies.get():
+                self._perform_dependency_upload()
+            elif self.mirror_repositories.get().strip():
+                self._run_batch([(self.jar_file_path.get() or None, self.pom_file_path.get())], self.pom_file_path.get())
+            elif not self._preflight([(self.jar_file_path.get() or None, self.pom_file_path.get())]):
                 return
-            
-            self.log_message(f"✅ 找到Maven可执行文件: {mvn_executable}")
-            
-            # 构建Maven命令
-            maven_cmd = [
-                mvn_executable, "deploy:deploy-file",
-                f"-Dfile={self.jar_file_path.get()}",
-                f"-DpomFile={self.pom_file_path.get()}",
-                f"-DrepositoryId={self.repository_id.get()}",
-                f"-Durl={self.repository_url.get()}"
-            ]
-            
-            self.log_message("🚀 开始执行Maven上传命令...")
-            self.log_message(f"命令: {' '.join(maven_cmd)}")
-            
-            # 更新进度
-            self.root.after(0, lambda: self.progress_bar.set(0.3))
-            self.root.after(0, lambda: self.progress_label.configure(text="正在执行Maven命令..."))
-            
-            # 执行Maven命令
-            process = subprocess.Popen(
-                maven_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                shell=True  # 在Windows上使用shell=True
-            )
-            
-            # 实时显示输出
-            while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    self.log_message(output.strip())
-                    # 更新进度条
-                    self.root.after(0, lambda: self.progress_bar.set(0.7))
-            
-            # 等待进程完成
-            return_code = process.wait()
-            
-            # 更新进度条
-            self.root.after(0, lambda: self.progress_bar.set(1.0))
-            
-            if return_code == 0:
-                self.log_message("🎉 上传成功！")
-                self.root.after(0, lambda: self.progress_label.configure(text="上传成功！"))
-                self.root.after(0, lambda: messagebox.showinfo("成功", "JAR包已成功上传到Maven仓库！"))
+            elif self.deploy_mode.get() == DEPLOY_MODE_NATIVE:
+                self._perform_native_upload()
             else:
-                self.log_message("❌ 上传失败！")
-                self.root.after(0, lambda: self.progress_label.configure(text="上传失败"))
-                self.root.after(0, lambda: messagebox.showerror("错误", "上传失败，请检查日志信息"))
-                
+                self._perform_maven_upload()
         except Exception as e:
             self.log_message(f"❌ 发生错误: {str(e)}")
-            self.root.after(0, lambda: self.progress_label.configure(text="发生错误"))
-            self.root.after(0, lambda: messagebox.showerror("错误", f"发生错误: {str(e)}"))
+            self.ui.post(lambda: self.progress_label.configure(text="发生错误"))
+            self.ui.post(lambda error=str(e): messagebox.showerror("错误", f"发生错误: {error}"))
+        finally:
+            self.ui.post(self._finish_upload)
+
+    def _finish_upload(self):
+        """一个上传作业结束（界面线程），全部结束后恢复界面状态"""
+        self.active_uploads -= 1
+        if self.active_uploads:
+            self.upload_button.configure(text=f"🚀 上传到Maven仓库（进行中: {self.active_uploads}）")
+            return
+        self.upload_button.configure(text="🚀 上传到Maven仓库")
+        self.progress_bar.set(0)
+        self.progress_label.configure(text="就绪")
+
+    def _perform_batch_upload(self):
+        """扫描目录并通过线程池并发上传所有构件"""
+        directory = self.batch_dir_path.get()
+        self.log_message(f"🔍 正在扫描目录: {directory}")
+        pairs = find_artifact_pairs(directory)
+        if not pairs:
+            self.log_message("⚠️ 目录中没有找到POM文件")
+            return
+        self.log_message(f"📦 找到 {len(pairs)} 个构件，并发数: {self.worker_count.get()}")
+        self._run_batch(pairs, directory)
+
+    def _perform_dependency_upload(self):
+        """上传所选构件及本地Maven仓库中远程缺少的依赖，依赖先于依赖它的构件上传"""
+        jar, pom = self.jar_file_path.get() or None, self.pom_file_path.get()
+        self.log_message("🔍 正在解析依赖闭包...")
+        self.ui.post(lambda: self.progress_label.configure(text="正在解析依赖..."))
+        if self.pom_resolver is None:
+            self.pom_resolver = PomResolver()
+        checker = remote_checker(None, self.repository_id.get(), self.repository_url.get())
+        try:
+            pairs, dependencies, _ = plan_dependency_upload(jar, pom, checker, self.pom_resolver, self.log_message)
+        finally:
+            checker.pool.close()
+        self._run_batch(pairs, pom, dependencies)
+
+    def _preflight(self, pairs):
+        """上传前并行预检JAR结构和POM坐标，有错误时提示并返回False"""
+        self.ui.post(lambda: self.progress_label.configure(text="正在预检构件..."))
+        failures = preflight_artifacts(pairs, log=self.log_message)
+        if not failures:
+            return True
+        details = "\n".join(errors[0] for errors in list(failures.values())[:10])
+        self.ui.post(lambda: self.progress_label.configure(text="预检失败"))
+        self.ui.post(lambda: messagebox.showerror(
+            "预检失败", f"{len(failures)} 个构件未通过预检，未上传任何构件:\n\n{details}"))
+        return False
+
+    def _run_batch(self, pairs, source, dependencies=None):
+        """并发上传一组构件并汇报结果，source为作业日志对应的目录或文件
+
+        配置了镜像仓库时同时上传到每个仓库（各自独立的作业，共享文件缓冲区，每个文件只读取一次）。
+        """
+        if not self._preflight(pairs):
+            return
+
+        targets = self._repository_targets()
+        counts = [0] * len(targets)
+        started = time.time()
+
+        def describe():
+            # 构件数吞吐量（个/s）与字节速率、剩余时间一起显示
+            done = sum(counts)
+            return f"已完成 {done}/{len(pairs) * len(targets)} · {done / max(time.time() - started, 1e-6):.1f} 个/s"
+
+        progress = self._create_transfer_progress(
+            sum(artifact_size(jar, pom) for jar, pom in pairs) * len(targets), describe)
+        buffers = SharedFileBuffers(self._checksum_algorithms()) if len(targets) > 1 else None
+        journals = [UploadJournal.for_job(url, source, resume=self.resume_batch.get()) for _, url in targets]
+        for journal in journals:
+            self.log_message(f"📒 作业日志: {journal.path}")
+        try:
+            uploaders = []
+            deploy_funcs = []
+            for number, ((repository_id, url), journal) in enumerate(zip(targets, journals)):
+                deploy_func = self._create_deploy_func(on_bytes=progress.add, on_state=journal.mark,
+                                                       target=(repository_id, url), buffers=buffers)
+                if deploy_func is None:
+                    return
+
+                def on_progress(done, total, total_bytes, elapsed, number=number):
+                    counts[number] = done
+
+                log = self.log_message if len(targets) == 1 else \
+                    (lambda message, url=url: self.log_message(f"[{url}] {message}"))
+                deploy_funcs.append(deploy_func)
+                uploaders.append(BatchUploader(deploy_func, self.worker_count.get(), on_progress, log, progress,
+                                               journal, host=repository_host(url), dependencies=dependencies,
+                                               order=UPLOAD_ORDER_LABELS.get(self.upload_order.get(), "input")))
+            results = run_fan_out(uploaders, pairs)
+        finally:
+            for journal in journals:
+                journal.close()
+            if buffers:
+                buffers.close()
+
+        summaries = []
+        for (_, url), result, deploy_func in zip(targets, results, deploy_funcs):
+            summary = (f"成功 {result['succeeded']} 个，跳过 {result['skipped']} 个，失败 {len(result['failed'])} 个，"
+                       f"耗时 {result['elapsed']:.1f}s，"
+                       f"{format_throughput(result['succeeded'], result['bytes'], result['elapsed'])}")
+            if len(targets) > 1:
+                summary = f"{url}: {summary}"
+            summaries.append(summary)
+            self.log_message(f"📊 批量上传完成: {summary}")
+            connections = connection_stats(deploy_func)
+            if connections:
+                self.log_message(f"🔌 {format_connection_stats(connections)}")
+        summary = "\n".join(summaries)
+        if any(result["failed"] for result in results):
+            self.ui.post(lambda: messagebox.showerror("部分失败", f"批量上传完成: {summary}\n\n请检查日志信息"))
+        else:
+            self.ui.post(lambda: messagebox.showinfo("成功", f"批量上传完成: {summary}"))
+
+    def _repository_targets(self):
+        """上传目标：仓库ID/URL及镜像仓库（"[仓库ID=]URL"，空格或逗号分隔），返回[(仓库ID, URL)]"""
+        targets = [(self.repository_id.get(), self.repository_url.get())]
+        for text in self.mirror_repositories.get().replace(",", " ").split():
+            target = parse_repository_target(text, self.repository_id.get())
+            if target not in targets:
+                targets.append(target)
+        return targets
+
+    def _checksum_algorithms(self):
+        """原生HTTP方式需要上传的校验文件类型"""
+        return CHECKSUM_ALGORITHMS if self.upload_sha2_checksums.get() else DEFAULT_CHECKSUM_ALGORITHMS
+
+    def _get_deploy_index(self):
+        """启用跳过已部署构件时返回本地部署索引"""
+        if not self.skip_deployed.get():
+            return None
+        if self.deploy_index is None:
+            self.deploy_index = DeployIndex()
+        return self.deploy_index
+
+    def _bandwidth_limiter(self):
+        """设置了带宽上限且为原生HTTP方式时，返回所有上传作业共享的TokenBucket，否则返回None"""
+        text = self.bandwidth_limit.get().strip()
+        if not text or self.deploy_mode.get() != DEPLOY_MODE_NATIVE:
+            return None
+        try:
+            rate = float(text) * 1024 * 1024
+        except ValueError:
+            self.log_message(f"⚠️ 带宽上限不是有效的数字，将不限速: {text}")
+            return None
+        if rate <= 0:
+            return None
+        if self.bandwidth_limiter is None:
+            self.bandwidth_limiter = TokenBucket(rate)
+        else:
+            self.bandwidth_limiter.set_rate(rate)
+        return self.bandwidth_limiter
+
+    def _create_transfer_progress(self, total_bytes, describe=None):
+        """创建按实际字节数统计的进度，节流后在界面线程中更新进度条和进度文本（含速率、带宽上限和剩余时间）"""
+        def on_update(snapshot):
+            text = format_progress(snapshot)
+            if describe:
+                text = f"{describe()} · {text}"
+            self.ui.post(lambda: self._show_progress(snapshot["fraction"], text), key="progress")
+        limiter = self._bandwidth_limiter()
+        return TransferProgress(total_bytes, on_update, limit=limiter.rate if limiter else None)
+
+    def _show_progress(self, fraction, text):
+        """更新进度条和进度文本"""
+        self.progress_bar.set(fraction)
+        self.progress_label.configure(text=text)
+
+    def _create_deploy_func(self, on_bytes=None, on_state=None, target=None, buffers=None):
+        """根据界面上的上传方式创建deploy_func(jar, pom)，target为(仓库ID, URL)，默认为界面上的仓库；找不到Maven时返回None"""
+        repository_id, repository_url = target or (self.repository_id.get(), self.repository_url.get())
+        mvn_executable = None
+        if self.deploy_mode.get() == DEPLOY_MODE_MAVEN:
+            mvn_executable = self._maven_command_executable()
+            if not mvn_executable:
+                self.log_message("❌ 错误: 未找到Maven可执行文件，请先配置Maven路径")
+                return None
+        return create_deploy_func(
+            self.deploy_mode.get(),
+            repository_id,
+            repository_url,
+            mvn_executable,
+            checksum_algorithms=self._checksum_algorithms(),
+            index=self._get_deploy_index(),
+            on_bytes=on_bytes,
+            on_state=on_state,
+            pool_size=min(int(self.worker_count.get()), HOST_CONCURRENCY_LIMIT),
+            buffers=buffers,
+            limiter=self._bandwidth_limiter()
+        )
+
+    def _perform_native_upload(self):
+        """通过内置HTTP引擎直接上传，不启动Maven进程"""
+        repository_id = self.repository_id.get()
+        self.log_message("🚀 使用原生HTTP方式上传...")
+        credentials = load_maven_credentials(repository_id)
+        if credentials:
+            self.log_message(f"🔑 已从settings.xml读取仓库 {repository_id} 的认证信息")
+        else:
+            self.log_message(f"ℹ️ settings.xml中没有仓库 {repository_id} 的认证信息，将匿名上传")
+
+        self.ui.post(lambda: self.progress_label.configure(text="正在上传..."))
+        progress = self._create_transfer_progress(artifact_size(self.jar_file_path.get(), self.pom_file_path.get()))
+        deployer = HttpDeployer(self.repository_url.get(), credentials, log=self.log_message,
+                                checksum_algorithms=self._checksum_algorithms(), index=self._get_deploy_index(),
+                                on_bytes=progress.add, limiter=self._bandwidth_limiter())
+        try:
+            start = time.time()
+            outcome = deployer.deploy(self.jar_file_path.get(), self.pom_file_path.get())
+        except DeployError as e:
+            self.log_message(f"❌ 上传失败: {e}")
+            self.ui.post(lambda: self.progress_label.configure(text="上传失败"))
+            self.ui.post(lambda error=str(e): messagebox.showerror("错误", f"上传失败: {error}"))
+            return
         finally:
-            # 恢复界面状态
-            self.root.after(0, lambda: self.upload_button.configure(state='normal', text="🚀 上传到Maven仓库"))
-            self.root.after(0, lambda: self.progress_bar.set(0))
-            self.root.after(0, lambda: self.progress_label.configure(text="就绪"))
-            self.is_uploading = False
+            deployer.pool.close()
+
+        self.log_message(f"🔌 {format_connection_stats(deployer.pool.stats())}")
+        self.ui.post(lambda: self.progress_bar.set(1.0))
+        if outcome["skipped"]:
+            self.log_message(f"⏭️ 仓库中已有内容相同的构件，无需重复上传: {outcome['path']}")
+            self.ui.post(lambda: self.progress_label.configure(text="已部署，已跳过"))
+            self.ui.post(lambda: messagebox.showinfo("已跳过", "仓库中已有内容相同的构件，无需重复上传"))
+            return
+        self.log_message(f"🎉 上传成功！{outcome['path']} (耗时 {time.time() - start:.2f}s)")
+        self.ui.post(lambda: self.progress_label.configure(text="上传成功！"))
+        self.ui.post(lambda: messagebox.showinfo("成功", "JAR包已成功上传到Maven仓库！"))
+
+    def _perform_maven_upload(self):
+        """调用mvn deploy:deploy-file上传"""
+        # 查找Maven可执行文件
+        mvn_executable = self._maven_command_executable()
+        if not mvn_executable:
+            self.log_message("❌ 错误: 未找到Maven可执行文件")
+            self.log_message("")
+            self.log_message("🛠️ 解决方案:")
+            self.log_message("1. 点击'手动选择'按钮手动指定Maven路径")
+            self.log_message("2. 检查Maven环境变量配置:")
+            self.log_message("   - MAVEN_HOME: " + str(os.getenv('MAVEN_HOME', '未设置')))
+            self.log_message("   - PATH中是否包含: %MAVEN_HOME%\\bin")
+            self.log_message("3. 常见Maven安装路径:")
+            self.log_message("   - D:\\Maven\\bin\\mvn.cmd")
+            self.log_message("   - C:\\Program Files\\Apache\\maven\\bin\\mvn.cmd")
+            self.log_message("   - C:\\apache-maven\\bin\\mvn.cmd")
+            
+            # 提供选择Maven的选项
+            self.ui.post(lambda: messagebox.askyesno("Maven未找到", 
+                "未找到Maven可执行文件。\n\n"
+                "是否现在选择Maven路径？\n\n"
+                "点击'是'选择Maven路径\n"
+                "点击'否'取消上传"))
+            
+            return
+        
+        self.log_message(f"✅ 找到Maven可执行文件: {mvn_executable}")
+
+        # 与原生方式和批量上传一样，先通过部署索引和远程校验值跳过内容相同的已部署构件
+        checker = self._maven_deploy_checker()
+        try:
+            self._run_maven_deploy(mvn_executable, checker)
+        finally:
+            if checker:
+                checker.pool.close()
+
+    def _maven_deploy_checker(self):
+        """启用跳过已部署构件时返回检查用的HttpDeployer（共享界面的部署索引），否则返回None"""
+        index = self._get_deploy_index()
+        if index is None:
+            return None
+        try:
+            credentials = load_maven_credentials(self.repository_id.get())
+        except DeployError:
+            credentials = None
+        return HttpDeployer(self.repository_url.get(), credentials, log=self.log_message,
+                            checksum_algorithms=self._checksum_algorithms(), index=index)
+
+    def _run_maven_deploy(self, mvn_executable, checker):
+        """_perform_maven_upload的实现：检查是否已部署，执行Maven命令并汇报结果"""
+        coordinates = None
+        checksums = None
+        if checker:
+            try:
+                coordinates = read_pom_coordinates(self.pom_file_path.get())
+                deployed, checksums = checker.check_deployed(self.jar_file_path.get(), self.pom_file_path.get(),
+                                                             coordinates)
+            except (DeployError, OSError) as e:
+                self.log_message(f"⚠️ 无法检查是否已部署，继续上传: {e}")
+                coordinates = None
+                deployed = False
+            if deployed:
+                self.log_message("⏭️ 仓库中已有内容相同的构件，无需重复上传")
+                self.ui.post(lambda: self.progress_bar.set(1.0))
+                self.ui.post(lambda: self.progress_label.configure(text="已部署，已跳过"))
+                self.ui.post(lambda: messagebox.showinfo("已跳过", "仓库中已有内容相同的构件，无需重复上传"))
+                return
+
+        # 同目录下的sources/javadoc等附属构件随主JAR一次部署
+        attachments = find_attached_artifacts(self.jar_file_path.get(), self.pom_file_path.get())
+        for path, classifier, file_type in attachments:
+            self.log_message(f"📎 附属构件 [{classifier or file_type}]: {path}")
+
+        # 构建Maven命令
+        maven_cmd = build_maven_deploy_command(
+            mvn_executable,
+            self.jar_file_path.get(),
+            self.pom_file_path.get(),
+            self.repository_id.get(),
+            self.repository_url.get(),
+            attachments
+        )
+        
+        self.log_message("🚀 开始执行Maven上传命令...")
+        self.log_message(f"命令: {' '.join(maven_cmd)}")
+        
+        # 更新进度：按Maven输出的Uploaded字节数计算
+        self.ui.post(lambda: self.progress_label.configure(text="正在执行Maven命令..."))
+        progress = self._create_transfer_progress(artifact_size(self.jar_file_path.get(), self.pom_file_path.get()))
+        
+        # 执行Maven命令，实时显示输出；在工作线程中逐行解析为事件，由事件驱动进度和统计
+        parser = MavenOutputParser()
+
+        def on_output(line):
+            self.log_message(line)
+            event = parser.feed(line)
+            if event is not None and event.kind == MAVEN_EVENT_UPLOADED and event.counted:
+                progress.add(event.bytes)
+
+        started = time.time()
+        return_code = run_maven_deploy(maven_cmd, on_output)
+        elapsed = time.time() - started
+        
+        # 更新进度条
+        self.ui.post(lambda: self.progress_bar.set(1.0))
+        if parser.files:
+            self.log_message(f"📊 共上传 {parser.files} 个文件，{format_bytes(parser.bytes)}，"
+                             f"平均 {format_bytes(parser.bytes / max(elapsed, 0.001))}/s")
+        
+        if return_code == 0:
+            if checker and coordinates:
+                checker.record_deployed(self.jar_file_path.get(), self.pom_file_path.get(), coordinates, checksums)
+            self.log_message("🎉 上传成功！")
+            self.ui.post(lambda: self.progress_label.configure(text="上传成功！"))
+            self.ui.post(lambda: messagebox.showinfo("成功", "JAR包已成功上传到Maven仓库！"))
+        elif parser.already_deployed:
+            # 仓库拒绝覆盖已有版本（HTTP 409），说明构件已经部署过，不按失败处理
+            self.log_message("⏭️ 仓库中已存在该版本（HTTP 409），跳过上传")
+            self.ui.post(lambda: self.progress_label.configure(text="已存在，已跳过"))
+            self.ui.post(lambda: messagebox.showinfo("已存在", "仓库中已存在该版本且不允许覆盖，无需重复上传"))
+        else:
+            message = parser.summary()
+            self.log_message(f"❌ 上传失败！{message}")
+            self.ui.post(lambda: self.progress_label.configure(text="上传失败"))
+            self.ui.post(lambda: messagebox.showerror("错误", f"{message}，请检查日志信息"))
 
     def run(self):
         """运行应用"""
         self.root.mainloop()
 
 
-def main():
-    """主函数"""
+def main(argv=None):
+    """主函数：带参数时以命令行模式运行，否则启动图形界面"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        return run_cli(argv)
+
     try:
         app = ModernMavenUploader()
         app.run()
@@ -874,4 +1416,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())